@@ -4,7 +4,7 @@ import src.aggregators.aggregator   as energy_aggregator
 import src.aggregators.dr           as dr_aggregator
 import src.boards.board             as board
 import src.utils.eval               as eval
-from src.utils.elgamal_dec_proof import verify_partial_decryption_share
+from src.utils.elgamal_dec_proof import verify_partial_decryption_shares
 
 # Most comments are edited by LLM generations for clarity.
 
@@ -51,14 +51,21 @@ dr_info     = [(dr.id, dr.get_public_key()) for dr in dr_aggs]
 agg = aggs[0]
 dr_agg = dr_aggs[0]
 
+# The DSO precomputes the nonces for signing the registered lists
+dso.precompute_signing(NUM_SM + NUM_AGG + NUM_DR_AGG)
+
+# The Aggregators prepare the input-independent part of their Mix hop before registration closes
+for aggregator in aggs:
+    aggregator.precompute_mix(NUM_SM)
+
 # ---------------------------------------------------------
 # REGISTRATION & VERIFICATION (PK_i)
 # ---------------------------------------------------------
 
 # The DSO verifies the Zero-Knowledge Proofs (NIZKPs) of all entities
 # to ensure they own their keys before registering them.
-for smart_meter in sm_info:
-    dso.verify_smartmeter(smart_meter)
+if dso.verify_smartmeters_bulk(sm_info):
+    raise ValueError("failed to verify smart meter")
 
 for energy_aggregator in agg_info:
     dso.verify_aggregator(energy_aggregator)
@@ -87,6 +94,10 @@ bb.publish_target_reduction(noisy_target_reduction)
 # Entities fetch DSO keys from the Board
 for smart_meter in sms:
     smart_meter.set_dso_public_keys(bb.pk, bb.ek)
+
+    # Idle period: precompute encryption tokens for the DSO key, so reports are cheap to encrypt.
+    # All smart meters share this process, so the pool is filled once instead of on a thread
+    smart_meter.start_encryption_pool(background=False)
     
 for energy_aggregator in aggs:
     energy_aggregator.set_dso_public_keys(bb.pk, bb.ek)
@@ -127,25 +138,44 @@ for smart_meter in sms:
 # ---------------------------------------------------------
 print("\n\nMIX PHASE STARTED\n\n")
 
-# The Aggregator shuffles the list of Smart Meter Public Keys
+# Mix cascade: the first Aggregator shuffles the list of Smart Meter Public Keys,
+# and every further Aggregator shuffles the output of the one before it
 agg.create_mixed_anon_pk_set(sm_info)
 
-# Publish the Shuffled Keys (pk') and the Shuffle Proof (πmix) to the Board
-bb.publish_mix_pk_and_proof(agg.publish_mixed_keys())
-
-# Smart Meters retrieve the Aggregator's encryption key to receive their anon IDs
-for smartmeter in sms:
-    agg.set_sm_encrypytion_keys(smartmeter.get_sm_id_And_encryption_key(), bb.get_sm_pk_by_id(smartmeter.id))
-
-# Smart Meters retrieve their specific blinding factor to recognize their new anonymous ID
+# Publish each hop's Shuffled Keys (pk') and Shuffle Proof (πmix) to the Board
+# A hop is published tentatively and its proof is verified in the background,
+# so the next hop starts right away and the hops are verified in parallel
+bb.publish_mix_hop(agg.publish_mixed_keys())
+for hop in aggs[1:]:
+    hop.mix_hop(bb.mix_pk)
+    bb.publish_mix_hop(hop.publish_mixed_keys())
+
+# Smart Meters send every hop their encryption key to receive their anon IDs
+for hop in aggs:
+    for smartmeter in sms:
+        hop.set_sm_encrypytion_keys(smartmeter.get_sm_id_And_encryption_key(), bb.get_sm_pk_by_id(smartmeter.id))
+
+# Smart Meters retrieve their specific blinding factor to recognize their new anonymous ID.
+# Each hop of the cascade hands its output key to the Smart Meter, which asks the next
+# hop with it, so no hop learns the mapping of another hop
 for smartmeter in sms:
     ### some method for the smartmeter to get the anon_pk
     #NOTE: by using threading or better s
-    enc_sign_anon_key = agg.set_anon_key_mix(smartmeter.get_public_key(), smartmeter.id)
-    smartmeter.set_anon_key(enc_sign_anon_key)
+    mix_input = None
+    for hop in aggs:
+        enc_sign_anon_key = hop.set_anon_key_mix(smartmeter.get_public_key(), smartmeter.id, mix_input)
+        smartmeter.set_anon_key(enc_sign_anon_key, hop.get_public_key())
+        mix_input = smartmeter.get_anon_key()[0]
+    if len(aggs) > 1:
+        agg.set_final_anon_key(smartmeter.get_public_key()[0], *smartmeter.get_anon_key(), aggs[-1].get_public_key())
     print(f"Smartmeter {smartmeter.id} got anon key mix.")
 
 
+# The anonymous keys are only used for reports once the mix proof has been verified
+if not bb.wait_for_mix_verification():
+    raise ValueError("Mix proof verification failed!")
+
+
 # ---------------------------------------------------------
 # REPORT PHASE (Baseline Submission)
 # ---------------------------------------------------------
@@ -222,6 +252,10 @@ for smartmeter in sms:
     else:
         print(f"Smartmeter {smartmeter.id} is not a participant.")
 
+# All reports are sent, the encryption pools are no longer needed
+for smartmeter in sms:
+    smartmeter.stop_encryption_pool()
+
 # Aggregator anonymizes and publishes the consumption reports
 _, consumption_anonym_pbb = agg.make_anonym_consumption()
 bb.publish_sm_comsumption_PBB(consumption_anonym_pbb)
@@ -244,10 +278,10 @@ evaluator = eval.Eval(dso.get_encryption_key())
 agg_share, agg_proof = agg.partial_dec_reports(bb.get_sm_baseline(), bb.get_sm_consumption())
 dr_share, dr_proof = dr_agg.partial_dec_reports(bb.get_sm_baseline(), bb.get_sm_consumption())
 
-if not verify_partial_decryption_share(agg.pp, agg_proof[0][0], agg_proof[1]):
+if not verify_partial_decryption_shares(agg.pp, agg_proof[0], agg_proof[1]):
     raise ValueError("Aggregator partial decryption share proof verification failed!")
 
-if not verify_partial_decryption_share(dr_agg.pp, dr_proof[0][0], dr_proof[1]):
+if not verify_partial_decryption_shares(dr_agg.pp, dr_proof[0], dr_proof[1]):
     raise ValueError("Dr Aggregator partial decryption share proof verification failed!")
 
 
@@ -1,5 +1,7 @@
-from src.utils.elgamal_dec_proof import verify_correct_decryption, prove_partial_decryption_share
+from src.utils.elgamal_dec_proof import verify_correct_decryption, prove_partial_decryption_shares, collect_partial_decryptions
 from src.utils.procedures import Procedures
+from src.utils.shuffle import Shuffle
+from src.utils.point_codec import encode_report
 
 class Aggregator:
     """ 
@@ -31,6 +33,7 @@ class Aggregator:
         self.participants_consumption_report = []
         self.pk_to_pk_prime = {}
         self.sm_ek = {}
+        self.shuffle = None
     
     def get_id(self):
         """Returns the Aggregator's ID string."""
@@ -102,7 +105,22 @@ class Aggregator:
 
         self.sm_ek[id] = ek
 
-    def create_mixed_anon_pk_set(self, ID_pk):
+    def precompute_mix(self, N, workers=None):
+        """
+        Runs the offline part of the Mix for N smart meters ahead of time.
+
+        The permutation, blinding, permutation commitment and proof witnesses do not
+        depend on the registered keys, so the later `create_mixed_anon_pk_set` only
+        does the input-dependent work.
+
+        Args:
+          N (int): Expected number of registered smart meters.
+          workers (int, optional): Number of processes for the precomputation.
+        """
+        self.shuffle = Shuffle(self.pp)
+        self.shuffle.precompute(N, workers)
+
+    def create_mixed_anon_pk_set(self, ID_pk, shards=None, workers=None):
         """
         Executes the Mix shuffle protocol.
         
@@ -111,8 +129,59 @@ class Aggregator:
 
         Args:
           ID_pk: List of registered Smart Meter public keys.
+          shards (int, optional): Use a sharded two-layer mix with this many buckets per layer.
+          workers (int, optional): Number of processes for the shuffle proofs.
+        """
+        self.mix_anon_list = self.pro.mix_id(ID_pk, self.pp[1], workers=workers, shuffle=self.shuffle, shards=shards)
+        self.shuffle = None
+
+    def mix_hop(self, previous_pks):
+        """
+        Runs one later hop of a mix cascade on the output of the previous hop.
+
+        Args:
+          previous_pks (list): The anonymized public keys published by the previous hop.
         """
-        self.mix_anon_list = self.pro.mix_id(ID_pk, self.pp[1])   
+        ID_pk = [(i, (pk,)) for i, pk in enumerate(previous_pks)]
+        self.create_mixed_anon_pk_set(ID_pk)
+
+    def mixed_key_of(self, pk):
+        """
+        Returns the output of this aggregator's mix for input key pk, or None.
+
+        Args:
+          pk (ECC.EccPoint): A key of the mix input.
+
+        Returns:
+            ECC.EccPoint: pk + r' * G, the key it was shuffled to.
+        """
+        g = self.pp[1]
+        outputs = {(int(pk_prime.x), int(pk_prime.y)) for pk_prime in self.mix_anon_list[0]}
+
+        # using additive logic (pk + r*G)
+        for r_prime in self.mix_anon_list[1]:
+            pk_prime = pk + int(r_prime) * g
+            if (int(pk_prime.x), int(pk_prime.y)) in outputs:
+                return pk_prime
+        return None
+
+    def anon_key_of(self, sm_pk):
+        """
+        Returns the final anonymized key of a smart meter, or None.
+
+        This is the key recorded by `set_anon_key_mix` (single mix) or
+        `set_final_anon_key` (cascade), otherwise the output of this aggregator's mix.
+
+        Args:
+          sm_pk (ECC.EccPoint): A registered smart meter key.
+
+        Returns:
+            ECC.EccPoint: The anonymized key pk'.
+        """
+        blinding_factor = self.pk_to_pk_prime.get(str((sm_pk.x, sm_pk.y)))
+        if blinding_factor is None:
+            return self.mixed_key_of(sm_pk)
+        return sm_pk + blinding_factor
 
     def publish_mixed_keys(self):
         """ 
@@ -123,15 +192,22 @@ class Aggregator:
         """
         return (self.mix_anon_list[0], self.mix_anon_list[2])
     
-    def set_anon_key_mix(self, sm, id):
+    def set_anon_key_mix(self, sm, id, mix_input=None):
         """
         Retrieves the specific blinding factor (randomness) used for a specific Smart Meter.
         
         This allows the Aggregator to privately inform the Smart Meter that they can recognice
         themselves in the anonymized list (since the random value is added to their key).
+
+        In a mix cascade every hop answers the smart meter itself: the smart meter passes
+        the key it got from the previous hop as mix_input and receives this hop's output,
+        so no hop learns another hop's r' values.
         
         Args:
           sm: Tuple containing the Smart Meter's ID and Public Key.
+          id (str): The Smart Meter's ID.
+          mix_input (ECC.EccPoint, optional): The smart meter's key at the input of this
+            hop; its registered key (first hop) if None.
 
         Returns:
             tuple: (Blinding_Factor_Point, Signature)
@@ -141,35 +217,49 @@ class Aggregator:
         else:
             sm_pk = sm
 
-        _, g, _ = self.pp
-        
-        # using additive logic (pk + r*G)
-        for r_prime in self.mix_anon_list[1]:
+        first_hop = mix_input is None
+        if first_hop:
+            mix_input = sm_pk
 
-            # calculate r_prime * g
-            blinding_factor = int(r_prime) * g
+        pk_prime = self.mixed_key_of(mix_input)
+        if pk_prime is not None:
+            # sign_r_prime = self.pro.sig.schnorr_sign(self.__sk, self.pp, str(r_prime))
+            sign_anon_key = self.pro.sig.schnorr_sign(self.__sk, self.pp, (str(pk_prime.x) + str(pk_prime.y)))
 
-            # then add r_prime to public key
-            pk_prime_check = sm_pk + blinding_factor
+            # Store mapping of pk -> Blinding_Factor for later use in Anonym()
+            if first_hop:
+                pk_str = str((sm_pk.x, sm_pk.y))
+                self.pk_to_pk_prime[pk_str] = pk_prime + (-sm_pk)
             
-            for pk_prime in self.mix_anon_list[0]:
-                if pk_prime_check == pk_prime:
-                    # sign_r_prime = self.pro.sig.schnorr_sign(self.__sk, self.pp, str(r_prime))
-                    sign_anon_key = self.pro.sig.schnorr_sign(self.__sk, self.pp, (str(pk_prime.x) + str(pk_prime.y)))
-
-                    # Store mapping of pk -> Blinding_Factor for later use in Anonym()
-                    pk_str = str((sm_pk.x, sm_pk.y))
-                    self.pk_to_pk_prime[pk_str] = blinding_factor
-                    
-                    # enc_r_prime = self.pro.ahe.enc(self.sm_ek[id], r_prime)
-                    enc_anon_key_1 = self.pro.ahe.enc(self.sm_ek[id], int(pk_prime.x))
-                    enc_anon_key_2 = self.pro.ahe.enc(self.sm_ek[id], int(pk_prime.y))
-                    return ((enc_anon_key_1, enc_anon_key_2), sign_anon_key)
-                    # return (enc_r_prime, sign_r_prime)
+            # enc_r_prime = self.pro.ahe.enc(self.sm_ek[id], r_prime)
+            enc_anon_key_1 = self.pro.ahe.enc(self.sm_ek[id], int(pk_prime.x))
+            enc_anon_key_2 = self.pro.ahe.enc(self.sm_ek[id], int(pk_prime.y))
+            return ((enc_anon_key_1, enc_anon_key_2), sign_anon_key)
+            # return (enc_r_prime, sign_r_prime)
         
         print("Public key not found in r_prime")
         return None
 
+    def set_final_anon_key(self, sm_pk, anon_key, signature, hop_pk):
+        """
+        Records a smart meter's key after the last hop of a mix cascade.
+
+        The reports are still sent to this aggregator under the registered key, so the
+        smart meter hands over the final key it received from the last hop, together with
+        that hop's signature on it (see `SmartMeter.get_anon_key`).
+
+        Args:
+          sm_pk (ECC.EccPoint): The registered smart meter key.
+          anon_key (ECC.EccPoint): Its key after the last hop.
+          signature (tuple): The last hop's signature on anon_key.
+          hop_pk (tuple): The last hop's public key package (pk, pp, proof).
+        """
+        if not self.pro.sig.schnorr_verify(hop_pk[0], hop_pk[1], str(anon_key.x) + str(anon_key.y), signature):
+            raise ValueError("last hop signature on the anonymous key failed")
+
+        pk_str = str((sm_pk.x, sm_pk.y))
+        self.pk_to_pk_prime[pk_str] = anon_key + (-sm_pk)
+
     def check_sm_baseline(self, baseline_report, sm_id="NOT_SAID"):
         """
         Receives, verifies, and stores a report from a Smart Meter.
@@ -181,32 +271,27 @@ class Aggregator:
            - If it's a valid report, they are added to the participants list.
 
         Args:
-          sm_report: The report tuple (PK, (Time, Ciphertext, Signature)).
+          sm_report: The report tuple (PK, (Time, Ciphertext, Signature, Encoding)).
           sm_id: ID for logging purposes.
           consumption (bool): False if this is a Baseline report, True if Consumption report.
         """
-        (pk, (t, cts, signature)) = baseline_report
+        (pk, (t, cts, signature, encoding)) = baseline_report
+        packed = self.pro.ahe.encoding_of(cts, encoding) == self.pro.ahe.PACKED
         
         sm_pk = pk[0]
         pp = pk[1]
         
-        if not self.pro.sig.schnorr_verify(sm_pk, pp, str((t, cts)), signature):
+        if not self.pro.sig.schnorr_verify(sm_pk, pp, encode_report(t, cts, packed), signature):
             raise ValueError("baseline check failed")
 
-        g = pp[1]
-
-        # Generate a deterministic encryption of 0 to check against
-        deterministic_check = self.pro.ahe.enc(self.dso_ek[0], 0, r=1)
+        # Generate a deterministic encryption of 0 (in the report's encoding) to check against
+        if packed:
+            deterministic_check = self.pro.ahe.enc_packed(self.dso_ek[0], 0, r=1)
+        else:
+            deterministic_check = self.pro.ahe.enc(self.dso_ek[0], 0, r=1)
 
         # Identify the anonymized key (pk') corresponding to this report
-        pk_prime = None
-        for r_prime in self.mix_anon_list[1]:
-            blinding_factor = int(r_prime) * g
-            pk_prime_check = sm_pk + blinding_factor
-            
-            for pk_prime_candidate in self.mix_anon_list[0]:
-                if pk_prime_check == pk_prime_candidate:
-                    pk_prime = pk_prime_check
+        pk_prime = self.anon_key_of(sm_pk)
         
         # If it's a baseline report and not zero (meaning sm wants to participate)
         if cts != deterministic_check:
@@ -225,20 +310,34 @@ class Aggregator:
            - If it's a valid report, they are added to the participants list.
 
         Args:
-          sm_report: The report tuple (PK, (Time, Ciphertext, Signature)).
+          sm_report: The report tuple (PK, (Time, Ciphertext, Signature, Encoding)).
           sm_id: ID for logging purposes.
           consumption (bool): False if this is a Baseline report, True if Consumption report.
         """
-        (pk, (t, cts, signature)) = consumption_report
+        (pk, (t, cts, signature, encoding)) = consumption_report
+        packed = self.pro.ahe.encoding_of(cts, encoding) == self.pro.ahe.PACKED
         
         sm_pk = pk[0]
         pp = pk[1]
         
-        sm_consumption_verified = self.pro.sig.schnorr_verify(sm_pk, pp, str((t, cts)), signature)
+        sm_consumption_verified = self.pro.sig.schnorr_verify(sm_pk, pp, encode_report(t, cts, packed), signature)
         assert sm_consumption_verified, "Consumption signature verification failed"
         
         self.participants_consumption_report.append(consumption_report)
             
+    def signed_report_batch(self, consumption=False):
+        """
+        Collects all stored participant reports with their signatures, to publish on the Board.
+
+        Args:
+          consumption (bool): Use the consumption reports instead of the baseline reports.
+
+        Returns:
+            list: (pk, t, cts, encoding, signature) per participant report.
+        """
+        reports = self.participants_consumption_report if consumption else self.participants_baseline_report
+        return [(pk[0], t, cts, encoding, signature) for pk, (t, cts, signature, encoding) in reports]
+
     def get_participants(self):
         """Returns list of anonymized public keys of participants."""
         return self.participants
@@ -304,6 +403,9 @@ class Aggregator:
         """
         baseline_pk_to_part = {}
         consumption_pk_to_part = {}
+        # every decrypted ciphertext and its partial decryption, for the batched proof
+        cts = []
+        D_list = []
         print(f"Number of participants to partially decrypt: {len(self.get_participants())}")
         print(f"Number of baseline reports on BB: {len(baseline_BB)}")
         print(f"Number of consumption reports on BB: {len(consumption_PBB)}")
@@ -320,6 +422,7 @@ class Aggregator:
                 sm_baseline_t,
                 sm_baseline_proof
             )
+            collect_partial_decryptions(sm_baseline_ct, baseline_pk_to_part[pk_prime_str][0], cts, D_list)
 
             # Process Consumption Report
             # Retrieve and partially decrypt the consumption report similarly
@@ -329,16 +432,12 @@ class Aggregator:
                 sm_consumption_t,
                 sm_consumption_proof
             )
+            collect_partial_decryptions(sm_consumption_ct, consumption_pk_to_part[pk_prime_str][0], cts, D_list)
     
-        # for proof of correct decryption on one of the commitments
-        pk_prime_commitment = self.get_participants()[0]
-        pk_prime_commitment_str = str((pk_prime_commitment.x, pk_prime_commitment.y))
-        _, commitment_ct, _ = baseline_BB[pk_prime_commitment_str] 
-        proof = prove_partial_decryption_share(self.pp, commitment_ct[0], self.dk_share)
-
-        print(f"len baseline_pk_to_part: {len(baseline_pk_to_part)}")
-        print(f"len consumption_pk_to_part: {len(consumption_pk_to_part)}")
-        return (baseline_pk_to_part, consumption_pk_to_part), (commitment_ct, proof)
+        # one batched proof of correct decryption covering every partial decryption
+        proof = prove_partial_decryption_shares(self.pp, cts, self.dk_share, D_list)
+
+        return (baseline_pk_to_part, consumption_pk_to_part), (cts, proof)
     
     def partial_dec_equal_cts(self, equal_cts):
         """
@@ -1,5 +1,5 @@
 import random
-from src.utils.elgamal_dec_proof import prove_partial_decryption_share
+from src.utils.elgamal_dec_proof import prove_partial_decryption_shares, collect_partial_decryptions
 from src.utils.procedures import Procedures
 
 class DR_Aggregator:
@@ -119,6 +119,9 @@ class DR_Aggregator:
         """
         baseline_pk_to_part = {}
         consumption_pk_to_part = {}
+        # every decrypted ciphertext and its partial decryption, for the batched proof
+        cts = []
+        D_list = []
 
         for pk_prime in self.get_participants():
             pk_prime_str = str((pk_prime.x, pk_prime.y))
@@ -130,6 +133,7 @@ class DR_Aggregator:
                 sm_baseline_t,
                 sm_baseline_proof
             )
+            collect_partial_decryptions(sm_baseline_ct, baseline_pk_to_part[pk_prime_str][0], cts, D_list)
 
             # Process Consumption Report
             sm_consumption_t, sm_consumption_ct, sm_consumption_proof = consumption_PBB[pk_prime_str]
@@ -138,14 +142,12 @@ class DR_Aggregator:
                 sm_consumption_t,
                 sm_consumption_proof
             )
+            collect_partial_decryptions(sm_consumption_ct, consumption_pk_to_part[pk_prime_str][0], cts, D_list)
 
-        # for proof of correct decryption on one of the commitments
-        pk_prime_commitment = self.get_participants()[0]
-        pk_prime_commitment_str = str((pk_prime_commitment.x, pk_prime_commitment.y))
-        _, commitment_ct, _ = baseline_BB[pk_prime_commitment_str] 
-        proof = prove_partial_decryption_share(self.pp, commitment_ct[0], self.dk_share)
+        # one batched proof of correct decryption covering every partial decryption
+        proof = prove_partial_decryption_shares(self.pp, cts, self.dk_share, D_list)
 
-        return (baseline_pk_to_part, consumption_pk_to_part), (commitment_ct, proof)
+        return (baseline_pk_to_part, consumption_pk_to_part), (cts, proof)
 
     
     def partial_dec_equal_cts(self, equal_cts):
@@ -1,8 +1,15 @@
 # this is both for public and private boards
+import threading
+from concurrent.futures import ProcessPoolExecutor, wait as wait_futures
 from src.utils.private_key_proof import schnorr_NIZKP_verify
 from src.utils.elgamal_dec_proof import verify_correct_decryption
+from src.utils.ec_elgamal import ElGamal
 from src.utils.shuffle import Shuffle
+from src.utils.sharded_shuffle import is_sharded, verify_sharded_mix, verify_encoded_mix
+from src.utils.point_codec import encode_points, encode_report
+from src.utils.proof_encoding import encode_shuffle_proof, decode_shuffle_proof
 from src.utils.signature import Signature
+from src.utils.merkle import MerkleTree, root_message, verify_inclusion
 
 class Board:
     """ 
@@ -11,6 +18,17 @@ class Board:
     The Board serves as a trusted verifiable log. It makes all posted data auditable
     (signatures, proofs, shuffles). If verification fails the data is rejected.
     """
+
+    def __init__(self):
+        """
+        Initializes the state of the mix verification; everything else is set as it is published.
+        """
+        # (pk_prime, πmix, verification future) per published hop of a mix cascade
+        self.mix_hops = []
+        # process pool verifying the hops, started by the first hop
+        self.mix_pool = None
+        # background thread of publish_mix_pk_and_proof(wait=False)
+        self.mix_verification = None
     
     def publish_dso_public_keys(self, dso_keys):
         """
@@ -39,6 +57,10 @@ class Board:
         """
         Publishes the list of registered entities, verified by the DSO's signature.
 
+        The lists are either signed per ID or, from `sign_registered_lists(merkle=True)`,
+        by one signed Merkle root each. Roots are checked against the published lists
+        and kept, so any entity can later prove its registration with `verify_registration`.
+
         Args:
           signed_lists: tuple containing:
              - SM_List, SM_Signatures
@@ -53,40 +75,79 @@ class Board:
             self.register_aggregator, agg_signatures, 
             self.register_dr, dr_signatures
         ) = signed_lists
+        self.registry_roots = {}
 
         sm_msg_list = [sm_id for sm_id, _ in self.register_smartmeter]
         agg_msg_list = [agg_id for agg_id, _ in self.register_aggregator]
         dr_msg_list = [dr_id for dr_id, _ in self.register_dr]
         
         # Verify DSO signatures on the Smart Meter list
-        sm_valid, sm_results = self.sig.schnorr_verify_list(self.pk[0], self.pk[1], sm_msg_list, sm_signatures)
-        if not sm_valid:
+        if not self.__verify_list("sm", "Smartmeter", sm_msg_list, sm_signatures):
             print("Smartmeters were not verified")
-            for i, msg, is_valid in sm_results:
-                if not is_valid:
-                    print(f"Smartmeter ID {msg} at index {i} failed verification.")
             return False
         
         # Verify DSO signatures on the Aggregator list
-        agg_valid, agg_results = self.sig.schnorr_verify_list(self.pk[0], self.pk[1], agg_msg_list, agg_signatures)
-        if not agg_valid:
+        if not self.__verify_list("agg", "Aggregator", agg_msg_list, agg_signatures):
             print("Aggregators were not verified")
-            for i, msg, is_valid in agg_results:
-                if not is_valid:
-                    print(f"Aggregator ID {msg} at index {i} failed verification.")
             return False
         
         # Verify DSO signatures on the DR Aggregator list
-        dr_valid, dr_results =  self.sig.schnorr_verify_list(self.pk[0], self.pk[1], dr_msg_list, dr_signatures)
-        if not dr_valid:
+        if not self.__verify_list("dr", "dr", dr_msg_list, dr_signatures):
             print("drs were not verified")
-            for i, msg, is_valid in dr_results:
-                if not is_valid:
-                    print(f"dr ID {msg} at index {i} failed verification.")
             return False
         
         print("All smartmeters and aggregators were successfully verified.")
         return True
+
+    def __verify_list(self, label, name, msg_list, signatures):
+        """
+        Verifies the DSO signatures on one registration list.
+
+        Args:
+          label (str): The list, "sm", "agg" or "dr".
+          name (str): Entity name for the failure messages.
+          msg_list (list): The registered IDs.
+          signatures: One signature per ID, or a signed root {'size', 'root', 'signature'}.
+
+        Returns:
+            bool: True if the list is correctly signed.
+        """
+        if isinstance(signatures, dict):
+            root = MerkleTree(msg_list).root
+            if signatures["size"] != len(msg_list) or signatures["root"] != root:
+                print(f"{name} list does not match the signed Merkle root.")
+                return False
+            message = root_message(label, len(msg_list), root)
+            if not self.sig.schnorr_verify(self.pk[0], self.pk[1], message, signatures["signature"]):
+                print(f"{name} Merkle root signature failed verification.")
+                return False
+            self.registry_roots[label] = signatures
+            return True
+
+        valid, results = self.sig.schnorr_verify_list(self.pk[0], self.pk[1], msg_list, signatures)
+        if not valid:
+            for i, msg, is_valid in results:
+                if not is_valid:
+                    print(f"{name} ID {msg} at index {i} failed verification.")
+        return valid
+
+    def verify_registration(self, label, entity_id, index, proof):
+        """
+        Checks an inclusion proof (from `DSO.inclusion_proof`) against a signed list root.
+
+        Args:
+          label (str): The list, "sm", "agg" or "dr".
+          entity_id (str): The ID.
+          index (int): Its index in the list.
+          proof (list): The sibling hashes.
+
+        Returns:
+            bool: True if entity_id is in the list signed by the DSO, False otherwise.
+        """
+        signed_root = self.registry_roots.get(label)
+        if signed_root is None:
+            return False
+        return verify_inclusion(signed_root["root"], entity_id, index, signed_root["size"], proof)
     
     def get_sm_pk_by_id(self, sm_id):
         """
@@ -120,28 +181,172 @@ class Board:
     def get_target_reduction(self):
         return self.T_r
 
-    def publish_mix_pk_and_proof(self, mix_data):
+    def publish_mix_pk_and_proof(self, mix_data, wait=True, workers=None, compact=False):
         """
         Verifies and publishes the result of the Mix() shuffle.
         
         This checks the Zero-Knowledge Proof that the output list `pk_prime` is a 
-        valid permutation and re-randomization of the input keys.
+        valid permutation and re-randomization of the input keys. The proof is
+        batch verified; the per-equation checks only run if the batch check fails.
+        A sharded mix is verified bucket by bucket, in parallel given workers.
+
+        With wait=False the mix is published tentatively (`mix_verified` is None) and
+        the proof is verified on a background thread, which sets `mix_verified` to
+        True or False. Use `wait_for_mix_verification` before relying on the mix.
 
         Args:
           mix_data: tuple(Shuffled_PKs, Shuffle_Proof_Object)
+          wait (bool): Verify before returning instead of in the background.
+          workers (int, optional): Number of processes used to verify the proof.
+          compact (bool): Store the proof in its binary encoding (see `get_mix_proof`).
         """
         pk_prime, πmix = mix_data
         self.mix_pk = pk_prime
-        
-        shuffle = Shuffle(self.pk[1])
+        self.mix_proof = self.__encode_mix_proof(πmix) if compact else πmix
+        self.mix_verified = None
         
         # store e list to verify
         # Extract the list of public keys from the registered smart meters list e
         e = [sm[1][0] for sm in self.register_smartmeter]
-        
-        if not shuffle.verify_shuffle_proof(πmix, e, pk_prime, self.pk[1][1]):
+
+        if wait:
+            self.__verify_mix(πmix, e, pk_prime, workers)
+        else:
+            self.mix_verification = threading.Thread(target=self.__verify_mix, args=(πmix, e, pk_prime, workers), daemon=True)
+            self.mix_verification.start()
+
+    def __verify_mix(self, πmix, e, pk_prime, workers):
+        """
+        Verifies the shuffle proof of the published mix and records the outcome in `mix_verified`.
+        """
+        shuffle = Shuffle(self.pk[1])
+        try:
+            if is_sharded(πmix):
+                # the bucket proofs of both layers are verified in parallel
+                valid = verify_sharded_mix(self.pk[1], πmix, e, pk_prime, self.pk[1][1], workers)
+            else:
+                valid = shuffle.verify_shuffle_proof(πmix, e, pk_prime, self.pk[1][1], batch=True, workers=workers)
+        except AssertionError:
+            self.mix_verified = False
+            raise
+
+        if not valid:
             print("Mixing proof verification FAILED")
+        self.mix_verified = valid
+
+    def publish_mix_hop(self, mix_data, workers=None, compact=False):
+        """
+        Publishes one hop of a mix cascade and starts verifying its proof.
+
+        The input of the first hop is the list of registered smart meter keys, and the
+        input of every later hop is the output of the hop before it. Each hop's proof is
+        verified in a process pool, so the next hop can be published while earlier proofs
+        are still being checked and the hops are verified in parallel. The latest output
+        is published tentatively as `mix_pk` until `wait_for_mix_verification` succeeds.
+
+        Args:
+          mix_data: tuple(Shuffled_PKs, Shuffle_Proof_Object)
+          workers (int, optional): Number of processes verifying hops, set when the pool is
+            started; one per CPU if None.
+          compact (bool): Store the proof in its binary encoding.
+        """
+        pk_prime, πmix = mix_data
+
+        if not self.mix_hops:
+            e = [sm[1][0] for sm in self.register_smartmeter]
+        else:
+            e = self.mix_hops[-1][0]
+
+        # shut down again by wait_for_mix_verification once every hop is checked
+        if self.mix_pool is None:
+            self.mix_pool = ProcessPoolExecutor(max_workers=workers)
+
+        encoded = encode_points((πmix, e, pk_prime))
+        verification = self.mix_pool.submit(verify_encoded_mix, self.pk[1][0]._name, encoded)
+        if compact:
+            πmix = self.__encode_mix_proof(πmix)
+        self.mix_hops.append((pk_prime, πmix, verification))
+
+        self.mix_pk = pk_prime
         self.mix_proof = πmix
+        self.mix_verified = None
+
+    def __encode_mix_proof(self, πmix):
+        """
+        The binary encoding of a mix proof; for a sharded mix, of each bucket proof.
+        """
+        if is_sharded(πmix):
+            return dict(
+                πmix,
+                layer1=[encode_shuffle_proof(proof, self.pk[1]) for proof in πmix["layer1"]],
+                layer2=[encode_shuffle_proof(proof, self.pk[1]) for proof in πmix["layer2"]],
+            )
+        return encode_shuffle_proof(πmix, self.pk[1])
+
+    def get_mix_proof(self):
+        """
+        Returns the latest mix proof, decoding it if it is stored in binary form.
+
+        Returns:
+            dict: The shuffle proof (or sharded mix proof).
+        """
+        πmix = self.mix_proof
+        if isinstance(πmix, (bytes, memoryview)):
+            return decode_shuffle_proof(πmix, self.pk[1])
+        if is_sharded(πmix) and πmix["layer1"] and isinstance(πmix["layer1"][0], bytes):
+            return dict(
+                πmix,
+                layer1=[decode_shuffle_proof(proof, self.pk[1]) for proof in πmix["layer1"]],
+                layer2=[decode_shuffle_proof(proof, self.pk[1]) for proof in πmix["layer2"]],
+            )
+        return πmix
+
+    def mix_proof_sizes(self):
+        """
+        Reports the storage size of the mix proofs kept in binary form.
+
+        Returns:
+            list: Bytes per stored proof (per bucket proof for a sharded mix, per hop for a cascade).
+        """
+        hops = self.mix_hops
+        proofs = [hop[1] for hop in hops] if hops else [self.mix_proof]
+
+        sizes = []
+        for πmix in proofs:
+            if is_sharded(πmix):
+                sizes.extend(len(proof) for proof in πmix["layer1"] + πmix["layer2"] if isinstance(proof, bytes))
+            elif isinstance(πmix, bytes):
+                sizes.append(len(πmix))
+        return sizes
+
+    def wait_for_mix_verification(self, timeout=None):
+        """
+        Waits for a tentatively published mix (or every hop of a cascade) to be verified.
+
+        Once every hop is verified the process pool of `publish_mix_hop` is shut down.
+
+        Args:
+          timeout (float, optional): Seconds to wait; waits until done if None.
+
+        Returns:
+            bool: True or False once verified, None if still pending after timeout.
+        """
+        if self.mix_verification is not None:
+            self.mix_verification.join(timeout)
+
+        hops = self.mix_hops
+        if hops:
+            _, pending = wait_futures([hop[2] for hop in hops], timeout)
+            if pending:
+                return None
+            if self.mix_pool is not None:
+                self.mix_pool.shutdown()
+                self.mix_pool = None
+            self.mix_verified = all(hop[2].result() for hop in hops)
+            if not self.mix_verified:
+                failed = [i for i, hop in enumerate(hops) if not hop[2].result()]
+                print(f"Mixing proof verification FAILED for hop(s) {failed}")
+        return self.mix_verified
 
     def publish_participants(self, participants):
         """
@@ -202,6 +407,40 @@ class Board:
 
         self.anonym_reports = anonym_reports
         
+    def publish_signed_reports(self, signed_reports, consumption=False):
+        """
+        Verifies a batch of signed reports and stores it with a half-aggregated signature.
+
+        Every signature is verified on its own, since checking the half-aggregate is no
+        faster; the aggregate only keeps the stored batch at about half the signature size.
+
+        Args:
+          signed_reports: list of (pk, t, cts, encoding, signature) from `Aggregator.signed_report_batch`.
+          consumption (bool): The batch holds consumption instead of baseline reports.
+
+        Returns:
+            bool: True if every report signature is valid.
+        """
+        entries = [(pk, t, cts) for pk, t, cts, _, _ in signed_reports]
+        pks = [pk for pk, _, _ in entries]
+        msg_list = [
+            encode_report(t, cts, ElGamal.encoding_of(cts, encoding) == ElGamal.PACKED)
+            for _, t, cts, encoding, _ in signed_reports
+        ]
+        signatures = [signature for _, _, _, _, signature in signed_reports]
+
+        for pk, msg, signature in zip(pks, msg_list, signatures):
+            if not self.sig.schnorr_verify(pk, self.pk[1], msg, signature):
+                print("Report signature verification failed.")
+                return False
+
+        stored = (entries, self.sig.aggregate_signatures(self.pk[1], pks, msg_list, signatures))
+        if consumption:
+            self.signed_consumption_reports = stored
+        else:
+            self.signed_baseline_reports = stored
+        return True
+
     def publish_selected_sm(self, selected_w_sign):
         """
         Publishes the list of Smart Meters selected for the DR event.
@@ -1,6 +1,8 @@
 from src.utils.procedures import Procedures
-from src.utils.private_key_proof import schnorr_NIZKP_verify
+from src.utils.private_key_proof import schnorr_NIZKP_verify, schnorr_NIZKP_verify_batch
 from src.utils.elgamal_dec_proof import verify_correct_decryption
+from src.utils.merkle import MerkleTree, root_message
+from src.utils.precompute import register_key
 import random
 
 class DSO:
@@ -28,12 +30,18 @@ class DSO:
         self.registered_agg = []
         self.registered_dr = []
         self.agg_ek = {}
+        # Merkle trees over the registered IDs by list label, built by sign_registered_lists(merkle=True)
+        self.registry_trees = {}
         
         #  SKeyGen(id, pp) -> ((id, (pk, pp, proof)), sk)
         ((self.id, (self.pk, self.pp, self.s_proof)), self.__sk) = self.pro.skey_gen(init_id, pp)
         
         # Generate the main encryption key for the system and the shares for the aggregators
         ((self.ek, self.thresh_params, self.e_proof), self.__key_shares) = self.pro.ekey_gen(pp)
+
+        # every report is encrypted under ek and every DSO signature verified under pk
+        register_key(self.pk, self.pp[2])
+        register_key(self.ek, self.pp[2])
         
         self.i = 0
 
@@ -60,9 +68,35 @@ class DSO:
         # val = (pk, pp, proof)
         if schnorr_NIZKP_verify(val[0], val[1], val[2]):
             self.registered_sm.append((sm_id, val))
+            self.__add_to_tree("sm", sm_id)
         else:
             raise ValueError("failed to verify smart meter")
     
+    def verify_smartmeters_bulk(self, sm_infos):
+        """
+        Verifies a whole batch of smart meters (e.g. a new housing block) and registers the valid ones.
+
+        Unlike `verify_smartmeter`, an invalid proof does not raise: the batch is checked
+        under the DSO's public parameters and the failing IDs are returned.
+
+        Args:
+            sm_infos (list): (id, (pk, pp, proof)) per smart meter.
+
+        Returns:
+            list: The IDs whose proof failed; these meters are not registered.
+        """
+        items = [(pk, proof) for _, (pk, _, proof) in sm_infos]
+        results = schnorr_NIZKP_verify_batch(items, self.pp)
+
+        rejected = []
+        for (sm_id, val), valid in zip(sm_infos, results):
+            if valid:
+                self.registered_sm.append((sm_id, val))
+                self.__add_to_tree("sm", sm_id)
+            else:
+                rejected.append(sm_id)
+        return rejected
+
     def verify_aggregator(self, agg_info):
         """
         Verifies the Energy aggregator's NIZKP proof and adds it (if True) into a registered list.
@@ -77,6 +111,7 @@ class DSO:
         
         if schnorr_NIZKP_verify(val[0], val[1], val[2]):
             self.registered_agg.append((agg_id, val))
+            self.__add_to_tree("agg", agg_id)
         else:
             raise ValueError("failed to verify aggregator")
     
@@ -94,6 +129,7 @@ class DSO:
         # val = (pk, pp, proof) 
         if schnorr_NIZKP_verify(val[0], val[1], val[2]):
             self.registered_dr.append((dr_id, val))
+            self.__add_to_tree("dr", dr_id)
         else:
             raise ValueError("failed to verify dr aggregator")
     
@@ -200,7 +236,9 @@ class DSO:
         if not verify_correct_decryption(ek, pp, proof):
             raise ValueError("dso failed to verify aggregator's proof of correct decryption")
 
-        self.agg_ek[id] = ek  
+        self.agg_ek[id] = ek
+        # the key share is encrypted bitwise under ek
+        register_key(ek, self.pp[2])
 
     def encrypt_dk_and_send_to_agg(self, agg_id):
         """
@@ -258,20 +296,91 @@ class DSO:
 
         return x, enc_share, sig_share
 
-    def sign_registered_lists(self):
+    def precompute_signing(self, n, workers=None):
+        """
+        Precomputes n Schnorr nonces before registration closes.
+
+        `sign_registered_lists` then signs every entry with a hash and a modular
+        multiplication instead of a scalar multiplication.
+
+        Args:
+          n (int): Expected number of registered entities (SMs, aggregators, DR aggregators).
+          workers (int, optional): Number of processes for the precomputation.
+        """
+        self.pro.sig.start_nonce_pool(self.pp, size=n, workers=workers)
+
+    def __add_to_tree(self, label, entity_id):
+        """Appends a newly registered ID to its Merkle tree, if the list is signed by root."""
+        tree = self.registry_trees.get(label)
+        if tree is not None:
+            tree.append(entity_id)
+
+    def __sign_root(self, label, msg_list):
+        """
+        Signs the Merkle root over msg_list, reusing the tree kept up to date by registration.
+
+        Returns:
+            dict: {'size', 'root', 'signature'}
+        """
+        tree = self.registry_trees.get(label)
+        if tree is None or len(tree) != len(msg_list):
+            tree = MerkleTree(msg_list)
+            self.registry_trees[label] = tree
+
+        signature = self.pro.sig.schnorr_sign(self.__sk, self.pp, root_message(label, len(tree), tree.root))
+        return {'size': len(tree), 'root': tree.root, 'signature': signature}
+
+    def inclusion_proof(self, label, entity_id):
+        """
+        The inclusion proof of a registered ID under the signed root of its list.
+
+        Args:
+          label (str): The list, "sm", "agg" or "dr".
+          entity_id (str): The registered ID.
+
+        Returns:
+            tuple: (index, proof) for `verify_inclusion`.
+
+        Raises:
+            ValueError: If the lists were not signed by root or the ID is not registered.
+        """
+        tree = self.registry_trees.get(label)
+        registered = {"sm": self.registered_sm, "agg": self.registered_agg, "dr": self.registered_dr}[label]
+        if tree is None:
+            raise ValueError("registration lists are not signed by Merkle root")
+
+        for index, (registered_id, _) in enumerate(registered):
+            if registered_id == entity_id:
+                return index, tree.proof(index)
+        raise ValueError(f"{entity_id} is not registered")
+
+    def sign_registered_lists(self, merkle=False):
         """
         Cryptographically signs the lists of all Smart meters and both aggregators.
         
         This allows aggregators to verify that a Smart Meter 
         participating in the protocol is legitimate and registered with the DSO.
 
+        With merkle=True the DSO signs one Merkle root per list instead of every ID, so
+        the Board verifies three signatures in total and every entity can get an
+        O(log n) inclusion proof (`inclusion_proof`) for its ID.
+
+        Args:
+          merkle (bool): Sign the Merkle root of each list instead of each ID.
+
         Returns:
-            tuple: (SM_List, SM_Sigs, Agg_List, Agg_Sigs, DR_List, DR_Sigs)
+            tuple: (SM_List, SM_Sigs, Agg_List, Agg_Sigs, DR_List, DR_Sigs), where each
+            Sigs is a dict {'size', 'root', 'signature'} with merkle=True.
         """
         sm_msg_list = [sm_id for sm_id, _ in self.registered_sm]
         agg_msg_list = [agg_id for agg_id, _ in self.registered_agg]
         dr_msg_list = [dr_id for dr_id, _ in self.registered_dr]
 
+        if merkle:
+            return (self.registered_sm, self.__sign_root("sm", sm_msg_list),
+                    self.registered_agg, self.__sign_root("agg", agg_msg_list),
+                    self.registered_dr, self.__sign_root("dr", dr_msg_list))
+
         sm_signatures = self.pro.sig.schnorr_sign_list(self.__sk, self.pp, sm_msg_list)
         agg_signatures = self.pro.sig.schnorr_sign_list(self.__sk, self.pp, agg_msg_list)
         dr_signatures = self.pro.sig.schnorr_sign_list(self.__sk, self.pp, dr_msg_list)
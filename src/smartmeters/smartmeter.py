@@ -1,6 +1,9 @@
+import os
 import time
 import random
 from src.utils.elgamal_dec_proof import verify_correct_decryption
+from src.utils.ec_elgamal import ElGamal
+from src.utils.encryption_pool import EncryptionPool
 from src.utils.procedures import Procedures
 
 
@@ -14,8 +17,15 @@ class SmartMeter:
      - verifying its anonymized identity assignment.
      - generating signed, encrypted reports of energy consumption/reduction.
     """
-    def __init__(self, init_id="sm_id", pp=None):
+    def __init__(self, init_id="sm_id", pp=None, encoding=ElGamal.BITWISE):
+        """
+        Args:
+            init_id (str): The Smart Meter's identifier.
+            pp (tuple, optional): Public parameters.
+            encoding (str): Report encoding, ElGamal.BITWISE or ElGamal.PACKED.
+        """
         self.pro = Procedures()
+        self.encoding = encoding
         
         if pp is None:
            pp = self.pro.pub_param()
@@ -26,6 +36,7 @@ class SmartMeter:
         
         # as a default
         self.participating = False
+        self.pool = None
 
     def get_public_key(self):
         """
@@ -53,6 +64,49 @@ class SmartMeter:
         self.dso_pk = dso_pk
         self.dso_ek = dso_ek
 
+    def start_encryption_pool(self, size=64, path=None, background=True):
+        """
+        Starts precomputing encryption tokens for the DSO key while the Smart Meter is idle.
+
+        Reports are afterwards encrypted with the precomputed tokens, so report time only
+        costs point additions. The background thread keeps running until
+        `stop_encryption_pool` (or `save_encryption_pool`) is called.
+
+        Args:
+            size (int): Number of tokens kept ready.
+            path (str, optional): File with tokens persisted by `save_encryption_pool`.
+                                  Loaded once and removed so no token is used twice.
+            background (bool): Keep the pool topped up on a thread; if False, the pool is
+                               filled once now (an explicit idle period) and no thread is started.
+        """
+        self.pool = EncryptionPool(self.pp, self.dso_ek[0], size)
+        if path is not None and os.path.exists(path):
+            self.pool.load(path)
+            os.remove(path)
+        if background:
+            self.pool.start()
+        else:
+            self.pool.fill()
+
+    def stop_encryption_pool(self):
+        """
+        Stops the background precomputation, e.g. once the reports are sent, and drops the pool.
+        """
+        if self.pool is not None:
+            self.pool.stop()
+            self.pool = None
+
+    def save_encryption_pool(self, path):
+        """
+        Stops the background precomputation and persists the unused tokens.
+
+        Args:
+            path (str): File to write the tokens to.
+        """
+        self.pool.stop()
+        self.pool.save(path)
+        self.pool = None
+
     def set_agg_public_keys(self, agg_pk):
         """
         Stores the Aggregator's public key.
@@ -69,7 +123,7 @@ class SmartMeter:
         return (self.id, self.get_encryption_key(), self.pro.sig.schnorr_sign(self.__sk, self.pp, message_to_verify))
     
 
-    def set_anon_key(self, anon_key_w_sign):
+    def set_anon_key(self, anon_key_w_sign, agg_pk=None):
         """ 
         Receives the randomness (blinding factor) used in Mix_id().
         
@@ -78,11 +132,16 @@ class SmartMeter:
         pk' = pk + g*r'
         
         It also verifies the Aggregator's signature on this assignment to ensure authenticity.
+        In a mix cascade this is called once per hop, in hop order.
 
         Args:
             anon_key (tuple): A tuple containing (r_prime, signature).
                               r_prime is the blinding factor (EC Point or Scalar).
+            agg_pk (tuple, optional): Public key package of the hop that sent it; the
+                                      Aggregator's key set by `set_agg_public_keys` if None.
         """
+        if agg_pk is None:
+            agg_pk = self.agg_pk
         enc_anon_key, signature = anon_key_w_sign
         
         x = self.pro.ahe.dec(self.__dk, enc_anon_key[0])
@@ -92,13 +151,23 @@ class SmartMeter:
         anon_key = _point.EccPoint(x, y, self.pp[0]._name)
         
         # anon_key_verified = self.pro.sig.schnorr_verify(self.agg_pk[0], self.agg_pk[1], str(r_prime), signature)
-        anon_key_verified = self.pro.sig.schnorr_verify(self.agg_pk[0], self.agg_pk[1], str(x) + str(y), signature)
+        anon_key_verified = self.pro.sig.schnorr_verify(agg_pk[0], agg_pk[1], str(x) + str(y), signature)
         if not anon_key_verified:
             raise ValueError("Anonymous key signature verification failed.")
         
         # The final Point on the curve (pk'). This is what the rest of the network sees as the sm identity.
         # self.anon_id = r_prime * self.pp[1]
         self.anon_id = anon_key
+        self.anon_key_signature = signature
+
+    def get_anon_key(self):
+        """
+        Returns the latest anonymous key and the signature of the hop that assigned it.
+
+        Returns:
+            tuple: (anon_key, signature)
+        """
+        return (self.anon_id, self.anon_key_signature)
 
     def get_sm_baseline(self, m):
         """
@@ -116,7 +185,7 @@ class SmartMeter:
             self.participating = True
 
         t = int(time.time())
-        baseline_report = self.pro.report(self.id, self.__sk, self.dso_ek, m, t, self.get_public_key())
+        baseline_report = self.pro.report(self.id, self.__sk, self.dso_ek, m, t, self.get_public_key(), self.pool, self.encoding)
         return baseline_report
     
     def get_sm_consumption(self):
@@ -133,7 +202,7 @@ class SmartMeter:
 
         # consume = random.randint(9, 10)
         consume = 8
-        consumption_report = self.pro.report(self.id, self.__sk, self.dso_ek, consume, t, self.get_public_key())
+        consumption_report = self.pro.report(self.id, self.__sk, self.dso_ek, consume, t, self.get_public_key(), self.pool, self.encoding)
         return consumption_report
     
     def is_participating(self):
@@ -0,0 +1,218 @@
+import math
+import mmap
+import os
+import struct
+import tempfile
+import threading
+from src.utils.precompute import generator_mul
+
+class BabyStepTable:
+    """
+    Baby-step giant-step (BSGS) decoder for m * G with 0 <= m <= max_value.
+
+    The baby steps j * G for j in [0, s), s = ceil(sqrt(max_value + 1)), are stored on disk
+    as a sorted array of fixed-size records (x-coordinate key, j). The file is memory-mapped
+    read-only, so every worker process on a machine shares the same pages. A lookup then
+    takes at most s giant steps P - i * s * G and one binary search per step.
+
+    File layout (big-endian):
+        header: magic (8s), version (H), curve name (16s), max_value (Q), steps (Q)
+        records: key (Q), j (I), sorted by key
+
+    References:
+        - Shanks' baby-step giant-step, "Handbook of Applied Cryptography" (Menezes, van Oorschot, Vanstone) algorithm 3.56
+    """
+    MAGIC = b"PPDRBSGS"
+    VERSION = 1
+    HEADER = struct.Struct(">8sH16sQQ")
+    RECORD = struct.Struct(">QI")
+
+    def __init__(self, path, pp):
+        """
+        Opens and memory-maps an existing table.
+
+        Args:
+            path (str): The table file written by `build`.
+            pp (tuple): Public parameters (curve, G, order).
+
+        Raises:
+            ValueError: If the file is not a table for this curve.
+        """
+        self.path = path
+        self.pp = pp
+
+        with open(path, "rb") as f:
+            self.map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, version, curve_name, self.max_value, self.steps = self.HEADER.unpack_from(self.map, 0)
+        if magic != self.MAGIC or version != self.VERSION:
+            raise ValueError(f"{path} is not a baby-step table")
+        if curve_name.rstrip(b"\0").decode() != pp[0]._name:
+            raise ValueError(f"{path} was built for another curve")
+
+        self.count = (len(self.map) - self.HEADER.size) // self.RECORD.size
+
+        # -(steps * G), added once per giant step
+        self.giant_step = -generator_mul(self.steps, pp)
+
+    @staticmethod
+    def _key(point):
+        """The lookup key of a point: the low 64 bits of its x-coordinate."""
+        return int(point.x) & 0xFFFFFFFFFFFFFFFF
+
+    @classmethod
+    def build(cls, path, pp, max_value):
+        """
+        Computes the baby steps for max_value, writes them to path and opens the result.
+
+        The file is written to a temporary name first and moved into place, so other
+        processes never map a half-written table.
+
+        Args:
+            path (str): Where to store the table.
+            pp (tuple): Public parameters (curve, G, order).
+            max_value (int): Largest plaintext the table must decode.
+
+        Returns:
+            BabyStepTable: The opened table.
+        """
+        steps = math.isqrt(max_value) + 1
+
+        # j = 0 is the identity and is handled before any lookup
+        records = []
+        point = pp[1]
+        for j in range(1, steps):
+            records.append((cls._key(point), j))
+            point = point + pp[1]
+        records.sort()
+
+        header = cls.HEADER.pack(cls.MAGIC, cls.VERSION, pp[0]._name.encode(), max_value, steps)
+
+        directory = os.path.dirname(os.path.abspath(path))
+        fd, tmp_path = tempfile.mkstemp(dir=directory)
+        with os.fdopen(fd, "wb") as f:
+            f.write(header)
+            for key, j in records:
+                f.write(cls.RECORD.pack(key, j))
+        os.replace(tmp_path, path)
+
+        return cls(path, pp)
+
+    def __lookup(self, key):
+        """
+        Binary search for key. Returns every j stored under it (usually zero or one).
+        """
+        lo, hi = 0, self.count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            mid_key, _ = self.RECORD.unpack_from(self.map, self.HEADER.size + mid * self.RECORD.size)
+            if mid_key < key:
+                lo = mid + 1
+            else:
+                hi = mid
+
+        found = []
+        while lo < self.count:
+            lo_key, j = self.RECORD.unpack_from(self.map, self.HEADER.size + lo * self.RECORD.size)
+            if lo_key != key:
+                break
+            found.append(j)
+            lo += 1
+        return found
+
+    def solve(self, point, max_value=None):
+        """
+        Recovers m from m * G.
+
+        Args:
+            point (ECC.EccPoint): The point m * G.
+            max_value (int, optional): Upper bound on m, at most the table's max_value.
+
+        Returns:
+            int: The message m.
+
+        Raises:
+            ValueError: If m is outside [0, max_value].
+        """
+        if max_value is None or max_value > self.max_value:
+            max_value = self.max_value
+
+        current = point
+        for i in range(self.steps + 1):
+            base = i * self.steps
+            if base > max_value:
+                break
+
+            if current.is_point_at_infinity():
+                return base
+
+            # x only fixes the point up to sign, so check the candidate
+            for j in self.__lookup(self._key(current)):
+                candidate = base + j
+                if candidate <= max_value and generator_mul(candidate, self.pp) == point:
+                    return candidate
+
+            current = current + self.giant_step
+
+        raise ValueError("decrypted value is outside the decodable range")
+
+    def close(self):
+        """Unmaps the table file."""
+        self.map.close()
+
+
+# One table per (curve, max_value) per process; the pages themselves are shared via mmap
+_tables = {}
+_tables_lock = threading.Lock()
+
+def default_table_path(pp, max_value):
+    """
+    The file used for a table when no path is configured.
+
+    The directory can be set with the PPDRS_DLOG_DIR environment variable.
+    """
+    directory = os.environ.get("PPDRS_DLOG_DIR", tempfile.gettempdir())
+    return os.path.join(directory, f"ppdrs_bsgs_{pp[0]._name}_{max_value}.bin")
+
+def get_table(pp, max_value, path=None):
+    """
+    Returns the shared baby-step table for pp and max_value.
+
+    The table is memory-mapped from disk if the file exists and built (and saved) otherwise.
+
+    Args:
+        pp (tuple): Public parameters (curve, G, order).
+        max_value (int): Largest plaintext the table must decode.
+        path (str, optional): Table file. Uses `default_table_path` if None.
+
+    Returns:
+        BabyStepTable: The table.
+    """
+    key = (pp[0]._name, max_value)
+    table = _tables.get(key)
+    if table is None:
+        with _tables_lock:
+            table = _tables.get(key)
+            if table is None:
+                if path is None:
+                    path = default_table_path(pp, max_value)
+                if os.path.exists(path):
+                    table = BabyStepTable(path, pp)
+                else:
+                    table = BabyStepTable.build(path, pp, max_value)
+                _tables[key] = table
+    return table
+
+def solve(point, pp, max_value):
+    """
+    Recovers m from m * G for 0 <= m <= max_value using the shared table.
+
+    Args:
+        point (ECC.EccPoint): The point m * G.
+        pp (tuple): Public parameters (curve, G, order).
+        max_value (int): Largest plaintext to look for.
+
+    Returns:
+        int: The message m.
+    """
+    return get_table(pp, max_value).solve(point)
@@ -1,5 +1,7 @@
 import threshold_crypto as tc
 from Crypto.PublicKey import ECC
+from src.utils.precompute import generator_mul, point_mul
+import src.utils.dlog as dlog
 
 class ElGamal:
     """
@@ -11,6 +13,14 @@ class ElGamal:
         - code used for threshold decryption: https://github.com/hyperion-voting/hyperion/blob/main/primitives.py#L227, https://github.com/tompetersen/threshold-crypto
         - Inspired by ElGamal encryption: https://github.com/gdanezis/petlib/blob/master/examples/AHEG.py
     """
+    # Encoding (format tag) of an encrypted integer:
+    # BITWISE is a list of (C1, C2), one per bit. PACKED is a single (C1, C2) encrypting m * G.
+    BITWISE = "bitwise"
+    PACKED = "packed"
+
+    # Largest integer the bounded discrete log decoder recovers from a PACKED ciphertext
+    MAX_PACKED_VALUE = 2 ** 16
+
     def __init__(self, curve="P-256"):
         if isinstance(curve, str):
             self.curve = tc.CurveParameters(curve)
@@ -20,6 +30,9 @@ class ElGamal:
         else:
             self.curve = curve[0]
             self.pp = (curve[0], curve[1], curve[2])
+
+        # frozenset(share indices) -> {index: Lagrange coefficient}
+        self._lagrange_cache = {}
             
     def keygen(self, pp=None):
         """
@@ -35,7 +48,7 @@ class ElGamal:
             self.pp = pp
 
         x = tc.number.random_in_range(2, self.pp[2])
-        ek = x * self.pp[1]
+        ek = generator_mul(x, self.pp)
         dk = x
         return ((ek, self.pp), dk) 
 
@@ -80,14 +93,14 @@ class ElGamal:
         r = tc.number.random_in_range(2, self.pp[2])
     
         if isinstance(message, int):
-            message = message * self.pp[1]
+            message = generator_mul(message, self.pp)
 
-        c1 = r * self.pp[1]
-        c2 = (r * encryption_key) + message
+        c1 = generator_mul(r, self.pp)
+        c2 = point_mul(r, encryption_key, self.pp[2]) + message
         
         return (c1, c2)
     
-    def enc(self, encryption_key: ECC.EccPoint, message: int, r=None):
+    def enc(self, encryption_key: ECC.EccPoint, message: int, r=None, pool=None):
         """
         Performs bitwise encryption of an integer message.
         
@@ -98,22 +111,105 @@ class ElGamal:
             encryption_key (ECC.EccPoint): The recipient's public key.
             message (int): The integer message to encrypt.
             r (int, optional): A specific random scalar to use. If None, one is generated.
+            pool (EncryptionPool, optional): Precomputed tokens for encryption_key. If given
+                (and r is None), each bit is encrypted with its own token.
 
         Returns:
             list: A list of (C1, C2) tuples, one for each bit of the message.
         """
         list_bits = self.__int_to_bits(message)
+
+        if pool is not None and r is None:
+            return [pool.encrypt_bit(bit) for bit in list_bits]
+
         encryptions = []
         for bit in list_bits:
             if r is None:
                 r = tc.number.random_in_range(2, self.pp[2])
-            bit_point = bit * self.pp[1]
-            c1 = r * self.pp[1]
-            c2 = (r * encryption_key) + bit_point
+            bit_point = generator_mul(bit, self.pp)
+            c1 = generator_mul(r, self.pp)
+            c2 = point_mul(r, encryption_key, self.pp[2]) + bit_point
             encryptions.append((c1, c2))
 
         return encryptions
     
+    def enc_packed(self, encryption_key: ECC.EccPoint, message: int, r=None, pool=None):
+        """
+        Encrypts an integer as a single ciphertext (PACKED encoding).
+
+        The message is mapped to m * G, so one (C1, C2) replaces the list of bit-ciphertexts.
+        Decryption recovers m * G and needs a bounded discrete log to get back m.
+
+        Args:
+            encryption_key (ECC.EccPoint): The recipient's public key.
+            message (int): The integer message to encrypt (0 <= m <= MAX_PACKED_VALUE).
+            r (int, optional): A specific random scalar to use. If None, one is generated.
+            pool (EncryptionPool, optional): Precomputed tokens for encryption_key.
+
+        Returns:
+            tuple: (C1, C2)
+
+        Raises:
+            ValueError: If message is outside [0, MAX_PACKED_VALUE].
+        """
+        if not 0 <= message <= self.MAX_PACKED_VALUE:
+            raise ValueError(f"packed message {message} outside [0, {self.MAX_PACKED_VALUE}]")
+
+        if pool is not None and r is None:
+            return pool.encrypt_packed(message)
+
+        if r is None:
+            r = tc.number.random_in_range(2, self.pp[2])
+
+        c1 = generator_mul(r, self.pp)
+        c2 = point_mul(r, encryption_key, self.pp[2]) + generator_mul(message, self.pp)
+        return (c1, c2)
+
+    @staticmethod
+    def encoding_of(ciphertexts, encoding=None):
+        """
+        Returns the format tag of an encrypted integer.
+
+        An explicit tag wins. Without one the elements decide, not the container type:
+        a sequence of (C1, C2) pairs is BITWISE and a single pair of points is PACKED.
+
+        Args:
+            ciphertexts: A sequence of (C1, C2) pairs or a single (C1, C2) pair.
+            encoding (str, optional): Explicit format tag.
+
+        Returns:
+            str: ElGamal.BITWISE or ElGamal.PACKED
+        """
+        if encoding is not None:
+            if encoding not in (ElGamal.BITWISE, ElGamal.PACKED):
+                raise ValueError(f"unknown encoding: {encoding}")
+            return encoding
+        if len(ciphertexts) == 0 or isinstance(ciphertexts[0], (tuple, list)):
+            return ElGamal.BITWISE
+        return ElGamal.PACKED
+
+    def bounded_dlog(self, point, max_value=None):
+        """
+        Recovers m from m * G for 0 <= m <= max_value.
+
+        Uses the shared, memory-mapped baby-step giant-step table from src.utils.dlog,
+        which is built and saved to disk the first time a given max_value is used.
+
+        Args:
+            point (ECC.EccPoint): The message point m * G.
+            max_value (int, optional): Upper bound on m. Uses MAX_PACKED_VALUE if None.
+
+        Returns:
+            int: The message m.
+
+        Raises:
+            ValueError: If m is outside [0, max_value].
+        """
+        if max_value is None:
+            max_value = self.MAX_PACKED_VALUE
+
+        return dlog.solve(point, self.pp, max_value)
+
     def __check_if_zero_or_one(self, message_points: list):
         """
         Maps decrypted EC points back to bits (0 or 1).
@@ -157,17 +253,22 @@ class ElGamal:
         s2 = c2 + c1_com
         return s2
     
-    def dec(self, secret_key, ciphertexts):
+    def dec(self, secret_key, ciphertexts, encoding=None):
         """
         Decrypts a list of bit-ciphertexts and reconstructs the original integer.
         
         Args:
             secret_key (int): The private key.
-            ciphertexts (list): A list of (C1, C2) tuples (one per bit).
+            ciphertexts (list): A list of (C1, C2) tuples (one per bit), or a single
+                                (C1, C2) tuple for the PACKED encoding.
+            encoding (str, optional): Format tag, inferred from ciphertexts if None.
 
         Returns:
             int: The reconstructed integer message.
         """
+        if self.encoding_of(ciphertexts, encoding) == self.PACKED:
+            return self.bounded_dlog(self.decrypt_single(secret_key, ciphertexts))
+
         point_messages = []
         for ciphertext in ciphertexts:
             c1 = ciphertext[0]
@@ -217,6 +318,10 @@ class ElGamal:
         Returns:
             list: A list of PartialDecryption objects containing the share index and the computed point.
         """
+        # a PACKED ciphertext is a single (C1, C2)
+        if self.encoding_of(ciphertexts) == self.PACKED:
+            ciphertexts = [ciphertexts]
+
         list_PartialDecryptions = []
         
         for ciphertext in ciphertexts:
@@ -226,11 +331,78 @@ class ElGamal:
         
         return list_PartialDecryptions
     
+    def lagrange_coefficients(self, partial_indices):
+        """
+        Returns the Lagrange coefficients for a set of key share indices.
+
+        The coefficients only depend on which shares take part, so they are computed once
+        per index set and cached on the instance.
+
+        Args:
+            partial_indices (list): The share indices (x) of the partial decryptions.
+
+        Returns:
+            list: The coefficient (int) for each index, in the order of partial_indices.
+        """
+        key = frozenset(partial_indices)
+        coefficients = self._lagrange_cache.get(key)
+        if coefficients is None:
+            indices = sorted(key)
+            coefficients = {
+                idx: int(tc.lagrange_coefficient_for_key_share_indices(indices, idx, self.curve).coefficient)
+                for idx in indices
+            }
+            self._lagrange_cache[key] = coefficients
+
+        return [coefficients[idx] for idx in partial_indices]
+
+    def __partials_by_share(self, partial_decryptions, num_bits):
+        """
+        Splits the flat list [share0_bit0, share0_bit1, ..., share1_bit0, share1_bit1, ...]
+        into [[share0_bit0, share0_bit1, ...], [share1_bit0, share1_bit1, ...]].
+        """
+        num_shares = len(partial_decryptions) // num_bits
+        return [partial_decryptions[share_i * num_bits:(share_i + 1) * num_bits] for share_i in range(num_shares)]
+
+    def threshold_combine(self, partials_by_share, ciphertexts):
+        """
+        Batch threshold combine for every ciphertext of an event.
+
+        The Lagrange coefficients are looked up once and applied across all ciphertexts:
+        M_i = C2_i - sum_j(lambda_j * D_ji), where D_ji is share j's partial decryption of ciphertext i.
+
+        Args:
+            partials_by_share (list): One list of PartialDecryption objects per key share,
+                                      each aligned with ciphertexts.
+            ciphertexts (list): List of (C1, C2) tuples.
+
+        Returns:
+            list: The message point of each ciphertext.
+        """
+        partial_indices = [partials[0].x for partials in partials_by_share]
+        lagrange_coefficients = self.lagrange_coefficients(partial_indices)
+
+        message_points = []
+        for i, (c1, c2) in enumerate(ciphertexts):
+            summands = [
+                lagrange_coefficients[j] * partials_by_share[j][i].yC1
+                for j in range(len(partials_by_share))
+            ]
+
+            # homomorphic property
+            accumulated_point = tc.number.ecc_sum(summands)
+
+            # Recover the message point: M = C2 - (nonce * decryption key * g) where (...) is the sum in accumulated_point
+            message_points.append(c2 + (-accumulated_point))
+
+        return message_points
+
     def threshold_decrypt(
         self,
         partial_decryptions: list,
         encrypted_message: list,
         threshold_params: tc.ThresholdParameters,
+        encoding=None,
     ):
         """
         Combines multiple partial decryptions to obtain the original integer message.
@@ -243,59 +415,25 @@ class ElGamal:
 
         Args:
             partial_decryptions (list): Flat list of PartialDecryption objects from all participants.
-            encrypted_message (list): List of (C1, C2) tuples representing the encrypted bits.
+            encrypted_message (list): List of (C1, C2) tuples representing the encrypted bits,
+                                      or a single (C1, C2) tuple for the PACKED encoding.
             threshold_params (tc.ThresholdParameters): Parameters used for the secret sharing scheme.
+            encoding (str, optional): Format tag, inferred from encrypted_message if None.
 
         Returns:
             ECC.EccPoint: The reconstructed message as a point on the curve (Message_Value * g).
         """
+        # A PACKED ciphertext already decrypts to Message_Value * g
+        if self.encoding_of(encrypted_message, encoding) == self.PACKED:
+            return self.threshold_decrypt_point(partial_decryptions, encrypted_message)
         
         num_bits = len(encrypted_message)
         
-        num_shares = len(partial_decryptions) // num_bits
-        
-        # Changing partial_decryptions from [share0_bit0, share0_bit1, ..., share1_bit0, share1_bit1, ...]
-        # to [[share0_bit0, share1_bit0], [share0_bit1, share1_bit1], ...]
-        partial_by_bit = []
-        for i in range(num_bits):
-            bit_partials = []
-            for share_i in range(num_shares):
-                pd = partial_decryptions[share_i * num_bits + i]
-                bit_partials.append(pd)
-            
-            # [share0_bit0, share1_bit0]
-            partial_by_bit.append(bit_partials)
-        
-        # Decrypt each bit position
-        decrypted_bits = []
-        for i, bit_partials in enumerate(partial_by_bit):
-            c1, c2 = encrypted_message[i]
-            
-            partial_indices = [dec.x for dec in bit_partials]
-            
-            # Lagrange coefficients are used to combine the partial decryptions from key shares to
-            # reconstruct the decryption key (or its effect) and thus recover the original message.
-            lagrange_coefficients = [
-                tc.lagrange_coefficient_for_key_share_indices(
-                    partial_indices, idx, self.curve
-                )
-                for idx in partial_indices
-            ]
-            
-            summands = [
-                (lagrange_coefficients[i].coefficient * bit_partials[i].yC1)
-                for i in range(0, len(bit_partials))
-            ]
-            
-            # homomorphic property
-            accumulated_point = tc.number.ecc_sum(summands)
-            
-            # Recover the message point: M = C2 - (nonce * decryption key * g) where (...) is the sum in accumulated_point
-            restored_point = c2 + (-accumulated_point)
-            
-            bit = self.__check_if_zero_or_one([restored_point])[0]
-            
-            decrypted_bits.append(bit)
+        # Decrypt each bit position (all bits share the same Lagrange coefficients)
+        restored_points = self.threshold_combine(
+            self.__partials_by_share(partial_decryptions, num_bits), encrypted_message
+        )
+        decrypted_bits = self.__check_if_zero_or_one(restored_points)
         
         # Convert bits back to integer
         decrypted_message = self.__bits_to_int(decrypted_bits)
@@ -309,6 +447,7 @@ class ElGamal:
         self,
         partial_decryptions: list,
         encrypted_message: list,
+        encoding=None,
     ):
         """
         An Eval variant of threshold decryption that returns the integer value directly.
@@ -318,48 +457,23 @@ class ElGamal:
 
         Args:
             partial_decryptions (list): Flat list of PartialDecryption objects.
-            encrypted_message (list): List of (C1, C2) tuples.
+            encrypted_message (list): List of (C1, C2) tuples, or a single (C1, C2) tuple
+                                      for the PACKED encoding.
+            encoding (str, optional): Format tag, inferred from encrypted_message if None.
 
         Returns:
             int: The decrypted integer message.
         """
+        if self.encoding_of(encrypted_message, encoding) == self.PACKED:
+            message_point = self.threshold_decrypt_point(partial_decryptions, encrypted_message)
+            return self.bounded_dlog(message_point)
         
         num_bits = len(encrypted_message)
-        num_shares = len(partial_decryptions) // num_bits
-        
-        partial_by_bit = []
-        for i in range(num_bits):
-            bit_partials = []
-            for share_i in range(num_shares):
-                pd = partial_decryptions[share_i * num_bits + i]
-                bit_partials.append(pd)
-            
-            partial_by_bit.append(bit_partials)
-        
-        decrypted_bits = []
-        for i, bit_partials in enumerate(partial_by_bit):
-            c1, c2 = encrypted_message[i]
-            
-            partial_indices = [dec.x for dec in bit_partials]
 
-            lagrange_coefficients = [
-                tc.lagrange_coefficient_for_key_share_indices(
-                    partial_indices, idx, self.curve
-                )
-                for idx in partial_indices
-            ]
-            
-            summands = [
-                (lagrange_coefficients[i].coefficient * bit_partials[i].yC1)
-                for i in range(0, len(bit_partials))
-            ]
-            
-            accumulated_point = tc.number.ecc_sum(summands)
-            
-            restored_point = c2 + (-accumulated_point)
-            
-            bit = self.__check_if_zero_or_one([restored_point])[0]
-            decrypted_bits.append(bit)
+        restored_points = self.threshold_combine(
+            self.__partials_by_share(partial_decryptions, num_bits), encrypted_message
+        )
+        decrypted_bits = self.__check_if_zero_or_one(restored_points)
         
         decrypted_message = self.__bits_to_int(decrypted_bits)
 
@@ -378,15 +492,12 @@ class ElGamal:
         # Get share indices from the partial decryptions
         partial_indices = [dec.x for dec in partial_decryptions]
         
-        # Calculate Lagrange Coefficients 
-        lagrange_coefficients = [
-            tc.lagrange_coefficient_for_key_share_indices(partial_indices, idx, self.curve)
-            for idx in partial_indices
-        ]
+        # Lagrange Coefficients (cached per set of share indices)
+        lagrange_coefficients = self.lagrange_coefficients(partial_indices)
         
         # Weighted sum of the shares
         summands = [
-            (lagrange_coefficients[i].coefficient * partial_decryptions[i].yC1)
+            (lagrange_coefficients[i] * partial_decryptions[i].yC1)
             for i in range(len(partial_decryptions))
         ]
         
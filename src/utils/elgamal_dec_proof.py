@@ -1,25 +1,40 @@
-import hashlib
 import threshold_crypto as tc
+from src.utils.precompute import point_mul
+from src.utils.ec_elgamal import ElGamal
+from src.utils.transcript import Transcript
+from src.utils.msm import linear_combination
 
-def hash_to_int(*points, order):
+def _decryption_challenge(pp, ek, ciphertext, m_point, V, commitment_CT):
     """
-    Hash EC points deterministically into a scalar mod q.
-    
-    Args:
-        *points: Variable number of arguments (EC Points, integers, etc.).
-        order: The curve order (q).
+    Fiat-Shamir challenge of a proof of correct decryption, over a `Transcript`.
+
+    Returns:
+        int: A scalar value in [0, order-1].
+    """
+    transcript = Transcript(b"elgamal-decryption")
+    transcript.absorb_point(b"g", pp[1])
+    transcript.absorb_point(b"ek", ek)
+    transcript.absorb_ciphertexts(b"ct", ciphertext)
+    transcript.absorb_point(b"M", m_point)
+    transcript.absorb_point(b"V", V)
+    transcript.absorb_ciphertexts(b"A", commitment_CT)
+    return transcript.challenge(b"c", pp[2])
+
+def _share_challenge(pp, share_commitment, ct1, D_i, A1, A2):
+    """
+    Fiat-Shamir challenge of a partial decryption share DLEQ proof, over a `Transcript`.
 
     Returns:
         int: A scalar value in [0, order-1].
     """
-    h = hashlib.sha256()
-    for P in points:
-        if hasattr(P, "x") and hasattr(P, "y"):
-            h.update(int(P.x).to_bytes(32, "big"))
-            h.update(int(P.y).to_bytes(32, "big"))
-        else:
-            h.update(str(P).encode())
-    return int.from_bytes(h.digest(), "big") % int(order)
+    transcript = Transcript(b"partial-decryption-share")
+    transcript.absorb_point(b"g", pp[1])
+    transcript.absorb_point(b"E_i", share_commitment)
+    transcript.absorb_point(b"C1", ct1)
+    transcript.absorb_point(b"D_i", D_i)
+    transcript.absorb_point(b"A1", A1)
+    transcript.absorb_point(b"A2", A2)
+    return transcript.challenge(b"c", pp[2])
 
 def prove_correct_decryption(ek, pp, m, dk, ciphertext):
     """
@@ -59,7 +74,7 @@ def prove_correct_decryption(ek, pp, m, dk, ciphertext):
     # V = C2 - M
     V = ct_1 + (-m_point)
     
-    challenge = hash_to_int(pp[1], ek, ct_0, ct_1, m_point, V, commitment_ct_0, commitment_ct_1, order=pp[2])
+    challenge = _decryption_challenge(pp, ek, (ct_0, ct_1), m_point, V, commitment_CT)
     
     if isinstance(dk, list):
         dk = dk[0]
@@ -92,10 +107,10 @@ def verify_correct_decryption(ek, pp, proof):
     # V = C2 - M
     V = ct_1 + (-m_point)
     
-    c = hash_to_int(pp[1], ek, ct_0, ct_1, m_point, V, commitment_ct_0, commitment_ct_1, order=pp[2])
+    c = _decryption_challenge(pp, ek, (ct_0, ct_1), m_point, V, commitment_CT)
 
     # check1: s * g == A1 + c * ek
-    check1 = (s * pp[1] == commitment_ct_0 + (c * ek))
+    check1 = (s * pp[1] == commitment_ct_0 + point_mul(c, ek, pp[2]))
 
     # check2: s * C1 == A2 + c * V
     check2 = (s * ct_0 == commitment_ct_1 + (c * V))
@@ -140,15 +155,7 @@ def prove_partial_decryption_share(pp, ct, key_share):
     A2 = t * ct1
 
     # Challenge
-    c = hash_to_int(
-        g,
-        share_commitment,  # E_i
-        ct1,
-        D_i,
-        A1,
-        A2,
-        order=order
-    )
+    c = _share_challenge(pp, share_commitment, ct1, D_i, A1, A2)
 
     # Response
     z = (t + c * y_i) % order
@@ -180,15 +187,7 @@ def verify_partial_decryption_share(pp, ct, proof):
     A1, A2, z, D_i, share_commitment = proof
 
     # Recompute challenge
-    c = hash_to_int(
-        g,
-        share_commitment,  # E_i
-        ct1,
-        D_i,
-        A1,
-        A2,
-        order=order
-    )
+    c = _share_challenge(pp, share_commitment, ct1, D_i, A1, A2)
 
     # Check 1
     lhs1 = int(z) * g
@@ -198,4 +197,113 @@ def verify_partial_decryption_share(pp, ct, proof):
     lhs2 = int(z) * ct1
     rhs2 = A2 + int(c) * D_i
 
-    return lhs1 == rhs1 and lhs2 == rhs2
\ No newline at end of file
+    return lhs1 == rhs1 and lhs2 == rhs2
+def _batch_share_statement(pp, share_commitment, cts, D_list):
+    """
+    Folds the statement log_g(E_i) == log_{C1_j}(D_j) for all j into one DLEQ instance.
+
+    The weights rho_j are Fiat-Shamir challenges over the whole statement, so
+    C = Σ rho_j * C1_j and D = Σ rho_j * D_j satisfy D = y_i * C for the prover's y_i
+    only if every D_j = y_i * C1_j (except with probability ~n/q).
+
+    Returns:
+        tuple: (transcript, C, D), the transcript having absorbed the statement.
+    """
+    g = pp[1]
+    C1_list = [ct[0] for ct in cts]
+
+    transcript = Transcript(b"partial-decryption-batch")
+    transcript.absorb_point(b"g", g)
+    transcript.absorb_point(b"E_i", share_commitment)
+    transcript.absorb_points(b"C1", C1_list)
+    transcript.absorb_points(b"D", D_list)
+    rho = transcript.challenges(b"rho", len(C1_list), pp[2])
+
+    C = linear_combination(rho, C1_list)
+    D = linear_combination(rho, D_list)
+    infinity = 0 * g
+    return transcript, infinity if C is None else C, infinity if D is None else D
+
+def collect_partial_decryptions(ct, partials, cts, D_list):
+    """
+    Appends the (C1, C2) pairs of one report and their partial decryptions y_i * C1
+    to the statement lists of `prove_partial_decryption_shares`.
+
+    Args:
+        ct: The report ciphertext, bitwise [(C1, C2), ...] or PACKED (C1, C2).
+        partials (list): Its partial decryptions from `ElGamal.partial_decrypt`.
+        cts (list): The ciphertexts collected so far, extended in place.
+        D_list (list): The partial decryptions collected so far, extended in place.
+    """
+    if ElGamal.encoding_of(ct) == ElGamal.PACKED:
+        ct = [ct]
+    cts.extend(ct)
+    D_list.extend(partial.yC1 for partial in partials)
+
+def prove_partial_decryption_shares(pp, cts, key_share, D_list=None):
+    """
+    Creates one Chaum–Pedersen DLEQ proof for the partial decryptions of many ciphertexts.
+
+    Proves log_g(E_i) == log_{C1_j}(D_j) for every ciphertext j: the C1s and D_js are
+    combined with random weights (`_batch_share_statement`) and a single DLEQ proof is
+    made on the sums. Proving and verifying take one scalar multiplication per C1_j
+    (and per D_j), against two per ciphertext for separate proofs.
+
+    Args:
+        pp (tuple): Public parameters.
+        cts (list): The ciphertexts (C1, C2).
+        key_share (tc.KeyShare): The object containing the secret scalar y_i.
+        D_list (list, optional): The partial decryptions y_i * C1_j, if already computed.
+
+    Returns:
+        tuple: (A1, A2, z, D_list, share_commitment)
+    """
+    g = pp[1]
+    order = pp[2]
+    y_i = key_share.y
+    share_commitment = int(y_i) * g  # E_i
+
+    if D_list is None:
+        D_list = [y_i * ct[0] for ct in cts]
+
+    transcript, C, _ = _batch_share_statement(pp, share_commitment, cts, D_list)
+
+    # Commitments on the combined instance
+    t = tc.number.random_in_range(1, order)
+    A1 = t * g
+    A2 = t * C
+
+    transcript.absorb_point(b"A1", A1)
+    transcript.absorb_point(b"A2", A2)
+    c = transcript.challenge(b"c", order)
+
+    z = (t + c * int(y_i)) % order
+    return (A1, A2, z, D_list, share_commitment)
+
+def verify_partial_decryption_shares(pp, cts, proof):
+    """
+    Verifies a proof from `prove_partial_decryption_shares`.
+
+    Checks on the combined instance (C, D):
+      z * G == A1 + c * E_i
+      z * C == A2 + c * D
+
+    Args:
+        pp (tuple): Public parameters.
+        cts (list): The ciphertexts (C1, C2).
+        proof (tuple): (A1, A2, z, D_list, share_commitment)
+
+    Returns:
+        bool: True if every partial decryption in D_list is correct, False otherwise.
+    """
+    g = pp[1]
+    A1, A2, z, D_list, share_commitment = proof
+    if len(D_list) != len(cts) or not cts:
+        return False
+
+    transcript, C, D = _batch_share_statement(pp, share_commitment, cts, D_list)
+    transcript.absorb_point(b"A1", A1)
+    transcript.absorb_point(b"A2", A2)
+    c = transcript.challenge(b"c", pp[2])
+
+    return int(z) * g == A1 + c * share_commitment and int(z) * C == A2 + c * D
@@ -0,0 +1,188 @@
+import json
+import threading
+from collections import deque
+import threshold_crypto as tc
+from Crypto.PublicKey import ECC
+from src.utils.precompute import generator_mul, point_mul
+
+class EncryptionPool:
+    """
+    Offline/online ElGamal encryption for a fixed encryption key.
+
+    The pool precomputes tokens (r * G, r * ek) while the owner is idle. Encrypting a
+    bit online is then C1 = r * G and C2 = r * ek + bit * G, i.e. at most one point
+    addition, which flattens the load when many reports are due at the same time.
+
+    Note:
+        A token is as secret as the randomness r, since r * ek unmasks the message.
+        Persisted pools must therefore be kept in the same protected storage as the
+        smart meter's own secret keys.
+
+    References:
+        - Offline/online encryption, "On-line/Off-line Digital Signatures" (Even, Goldreich, Micali, 1989)
+    """
+    def __init__(self, pp, encryption_key, size=64):
+        """
+        Args:
+            pp (tuple): Public parameters (curve, G, order).
+            encryption_key (ECC.EccPoint): The key the tokens are computed for (the DSO ek).
+            size (int): Number of tokens the background worker keeps ready.
+        """
+        self.pp = pp
+        self.encryption_key = encryption_key
+        self.size = size
+
+        self.tokens = deque()
+        self.lock = threading.Lock()
+        self.stop_event = threading.Event()
+        self.wakeup = threading.Event()
+        self.worker = None
+
+    def __len__(self):
+        return len(self.tokens)
+
+    def new_token(self):
+        """
+        Computes one token (r * G, r * ek) for a fresh random r.
+
+        Returns:
+            tuple: (C1, r * ek)
+        """
+        r = tc.number.random_in_range(2, self.pp[2])
+        return (generator_mul(r, self.pp), point_mul(r, self.encryption_key, self.pp[2]))
+
+    def fill(self, n=None):
+        """
+        Synchronously adds tokens until the pool holds n of them.
+
+        Args:
+            n (int, optional): Target number of tokens. Uses the pool size if None.
+        """
+        target = self.size if n is None else n
+        while len(self.tokens) < target:
+            token = self.new_token()
+            with self.lock:
+                self.tokens.append(token)
+
+    def take(self):
+        """
+        Removes and returns one token. Falls back to computing one online if the pool is empty.
+
+        Returns:
+            tuple: (r * G, r * ek)
+        """
+        with self.lock:
+            token = self.tokens.popleft() if self.tokens else None
+
+        # let the background worker top the pool up again
+        self.wakeup.set()
+
+        if token is None:
+            return self.new_token()
+        return token
+
+    def encrypt_bit(self, bit):
+        """
+        Encrypts a single bit with a precomputed token.
+
+        Args:
+            bit (int): 0 or 1.
+
+        Returns:
+            tuple: (C1, C2)
+        """
+        c1, r_ek = self.take()
+        if bit:
+            return (c1, r_ek + self.pp[1])
+        return (c1, r_ek)
+
+    def encrypt_packed(self, message):
+        """
+        Encrypts an integer as a single PACKED ciphertext with a precomputed token.
+
+        Args:
+            message (int): The integer to encrypt.
+
+        Returns:
+            tuple: (C1, C2)
+        """
+        c1, r_ek = self.take()
+        if message:
+            return (c1, r_ek + generator_mul(message, self.pp))
+        return (c1, r_ek)
+
+    def start(self):
+        """
+        Starts a daemon thread that keeps the pool filled up to its size in the background.
+        """
+        if self.worker is not None and self.worker.is_alive():
+            return
+
+        self.stop_event.clear()
+        self.worker = threading.Thread(target=self.__run, daemon=True)
+        self.worker.start()
+
+    def stop(self):
+        """
+        Stops the background thread.
+        """
+        self.stop_event.set()
+        self.wakeup.set()
+        if self.worker is not None:
+            self.worker.join()
+            self.worker = None
+
+    def __run(self):
+        while not self.stop_event.is_set():
+            if len(self.tokens) < self.size:
+                token = self.new_token()
+                with self.lock:
+                    self.tokens.append(token)
+            else:
+                self.wakeup.wait()
+                self.wakeup.clear()
+
+    def save(self, path):
+        """
+        Persists the unused tokens to a file so they survive a restart.
+
+        The file should be loaded at most once and the in-memory pool discarded,
+        since reusing a token reuses its randomness.
+
+        Args:
+            path (str): File to write.
+        """
+        with self.lock:
+            tokens = list(self.tokens)
+
+        data = {
+            "curve": self.pp[0]._name,
+            "ek": [int(self.encryption_key.x), int(self.encryption_key.y)],
+            "tokens": [[int(c1.x), int(c1.y), int(r_ek.x), int(r_ek.y)] for c1, r_ek in tokens],
+        }
+        with open(path, "w") as f:
+            json.dump(data, f)
+
+    def load(self, path):
+        """
+        Loads tokens persisted by `save` and adds them to the pool.
+
+        Args:
+            path (str): File to read.
+
+        Raises:
+            ValueError: If the file was written for a different curve or encryption key.
+        """
+        with open(path) as f:
+            data = json.load(f)
+
+        name = self.pp[0]._name
+        if data["curve"] != name or data["ek"] != [int(self.encryption_key.x), int(self.encryption_key.y)]:
+            raise ValueError("encryption pool file does not belong to this encryption key")
+
+        tokens = [
+            (ECC.EccPoint(c1_x, c1_y, name), ECC.EccPoint(r_ek_x, r_ek_y, name))
+            for c1_x, c1_y, r_ek_x, r_ek_y in data["tokens"]
+        ]
+        with self.lock:
+            self.tokens.extend(tokens)
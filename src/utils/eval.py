@@ -1,5 +1,5 @@
 import time
-from src.utils.elgamal_dec_proof import hash_to_int
+from src.utils.transcript import Transcript
 from src.utils.ec_elgamal import ElGamal
 import threshold_crypto as tc
 
@@ -22,30 +22,31 @@ class Eval:
         self.dso_ek = dso_ek
         self.el = ElGamal()
 
-    def collapse(self, cipher_list):
+    def collapse(self, cipher_list, encoding=None):
         """
         Helper function that collapses a list of ciphertexts into a single ciphertext
         by applying weights (powers of 2) to each ciphertext and summing them.
 
         This is done to convert bit-wise encrypted values into a single encrypted integer.
+        A PACKED ciphertext is already a single encrypted integer and is returned as is.
 
         Args:
-            cipher_list (list): List of ciphertexts [(C1, C2), ...]
+            cipher_list (list): List of ciphertexts [(C1, C2), ...] or a PACKED (C1, C2)
+            encoding (str, optional): Format tag, inferred from cipher_list if None.
         Returns:
             tuple: Collapsed ciphertext (C1_total, C2_total)
         """
-        total_a, total_b = None, None
-        for i, (a, b) in enumerate(cipher_list):
-            weight = 2**i
-            # Scalar multiplication: weight * Point
-            weighted_a = a * weight 
-            weighted_b = b * weight
-            
-            if total_a is None:
-                total_a, total_b = weighted_a, weighted_b
-            else:
-                total_a += weighted_a
-                total_b += weighted_b
+        if ElGamal.encoding_of(cipher_list, encoding) == ElGamal.PACKED:
+            return cipher_list
+
+        if not cipher_list:
+            return None, None
+
+        # Horner's rule: Σ(2^i * C_i) = C_0 + 2(C_1 + 2(C_2 + ...)), one doubling and addition per bit
+        total_a, total_b = cipher_list[-1][0].copy(), cipher_list[-1][1].copy()
+        for a, b in reversed(cipher_list[:-1]):
+            total_a = total_a + total_a + a
+            total_b = total_b + total_b + b
                 
         return total_a, total_b
     
@@ -60,16 +61,8 @@ class Eval:
         Returns:
             list: Encrypted difference [(C1, C2), ...]
         """
-        #if c1 is not a list
-        if isinstance(c1, list):
-            a1, b1 = self.collapse(c1)
-        else:
-            a1, b1 = c1
-
-        if isinstance(c2, list):
-            a2, b2 = self.collapse(c2)
-        else:
-             a2, b2 = c2
+        a1, b1 = self.collapse(c1)
+        a2, b2 = self.collapse(c2)
         
         return (a1 + (-a2), b1 + (-b2))
     
@@ -117,7 +110,7 @@ class Eval:
         self.for_marked_or_not_selected = []
         self.eval_results = []
         CT_red = []
- 
+
         for pk_prime in participants:
             pk_prime_str = str((pk_prime.x, pk_prime.y))
             sm_baseline_t, sm_baseline_ct, sm_baseline_proof = baseline_BB[pk_prime_str]
@@ -304,6 +297,18 @@ class Eval:
 
         return (ct_eq_list, π_r_i)
 
+    def __challenge_r(self, ct1, ct2, ct_eq, A_values):
+        """
+        Fiat-Shamir challenge of the EPET proof, over a `Transcript` of the statement.
+        """
+        transcript = Transcript(b"epet-r")
+        transcript.absorb_point(b"ek", self.dso_ek[0])
+        transcript.absorb_ciphertexts(b"ct_sum", ct1)
+        transcript.absorb_ciphertexts(b"ct_t", ct2)
+        transcript.absorb_ciphertexts(b"ct_eq", ct_eq)
+        transcript.absorb_ciphertexts(b"A", A_values)
+        return transcript.challenge(b"c", self.dso_ek[1][2])
+
     def proof_r(self, ct1, ct2, ct_eq, witness):
         """
         Generates a NIZKP proving knowledge of the random scalar 'r' used in the EPET.
@@ -329,7 +334,7 @@ class Eval:
 
             A_values.append((c1_A, c2_A))
 
-        challenge = hash_to_int(self.dso_ek, ct1, ct2, ct_eq, A_values, order=order)
+        challenge = self.__challenge_r(ct1, ct2, ct_eq, A_values)
 
         response = (int(r) + int(challenge) * int(witness)) % int(order)
 
@@ -346,7 +351,7 @@ class Eval:
 
         A_values, response, challenge = proof
 
-        c_check = hash_to_int(self.dso_ek, ct1, ct2, ct_eq, A_values, order=order)
+        c_check = self.__challenge_r(ct1, ct2, ct_eq, A_values)
 
         for (A1, A2), ct_t_i, (c1_eq, c2_eq) in zip(A_values, ct2, ct_eq):
             ct_diff = self.sub(ct1, ct_t_i)
@@ -375,23 +380,19 @@ class Eval:
             list: List of 1s (Success) and 0s (Fail) for each target compared.
         """
         print("Attempting to combine decryption shares...")
+
+        # no PET results to combine
+        if not ct_eq_list:
+            return [], []
         
         # Define Identity Point
         identity_point = 0 * self.dso_ek[1][1]
         M_set_final = []
-        
-        for i in range(len(ct_eq_list)):
-            ct_eq_i = ct_eq_list[i] # list of tuples [(C1_eq, C2_eq)]
-            
-            agg_partial_i = agg_share[i]
-            dr_partial_i = dr_share[i]
-            combined_partial = [agg_partial_i, dr_partial_i]
-            
-            plaintext_point = self.el.threshold_decrypt_point(
-                combined_partial, 
-                ct_eq_i,  # Pass tuple (C1, C2) directly
-            )
 
+        # One batch combine for all targets, so the Lagrange coefficients are applied once
+        plaintext_points = self.el.threshold_combine([agg_share, dr_share], ct_eq_list)
+        
+        for plaintext_point in plaintext_points:
             if plaintext_point == identity_point:
                 M_set_final.append(1)  # Target met (Diff == 0)
             else:
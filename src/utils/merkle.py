@@ -0,0 +1,155 @@
+import hashlib
+
+ROOT_DOMAIN = b"PPDRS registration list"
+
+def leaf_hash(leaf):
+    """
+    Hashes one list entry: SHA-256(0x00 || leaf).
+
+    Args:
+        leaf (str | bytes): The entry, e.g. a smart meter ID.
+
+    Returns:
+        bytes: The leaf hash.
+    """
+    if isinstance(leaf, str):
+        leaf = leaf.encode()
+    return hashlib.sha256(b"\x00" + leaf).digest()
+
+def node_hash(left, right):
+    """Hashes two children: SHA-256(0x01 || left || right)."""
+    return hashlib.sha256(b"\x01" + left + right).digest()
+
+def root_message(label, size, root):
+    """
+    The message the DSO signs for a list root, binding the list type and its length.
+
+    Args:
+        label (str): The list, e.g. "sm", "agg" or "dr".
+        size (int): Number of entries.
+        root (bytes): The Merkle root.
+
+    Returns:
+        bytes: ROOT_DOMAIN || label || size || root.
+    """
+    return ROOT_DOMAIN + label.encode() + b"\x00" + size.to_bytes(8, "big") + root
+
+class MerkleTree:
+    """
+    Merkle tree over a list, e.g. the registered smart meter IDs.
+
+    A node without a sibling is promoted to the next level unchanged (no duplicated
+    leaves), so appending a leaf only recomputes the path from it to the root.
+    """
+    def __init__(self, leaves=()):
+        """
+        Args:
+            leaves (iterable): The initial entries (str or bytes).
+        """
+        self.levels = [[]]
+        for leaf in leaves:
+            self.append(leaf)
+
+    def __len__(self):
+        return len(self.levels[0])
+
+    @property
+    def root(self):
+        """The root hash; the hash of the empty string for an empty tree."""
+        if not self.levels[0]:
+            return hashlib.sha256(b"").digest()
+        return self.levels[-1][0]
+
+    def append(self, leaf):
+        """
+        Adds an entry and updates the O(log n) nodes on its path.
+
+        Args:
+            leaf (str | bytes): The entry.
+
+        Returns:
+            int: The index of the entry.
+        """
+        index = len(self.levels[0])
+        self.levels[0].append(leaf_hash(leaf))
+
+        level = 0
+        while len(self.levels[level]) > 1:
+            nodes = self.levels[level]
+            if level + 1 == len(self.levels):
+                self.levels.append([])
+            parent = index // 2
+            sibling = index ^ 1
+            if sibling < len(nodes):
+                left, right = nodes[index & ~1], nodes[index | 1]
+                node = node_hash(left, right)
+            else:
+                node = nodes[index]
+
+            parents = self.levels[level + 1]
+            if parent < len(parents):
+                parents[parent] = node
+            else:
+                parents.append(node)
+            index = parent
+            level += 1
+        return len(self.levels[0]) - 1
+
+    def proof(self, index):
+        """
+        The inclusion proof of the entry at index: its sibling hashes, bottom up.
+
+        Args:
+            index (int): The entry index.
+
+        Returns:
+            list: The sibling hashes, levels without a sibling are skipped.
+
+        Raises:
+            IndexError: If there is no entry at index.
+        """
+        if not 0 <= index < len(self):
+            raise IndexError("no entry at this index")
+
+        path = []
+        for nodes in self.levels[:-1]:
+            sibling = index ^ 1
+            if sibling < len(nodes):
+                path.append(nodes[sibling])
+            index //= 2
+        return path
+
+def verify_inclusion(root, leaf, index, size, proof):
+    """
+    Checks an inclusion proof from `MerkleTree.proof`.
+
+    Args:
+        root (bytes): The (signed) root.
+        leaf (str | bytes): The entry.
+        index (int): Its claimed index.
+        size (int): The number of entries of the tree.
+        proof (list): The sibling hashes.
+
+    Returns:
+        bool: True if leaf is at index of the tree with this root, False otherwise.
+    """
+    if not 0 <= index < size:
+        return False
+
+    node = leaf_hash(leaf)
+    siblings = iter(proof)
+    try:
+        while size > 1:
+            if index % 2 == 1:
+                node = node_hash(next(siblings), node)
+            elif index + 1 < size:
+                node = node_hash(node, next(siblings))
+            index //= 2
+            size = (size + 1) // 2
+    except StopIteration:
+        return False
+
+    # the proof must not contain extra hashes
+    if next(siblings, None) is not None:
+        return False
+    return node == root
@@ -0,0 +1,214 @@
+import hashlib
+import struct
+from Crypto.PublicKey import ECC
+
+def curve_constants(curve_name):
+    """
+    Returns the field prime p and coefficient b of a short Weierstrass NIST curve
+    y^2 = x^3 - 3x + b.
+    """
+    curve = ECC._curves[curve_name]
+    return int(curve.p), int(curve.b)
+
+def coordinate_size(curve_name):
+    """The number of bytes of one field element of the curve."""
+    p, _ = curve_constants(curve_name)
+    return (p.bit_length() + 7) // 8
+
+def _sqrt_mod(a, p):
+    """
+    A square root of a modulo the prime p, or None if a is not a square.
+
+    Uses the single exponentiation a^((p+1)/4) when p = 3 mod 4 (P-192, P-256, P-384,
+    P-521) and Tonelli-Shanks otherwise (P-224).
+    """
+    a %= p
+    if a == 0:
+        return 0
+    if pow(a, (p - 1) // 2, p) != 1:
+        return None
+    if p % 4 == 3:
+        return pow(a, (p + 1) // 4, p)
+
+    # p - 1 = q * 2^s with q odd
+    q, s = p - 1, 0
+    while q % 2 == 0:
+        q //= 2
+        s += 1
+    z = 2
+    while pow(z, (p - 1) // 2, p) != p - 1:
+        z += 1
+
+    m, c, t, r = s, pow(z, q, p), pow(a, q, p), pow(a, (q + 1) // 2, p)
+    while t != 1:
+        i, t2 = 0, t
+        while t2 != 1:
+            t2 = t2 * t2 % p
+            i += 1
+        b = pow(c, 1 << (m - i - 1), p)
+        m, c, t, r = i, b * b % p, t * b * b % p, r * b % p
+    return r
+
+def _y_from_x(x, p, b, odd):
+    """The y-coordinate of the point with x-coordinate x and the given parity, or None."""
+    y = _sqrt_mod(pow(x, 3, p) - 3 * x + b, p)
+    if y is None:
+        return None
+    if (y & 1) != odd:
+        y = (p - y) % p
+    return y
+
+def lift_x(x, curve_name, odd=False):
+    """
+    Finds the curve point with x-coordinate x.
+
+    Args:
+        x (int): The x-coordinate.
+        curve_name (str): The curve, e.g. "P-256".
+        odd (bool): Pick the point whose y-coordinate is odd.
+
+    Returns:
+        ECC.EccPoint: The point (x, y).
+
+    Raises:
+        ValueError: If no point has this x-coordinate.
+    """
+    p, b = curve_constants(curve_name)
+    if not 0 <= x < p:
+        raise ValueError("x-coordinate out of range")
+
+    y = _y_from_x(x, p, b, odd)
+    if y is None:
+        raise ValueError("x-coordinate is not on the curve")
+    return ECC.EccPoint(x, y, curve=curve_name)
+
+def compress(point):
+    """
+    Encodes a point as 0x02/0x03 || x (SEC 1 compressed form).
+
+    The point at infinity is encoded as all zero bytes of the same length.
+
+    Args:
+        point (ECC.EccPoint): The point.
+
+    Returns:
+        bytes: 1 + coordinate_size bytes.
+    """
+    size = coordinate_size(point.curve)
+    if point.is_point_at_infinity():
+        return bytes(1 + size)
+    prefix = 3 if int(point.y) & 1 else 2
+    return bytes([prefix]) + int(point.x).to_bytes(size, "big")
+
+def decompress(data, curve_name):
+    """
+    Decodes a point written by `compress`.
+
+    Args:
+        data (bytes): The encoded point.
+        curve_name (str): The curve, e.g. "P-256".
+
+    Returns:
+        ECC.EccPoint: The point.
+
+    Raises:
+        ValueError: If data is not a valid encoding of a point on the curve.
+    """
+    size = coordinate_size(curve_name)
+    if len(data) != 1 + size:
+        raise ValueError("encoded point has the wrong length")
+    if data[0] == 0 and not any(data):
+        return ECC.EccPoint(0, 0, curve=curve_name)
+    if data[0] not in (2, 3):
+        raise ValueError("unknown point encoding")
+    return lift_x(int.from_bytes(data[1:], "big"), curve_name, odd=data[0] == 3)
+
+def hash_to_curve(data, curve_name):
+    """
+    Maps data to a curve point nobody knows the discrete log of (try-and-increment).
+
+    x = SHA-256(data || counter), truncated to the coordinate size (P-224), is tried for
+    counter = 0, 1, ... until it lifts to a point; the even-y point is returned. About half of all x values work, so this
+    takes two tries on average. Only used on public inputs, so the variable time is fine.
+
+    Args:
+        data (bytes): Domain-separated input.
+        curve_name (str): The curve, e.g. "P-256".
+
+    Returns:
+        ECC.EccPoint: The point.
+    """
+    p, b = curve_constants(curve_name)
+    size = coordinate_size(curve_name)
+    counter = 0
+    while True:
+        digest = hashlib.sha256(data + counter.to_bytes(4, "big")).digest()
+        x = int.from_bytes(digest[:size], "big")
+        if x < p:
+            y = _y_from_x(x, p, b, odd=False)
+            if y is not None:
+                return ECC.EccPoint(x, y, curve=curve_name)
+        counter += 1
+
+def encode_points(obj):
+    """
+    Replaces every point in a nested structure of lists, tuples and dicts by its
+    compressed encoding, e.g. to send a proof to another process.
+
+    Args:
+        obj: The structure (points, ints, strings, lists, tuples, dicts).
+
+    Returns:
+        The same structure with bytes in place of points.
+    """
+    if isinstance(obj, ECC.EccPoint):
+        return compress(obj)
+    if isinstance(obj, dict):
+        return {key: encode_points(value) for key, value in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        return type(obj)(encode_points(value) for value in obj)
+    return obj
+
+def decode_points(obj, curve_name):
+    """
+    Reverses `encode_points`.
+
+    Args:
+        obj: A structure returned by `encode_points`.
+        curve_name (str): The curve, e.g. "P-256".
+
+    Returns:
+        The structure with points in place of bytes.
+    """
+    if isinstance(obj, bytes):
+        return decompress(obj, curve_name)
+    if isinstance(obj, dict):
+        return {key: decode_points(value, curve_name) for key, value in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        return type(obj)(decode_points(value, curve_name) for value in obj)
+    return obj
+
+def encode_report(t, cts, packed=None):
+    """
+    Canonical binary encoding of a report (t, cts), the message a smart meter signs.
+
+    Layout: format (B: 0 bitwise list, 1 packed pair), t (q, signed 64-bit),
+    number of ciphertexts (I), then C1 || C2 of every ciphertext as compressed points.
+
+    Args:
+        t (int): The report timestamp.
+        cts: A sequence of (C1, C2) pairs (bitwise) or a single (C1, C2) pair (packed).
+        packed (bool, optional): The report's encoding tag. If None, cts is packed
+            when its first element is a point rather than a pair.
+
+    Returns:
+        bytes: The encoded report.
+    """
+    if packed is None:
+        packed = len(cts) > 0 and not isinstance(cts[0], (tuple, list))
+    pairs = [cts] if packed else cts
+    parts = [struct.pack(">BqI", int(packed), int(t), len(pairs))]
+    for c1, c2 in pairs:
+        parts.append(compress(c1))
+        parts.append(compress(c2))
+    return b"".join(parts)
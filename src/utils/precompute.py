@@ -0,0 +1,244 @@
+import threading
+from Crypto.PublicKey import ECC
+from src.utils.point_codec import hash_to_curve
+
+class FixedBaseTable:
+    """
+    Precomputed window table for scalar multiplication of a fixed point.
+
+    The scalar is split into windows of `window` bits. Row i of the table holds
+    d * 2^(window * i) * P for every digit d, so k * P is computed with one point
+    addition per window and no doublings.
+
+    References:
+        - Fixed-base windowing, "Guide to Elliptic Curve Cryptography" (Hankerson, Menezes, Vanstone) algorithm 3.41
+    """
+    def __init__(self, point, order, window=8):
+        """
+        Args:
+            point (ECC.EccPoint): The fixed base point P.
+            order (int): The order of the curve group (q).
+            window (int): Number of scalar bits handled per table row.
+        """
+        self.point = point
+        self.order = int(order)
+        self.window = window
+        self.mask = (1 << window) - 1
+        self.num_windows = (self.order.bit_length() + window - 1) // window
+
+        self.rows = []
+        base = point
+        for _ in range(self.num_windows):
+            # row[d] = d * base, row[0] is the identity and is never added
+            row = [None, base]
+            for _ in range(2, 1 << window):
+                row.append(row[-1] + base)
+            self.rows.append(row)
+
+            # base = 2^window * base
+            base = row[-1] + base
+
+    def mul(self, scalar):
+        """
+        Computes scalar * P using the precomputed rows.
+
+        Args:
+            scalar (int): The scalar k.
+
+        Returns:
+            ECC.EccPoint: k * P.
+        """
+        k = int(scalar) % self.order
+        acc = None
+        for row in self.rows:
+            if not k:
+                break
+            digit = k & self.mask
+            k >>= self.window
+            if digit:
+                if acc is None:
+                    # copy so the in-place additions below never touch the table
+                    acc = row[digit].copy()
+                else:
+                    acc += row[digit]
+
+        if acc is None:
+            return 0 * self.point
+        return acc
+
+
+# Process-wide tables for the curve generator, one per curve
+_generator_tables = {}
+_generator_lock = threading.Lock()
+
+# pycryptodome multiplies the generator of these curves with its own precomputed tables,
+# which beat FixedBaseTable (see benchmark_generator_mul)
+NATIVE_GENERATOR_CURVES = {"NIST P-256", "NIST P-384", "NIST P-521"}
+
+def has_native_generator_table(pp):
+    """
+    Whether pycryptodome already has precomputed tables for the generator of pp.
+
+    Args:
+        pp (tuple): Public parameters (curve, G, order).
+
+    Returns:
+        bool: True if plain k * G is the fastest generator multiplication.
+    """
+    return ECC._curves[pp[0]._name].canonical in NATIVE_GENERATOR_CURVES
+
+def generator_table(pp):
+    """
+    Returns the fixed-base table for the generator of pp, building it on first use.
+
+    Args:
+        pp (tuple): Public parameters (curve, G, order).
+
+    Returns:
+        FixedBaseTable: The shared table for pp[1].
+    """
+    name = pp[0]._name
+    table = _generator_tables.get(name)
+    if table is None:
+        with _generator_lock:
+            table = _generator_tables.get(name)
+            if table is None:
+                table = FixedBaseTable(pp[1], pp[2])
+                _generator_tables[name] = table
+    return table
+
+def generator_mul(scalar, pp):
+    """
+    Computes scalar * G for the generator G = pp[1].
+
+    Curves with native generator tables (`has_native_generator_table`) use plain
+    multiplication, the others the shared `generator_table`.
+
+    Args:
+        scalar (int): The scalar to multiply with.
+        pp (tuple): Public parameters (curve, G, order).
+
+    Returns:
+        ECC.EccPoint: scalar * G.
+    """
+    if has_native_generator_table(pp):
+        return (int(scalar) % int(pp[2])) * pp[1]
+    return generator_table(pp).mul(scalar)
+
+
+class KeyTableCache:
+    """
+    Fixed-base tables for explicitly registered long-lived points such as the DSO keys.
+
+    A window-4 table costs about a thousand point additions to build and roughly halves
+    each multiplication afterwards, so it only pays off for keys multiplied hundreds of
+    times. Every point that was not registered is multiplied natively.
+    """
+    def __init__(self, window=4):
+        """
+        Args:
+            window (int): Window width of the tables.
+        """
+        self.window = window
+        self.tables = {}
+        self.lock = threading.Lock()
+
+    def register(self, point, order):
+        """
+        Builds the table of a long-lived point, once.
+
+        The table is built outside the lock, so other threads keep multiplying meanwhile.
+
+        Args:
+            point (ECC.EccPoint): The point, e.g. the DSO encryption key.
+            order (int): The order of the curve group (q).
+        """
+        key = (int(point.x), int(point.y))
+        if key in self.tables:
+            return
+
+        table = FixedBaseTable(point, order, self.window)
+        with self.lock:
+            self.tables.setdefault(key, table)
+
+    def mul(self, scalar, point, order):
+        """
+        Computes scalar * point, with the point's table if it was registered.
+
+        Args:
+            scalar (int): The scalar to multiply with.
+            point (ECC.EccPoint): The point.
+            order (int): The order of the curve group (q).
+
+        Returns:
+            ECC.EccPoint: scalar * point.
+        """
+        table = self.tables.get((int(point.x), int(point.y)))
+        if table is None:
+            return int(scalar) * point
+        return table.mul(scalar)
+
+    def clear(self):
+        """Drops all tables."""
+        with self.lock:
+            self.tables.clear()
+
+
+# Process-wide tables for the registered long-lived keys
+_key_tables = KeyTableCache()
+
+def register_key(point, order):
+    """
+    Registers a long-lived key (DSO pk and ek, aggregator ek) for table multiplication.
+
+    Args:
+        point (ECC.EccPoint): The key.
+        order (int): The order of the curve group (q).
+    """
+    _key_tables.register(point, order)
+
+def point_mul(scalar, point, order):
+    """
+    Computes scalar * point, through its table if the point was passed to `register_key`.
+
+    Args:
+        scalar (int): The scalar to multiply with.
+        point (ECC.EccPoint): The point, e.g. a public key.
+        order (int): The order of the curve group (q).
+
+    Returns:
+        ECC.EccPoint: scalar * point.
+    """
+    return _key_tables.mul(scalar, point, order)
+
+
+# Domain separation for the shuffle's independent generators h_0, h_1, ...
+H_GENERATOR_SEED = b"PPDRS shuffle generator"
+
+# Process-wide list of generators per curve, extended on demand
+_h_generators = {}
+_h_generators_lock = threading.Lock()
+
+def h_generators(pp, N):
+    """
+    Returns N independent generators h_i = hash_to_curve(seed || i).
+
+    The generators are deterministic, so a verifier recomputes them instead of reading them
+    from a proof, and nobody knows their discrete logs relative to G. They are cached per
+    curve and the cache only grows, so a later proof over more keys reuses the first ones.
+
+    Args:
+        pp (tuple): Public parameters (curve, G, order).
+        N (int): Number of generators.
+
+    Returns:
+        list: The points h_0, ..., h_{N-1}.
+    """
+    name = pp[0]._name
+    generators = _h_generators.get(name, [])
+    if len(generators) < N:
+        with _h_generators_lock:
+            generators = _h_generators.setdefault(name, [])
+            for i in range(len(generators), N):
+                generators.append(hash_to_curve(H_GENERATOR_SEED + i.to_bytes(8, "big"), name))
+    return generators[:N]
@@ -4,6 +4,8 @@ from src.utils.signature import Signature
 import src.utils.private_key_proof as nizkp
 from src.utils.ec_elgamal import ElGamal
 from src.utils.elgamal_dec_proof import prove_correct_decryption, prove_partial_decryption_share
+from src.utils.precompute import generator_table, has_native_generator_table
+from src.utils.point_codec import encode_report
 import threshold_crypto as tc
 
 class Procedures:
@@ -14,16 +16,21 @@ class Procedures:
     def __init__(self, curve="P-256"):
         """
         Initializes the Procedures instance.
-        Sets up public parameters and the internal ElGamal instance.
+        Sets up public parameters and the internal ElGamal and Signature instances.
         """
         self.pp = self.pub_param(curve)
         self.ahe = ElGamal(self.pp)
+        self.sig = Signature()
         self.r = tc.random_in_range(2, self.pp[2]-1)
         
     def pub_param(self, curve="P-256"):
         """
         Loads and returns the public parameters for the specified elliptic curve.
 
+        On curves without native generator tables in pycryptodome, the fixed-base table
+        for the generator is built here once per curve, so every later r * G in ElGamal,
+        Signature and Shuffle reuses it.
+
         Args:
             curve (str): The name of the curve (default "P-256").
 
@@ -33,7 +40,10 @@ class Procedures:
         curve = tc.CurveParameters(curve)
         g = curve.P
         order = curve.order
-        return (curve, g, order)
+        pp = (curve, g, order)
+        if not has_native_generator_table(pp):
+            generator_table(pp)
+        return pp
     
     # SKey_Gen(id, pp) → ((id, pk), sk)
     # SKeyGen(id, pp) to generate a signing key pair ((id, pk), sk) and publishes (id, pk) 
@@ -115,7 +125,7 @@ class Procedures:
         
         return ((ek, pp, πdk), dk)
 
-    def mix_id(self, ID_pk, expo):
+    def mix_id(self, ID_pk, expo, workers=None, shuffle=None, shards=None):
         """
         Anonymizes and shuffles a list of identity public keys using shuffling.
 
@@ -126,12 +136,18 @@ class Procedures:
         Args:
             ID_pk (list): A list of tuples, where each item is (id, (pk, pp, proof)).
             pk (ECC.Point): The public key used for the shuffle encryption/re-encryption.
+            workers (int, optional): Number of processes used to generate the shuffle proof.
+            shuffle (Shuffle, optional): A Shuffle prepared with `precompute`, so only the
+                input-dependent work is left. A fresh Shuffle is used if None.
+            shards (int, optional): Mix in two layers of this many buckets each
+                (see `gen_sharded_mix`) instead of one shuffle over all keys.
 
         Returns:
             tuple: (Shuffled_PKs, Randomness_Used, Shuffle_Proof)
         """
         from src.utils.shuffle import Shuffle
-        shuffle = Shuffle(self.pp)
+        if shuffle is None:
+            shuffle = Shuffle(self.pp)
 
         
         if not ID_pk:
@@ -143,18 +159,22 @@ class Procedures:
             pk = idpk[1][0]
             Id_A_pk.append(pk)
 
+        if shards and shards > 1:
+            from src.utils.sharded_shuffle import gen_sharded_mix
+            return gen_sharded_mix(self.pp, Id_A_pk, expo, shards, workers)
+
         # set up the shuffle proof
         e_prime, r_prime, ψ = shuffle.GenShuffle(Id_A_pk)
 
         # proof of shuffle and anonymised list of pks
-        πmix_proof= shuffle.GenProof(Id_A_pk, e_prime, r_prime, ψ, expo)
+        πmix_proof= shuffle.GenProof(Id_A_pk, e_prime, r_prime, ψ, expo, workers)
 
         return (e_prime, r_prime, πmix_proof)
 
-    # Report(id, sk, ek, m, t) → (pk, (t, ct, σ))
+    # Report(id, sk, ek, m, t) → (pk, (t, ct, σ, encoding))
     user_info = {}
 
-    def report(self, id, sm_sk, dso_ek, m, t, sm_pk):
+    def report(self, id, sm_sk, dso_ek, m, t, sm_pk, pool=None, encoding=ElGamal.BITWISE):
         """
         Creates a signed, encrypted report.
 
@@ -169,22 +189,39 @@ class Procedures:
             m (int): The measurement/message to report.
             t (int): Timestamp or time epoch.
             sm_pk: Smart Meter's public key.
+            pool (EncryptionPool, optional): Precomputed encryption tokens for the DSO key.
+                If given, a non-zero m is encrypted online with point additions only.
+            encoding (str): ElGamal.BITWISE (one ciphertext per bit) or ElGamal.PACKED
+                (a single ciphertext of m * G). The tag is signed and travels with the report.
 
         Returns:
-            tuple: (SmartMeter_PK, (Time, Ciphertexts, Signature))
+            tuple: (SmartMeter_PK, (Time, Ciphertexts, Signature, Encoding))
+
+        Raises:
+            ValueError: If encoding is unknown, or m does not fit the PACKED encoding.
         """
+        if encoding not in (ElGamal.BITWISE, ElGamal.PACKED):
+            raise ValueError(f"unknown encoding: {encoding}")
         r = tc.random_in_range(2, self.pp[2])
-        if m > 0:
+        if encoding == ElGamal.PACKED:
+            if m > 0:
+                cts = self.ahe.enc_packed(dso_ek[0], m, pool=pool)
+            else:
+                # deterministic encryption of 0
+                cts = self.ahe.enc_packed(dso_ek[0], m, 1)
+        elif m > 0 and pool is not None:
+            cts = self.ahe.enc(dso_ek[0], m, pool=pool)
+        elif m > 0:
             cts = self.ahe.enc(dso_ek[0], m, self.r)
         else:
             # deterministic encryption of 0
             cts = self.ahe.enc(dso_ek[0], m, 1)
 
-        # sign (pk = (pk, pp, proof))
-        msg = str((t, cts))
+        # sign (pk = (pk, pp, proof)) the canonical binary encoding of the report
+        msg = encode_report(t, cts, encoding == ElGamal.PACKED)
         signing_σ = self.sig.schnorr_sign(sm_sk, dso_ek[1], msg)
 
-        return (sm_pk, (t, cts, signing_σ))
+        return (sm_pk, (t, cts, signing_σ, encoding))
     
     def __export_bytes(self, x):
         """
@@ -215,7 +252,7 @@ class Procedures:
 
         Args:
             inputs (list): List of smart meter reports. Each report is a tuple:
-                        ( (pk, pp, proof), (t, cts, signature) )
+                        ( (pk, pp, proof), (t, cts, signature, encoding) )
             r_prime_list (list): List of blinding factors (points or scalars) used to re-randomize the public keys.
             secret_key_T (int): The private signing key of the entity (TTP/Aggregator) validating this batch.
 
@@ -228,11 +265,12 @@ class Procedures:
         # print("[NOT IMP] in anonym.Anonym: compute zero-knowledge proof of knowledge signature σ_i on (pk_i, t, ct_i) and zero-knowledge proof of knowledge ")
     
         published = []
+        encodings = []
         for (sm_report, r_prime) in zip(inputs, r_prime_list):
             try:
                 pk_tuple, body = sm_report
                 pk, pp, s_proof = pk_tuple
-                t, cts, signature = body
+                t, cts, signature, encoding = body
             except ValueError:
                 raise ValueError("Invalid input format for sm_report")
             
@@ -248,11 +286,15 @@ class Procedures:
             # placeholder proof
             pi = "NIZKP here"
             published.append((pk_prime, cts, t, pi))
+            encodings.append(encoding)
 
         msg_bytes = b""
 
-        for (pk_prime, ct, t, pi) in published:
-            c1, c2 = ct[0]
+        for (pk_prime, ct, t, pi), encoding in zip(published, encodings):
+            if encoding == ElGamal.PACKED:
+                c1, c2 = ct
+            else:
+                c1, c2 = ct[0]
             msg_bytes += self.__export_bytes(pk_prime)
             msg_bytes += self.__export_bytes(c1)
             msg_bytes += self.__export_bytes(c2)
@@ -0,0 +1,92 @@
+import struct
+from src.utils.point_codec import compress, decompress, coordinate_size
+
+# Shuffle proof layout (big-endian):
+#   header: magic (4s), version (B), curve name (16s), N (I)
+#   points: t1, t2, t3, t4, h, t_hat[N], c[N], c_hat[N]   (compressed, 1 + coordinate size bytes each)
+#   scalars: s1, s2, s3, s4, s_hat[N], s_prime[N]           (coordinate size bytes each)
+MAGIC = b"PPSP"
+VERSION = 1
+HEADER = struct.Struct(">4sB16sI")
+
+def shuffle_proof_size(N, curve_name):
+    """The encoded size in bytes of a shuffle proof over N keys."""
+    size = coordinate_size(curve_name)
+    return HEADER.size + (3 * N + 5) * (1 + size) + (2 * N + 4) * size
+
+def encode_shuffle_proof(proof, pp):
+    """
+    Serializes a proof from `Shuffle.GenProof` into the versioned binary layout.
+
+    Args:
+        proof (dict): The shuffle proof.
+        pp (tuple): Public parameters (curve, G, order).
+
+    Returns:
+        bytes: The encoded proof.
+    """
+    name = pp[0]._name
+    size = coordinate_size(name)
+    t1, t2, t3, t4, t_hat = proof["t"]
+    s1, s2, s3, s4, s_hat, s_prime = proof["s"]
+
+    parts = [HEADER.pack(MAGIC, VERSION, name.encode(), len(t_hat))]
+    for point in [t1, t2, t3, t4, proof["h"]] + list(t_hat) + list(proof["c"]) + list(proof["c_hat"]):
+        parts.append(compress(point))
+    for scalar in [s1, s2, s3, s4] + list(s_hat) + list(s_prime):
+        parts.append(int(scalar).to_bytes(size, "big"))
+    return b"".join(parts)
+
+def decode_shuffle_proof(data, pp):
+    """
+    Parses an encoded shuffle proof.
+
+    The buffer is read through a memoryview, so the points and scalars are decoded
+    straight from it without copying the proof.
+
+    Args:
+        data (bytes | memoryview): The encoded proof.
+        pp (tuple): Public parameters (curve, G, order).
+
+    Returns:
+        dict: The proof, as returned by `Shuffle.GenProof`.
+
+    Raises:
+        ValueError: If data is not a shuffle proof for this curve.
+    """
+    view = memoryview(data)
+    name = pp[0]._name
+    size = coordinate_size(name)
+
+    if len(view) < HEADER.size:
+        raise ValueError("encoded proof is too short")
+    magic, version, curve_name, N = HEADER.unpack_from(view, 0)
+    if magic != MAGIC or version != VERSION:
+        raise ValueError("not a shuffle proof")
+    if curve_name.rstrip(b"\0").decode() != name:
+        raise ValueError("shuffle proof is for another curve")
+    if len(view) != shuffle_proof_size(N, name):
+        raise ValueError("encoded proof has the wrong length")
+
+    offset = HEADER.size
+    points = []
+    for _ in range(3 * N + 5):
+        points.append(decompress(view[offset:offset + 1 + size], name))
+        offset += 1 + size
+    scalars = []
+    for _ in range(2 * N + 4):
+        scalars.append(int.from_bytes(view[offset:offset + size], "big"))
+        offset += size
+
+    t1, t2, t3, t4, h = points[:5]
+    t_hat, c, c_hat = points[5:5 + N], points[5 + N:5 + 2 * N], points[5 + 2 * N:]
+    s1, s2, s3, s4 = scalars[:4]
+    s_hat, s_prime = scalars[4:4 + N], scalars[4 + N:]
+
+    return {
+        't': (t1, t2, t3, t4, t_hat),
+        's': (s1, s2, s3, s4, s_hat, s_prime),
+        'c': c,
+        'c_hat': c_hat,
+        'h': h,
+    }
@@ -0,0 +1,186 @@
+import math
+from src.utils.shuffle import Shuffle, verify_encoded_proof, _params, _executor
+from src.utils.point_codec import encode_points, decode_points
+
+def split_shards(items, num_shards):
+    """
+    Splits the mix input into num_shards interleaved buckets: bucket b = items[b::num_shards].
+    """
+    return [items[b::num_shards] for b in range(num_shards)]
+
+def transpose_shards(outputs, num_shards):
+    """
+    Regroups the first-layer outputs for the second layer.
+
+    Bucket k of the second layer gets every output at a position j with j % num_shards == k
+    from every first-layer bucket, so each second-layer bucket mixes keys from all buckets.
+
+    Args:
+        outputs (list): One output list per first-layer bucket.
+        num_shards (int): Number of buckets.
+
+    Returns:
+        list: One input list per second-layer bucket, as (bucket, position) pairs.
+    """
+    return [
+        [(b, j) for b in range(len(outputs)) for j in range(k, len(outputs[b]), num_shards)]
+        for k in range(num_shards)
+    ]
+
+def _shuffle_bucket(pp, e, expo):
+    """
+    Shuffles one bucket and proves it.
+
+    Returns:
+        tuple: (e_prime, r_prime, ψ, proof) of the bucket.
+    """
+    shuffle = Shuffle(pp)
+    e_prime, r_prime, ψ = shuffle.GenShuffle(e)
+    proof = shuffle.GenProof(e, e_prime, r_prime, ψ, expo)
+    return (e_prime, r_prime, ψ, proof)
+
+def _shuffle_shard(curve_name, encoded):
+    """
+    Process-pool task: `_shuffle_bucket` on encode_points((e, expo)), with an encoded result.
+    """
+    e, expo = decode_points(encoded, curve_name)
+    return encode_points(_shuffle_bucket(_params(curve_name), e, expo))
+
+def _shuffle_layer(pp, buckets, expo, executor):
+    """
+    Shuffles every bucket of one layer, in parallel if an executor is given.
+
+    Returns:
+        list: (e_prime, r_prime, ψ, proof) per bucket.
+    """
+    if executor is None:
+        return [_shuffle_bucket(pp, bucket, expo) for bucket in buckets]
+
+    name = pp[0]._name
+    futures = [executor.submit(_shuffle_shard, name, encode_points((bucket, expo))) for bucket in buckets]
+    return [decode_points(future.result(), name) for future in futures]
+
+def gen_sharded_mix(pp, e, expo, num_shards, workers=None):
+    """
+    Two-layer sharded mix of e.
+
+    The input is split into num_shards buckets that are shuffled independently, the
+    outputs are regrouped across buckets (`transpose_shards`) and shuffled once more.
+    Every bucket is an ordinary verifiable shuffle, so the 2 * num_shards proofs are
+    generated (and later verified) in parallel and each commitment chain is only
+    N / num_shards long. The anonymity set of a key is all keys for which the second
+    layer bucket it lands in receives keys from every first layer bucket, i.e. when
+    N >= num_shards ** 2.
+
+    Args:
+        pp (tuple): Public parameters (curve, G, order).
+        e (list): The keys to mix.
+        expo: exponent g, as for GenProof.
+        num_shards (int): Number of buckets per layer, lowered to at most sqrt(N) so
+            every bucket of both layers is non-empty.
+        workers (int, optional): Number of processes shuffling buckets.
+
+    Returns:
+        tuple: (e_prime, r_prime, proof), where r_prime[i] is the total blinding of e[i]
+        and proof holds the intermediate list and the proofs of both layers.
+    """
+    q = int(pp[2])
+    N = len(e)
+    num_shards = max(1, min(num_shards, math.isqrt(N)))
+
+    with _executor(workers) as executor:
+        first = _shuffle_layer(pp, split_shards(e, num_shards), expo, executor)
+
+        # origin index in e and first-layer blinding of every first-layer output (b, j)
+        origin = {}
+        for b, (_, r_prime, ψ, _) in enumerate(first):
+            for j in range(len(ψ)):
+                origin[(b, j)] = (b + ψ[j] * num_shards, r_prime[ψ[j]])
+
+        intermediate = [bucket[0] for bucket in first]
+        regrouped = transpose_shards(intermediate, num_shards)
+        second = _shuffle_layer(pp, [[intermediate[b][j] for b, j in bucket] for bucket in regrouped], expo, executor)
+
+    e_prime = []
+    r_total = [0] * N
+    for bucket, (bucket_e_prime, r_prime, _, _) in zip(regrouped, second):
+        e_prime.extend(bucket_e_prime)
+        for t, position in enumerate(bucket):
+            i, r_first = origin[position]
+            r_total[i] = (int(r_first) + int(r_prime[t])) % q
+
+    proof = {
+        'num_shards': num_shards,
+        'intermediate': intermediate,
+        'layer1': [bucket[3] for bucket in first],
+        'layer2': [bucket[3] for bucket in second],
+    }
+    return e_prime, r_total, proof
+
+def _verify_bucket(pp, proof, e, e_prime, expo):
+    """Verifies one bucket proof; False instead of an assertion error if it is invalid."""
+    try:
+        return Shuffle(pp).verify_shuffle_proof(proof, e, e_prime, expo)
+    except AssertionError:
+        return False
+
+def is_sharded(proof):
+    """Whether proof was made by `gen_sharded_mix`."""
+    return isinstance(proof, dict) and "layer1" in proof
+
+def verify_encoded_mix(curve_name, encoded):
+    """
+    Process-pool task: verifies a monolithic or sharded mix sent as
+    `encode_points((proof, e, e_prime))`, with the generator as expo.
+    """
+    proof, e, e_prime = decode_points(encoded, curve_name)
+    if not is_sharded(proof):
+        return verify_encoded_proof(curve_name, encoded)
+    pp = _params(curve_name)
+    return verify_sharded_mix(pp, proof, e, e_prime, pp[1])
+
+def verify_sharded_mix(pp, proof, e, e_prime, expo, workers=None):
+    """
+    Verifies a sharded mix: every bucket proof of both layers, in parallel if workers > 1.
+
+    Args:
+        pp (tuple): Public parameters (curve, G, order).
+        proof (dict): The proof from `gen_sharded_mix`.
+        e (list): The mix input.
+        e_prime (list): The mix output.
+        expo: exponent g.
+        workers (int, optional): Number of processes verifying bucket proofs.
+
+    Returns:
+        bool: True if all bucket proofs are valid, False otherwise.
+    """
+    num_shards = proof["num_shards"]
+    intermediate = proof["intermediate"]
+    if num_shards < 1 or not len(intermediate) == len(proof["layer1"]) == len(proof["layer2"]) == num_shards:
+        return False
+
+    first_in = split_shards(e, num_shards)
+    if [len(out) for out in intermediate] != [len(bucket) for bucket in first_in]:
+        return False
+
+    regrouped = transpose_shards(intermediate, num_shards)
+    second_in = [[intermediate[b][j] for b, j in bucket] for bucket in regrouped]
+    second_out = []
+    start = 0
+    for bucket in second_in:
+        second_out.append(e_prime[start:start + len(bucket)])
+        start += len(bucket)
+    if start != len(e_prime):
+        return False
+
+    checks = [(bucket_proof, bucket_in, bucket_out, expo) for bucket_proof, bucket_in, bucket_out in
+              list(zip(proof["layer1"], first_in, intermediate)) + list(zip(proof["layer2"], second_in, second_out))]
+
+    with _executor(workers) as executor:
+        if executor is None:
+            results = [_verify_bucket(pp, *check) for check in checks]
+        else:
+            name = pp[0]._name
+            futures = [executor.submit(verify_encoded_proof, name, encode_points(check)) for check in checks]
+            results = [future.result() for future in futures]
+    return all(results)
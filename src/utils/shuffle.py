@@ -1,6 +1,91 @@
-import hashlib
 import random
 import threshold_crypto as tc
+from contextlib import nullcontext
+from concurrent.futures import ProcessPoolExecutor
+from src.utils.precompute import generator_mul, h_generators
+from src.utils.msm import linear_combination
+from src.utils.point_codec import compress, decompress, decode_points
+from src.utils.transcript import Transcript
+
+def _combine(pp, g_scalar, terms):
+    """
+    Computes g_scalar * G + Σ(k_i * P_i) for terms [(k_i, P_i), ...].
+    """
+    parts = []
+    if int(g_scalar) % int(pp[2]):
+        parts.append(generator_mul(g_scalar, pp))
+    if len(terms) == 1:
+        k, P = terms[0]
+        parts.append(P if int(k) == 1 else int(k) * P)
+    elif terms:
+        total = linear_combination([k for k, _ in terms], [P for _, P in terms])
+        if total is not None:
+            parts.append(total)
+
+    if not parts:
+        return 0 * pp[1]
+    point = parts[0]
+    for part in parts[1:]:
+        point = point + part
+    return point
+
+# Public parameters per curve inside a worker process
+_worker_pp = {}
+
+def _params(curve_name):
+    """The public parameters (curve, G, order) of a curve, cached per process."""
+    pp = _worker_pp.get(curve_name)
+    if pp is None:
+        curve = tc.CurveParameters(curve_name)
+        pp = (curve, curve.P, curve.order)
+        _worker_pp[curve_name] = pp
+    return pp
+
+def _combine_rows(curve_name, rows):
+    """
+    Process-pool task: `_combine` for every row.
+
+    Points travel as 33-byte compressed encodings so the rows pickle small.
+    """
+    pp = _params(curve_name)
+
+    results = []
+    for g_scalar, terms in rows:
+        terms = [(k, decompress(P, curve_name)) for k, P in terms]
+        results.append(compress(_combine(pp, g_scalar, terms)))
+    return results
+
+def verify_encoded_proof(curve_name, encoded, batch=True):
+    """
+    Process-pool task: verifies a shuffle proof sent as `encode_points((proof, e, e_prime))`
+    or `encode_points((proof, e, e_prime, expo))`; expo defaults to the generator.
+
+    Args:
+        curve_name (str): The curve of the points.
+        encoded (tuple): The encoded (proof, e, e_prime[, expo]).
+        batch (bool): Use the batched check.
+
+    Returns:
+        bool: True if the proof is valid, False otherwise.
+    """
+    pp = _params(curve_name)
+    proof, e, e_prime, *expo = decode_points(encoded, curve_name)
+    expo = expo[0] if expo else pp[1]
+    try:
+        return Shuffle(pp).verify_shuffle_proof(proof, e, e_prime, expo, batch=batch)
+    except AssertionError:
+        return False
+
+def _executor(workers):
+    """A process pool for workers > 1, otherwise a context that yields None."""
+    if not workers or workers <= 1:
+        return nullcontext()
+    return ProcessPoolExecutor(max_workers=workers)
+
+def _split(items, parts):
+    """Splits items into at most `parts` contiguous slices of near-equal length."""
+    size = -(-len(items) // max(1, parts))
+    return [items[i:i + size] for i in range(0, len(items), size)]
 
 class Shuffle:
     """
@@ -19,11 +104,19 @@ class Shuffle:
     """
     def __init__(self, pp):
         (self.curve, self.g, self.order) = pp
+        self.pp = pp
+
+        # input-independent material from `precompute`, each used at most once
+        self.offline_shuffle = None
+        self.offline_proof = None
 
     def get_h_generators(self, N):
         """ 
-        Generates a list of N independent generators (h_1, ..., h_N).
+        Returns a list of N independent generators (h_1, ..., h_N).
         These are used for Pedersen commitments to the permutation matrix.
+
+        The generators are derived deterministically by hash-to-curve and cached
+        across proofs, so the verifier recomputes the same list locally.
         
         Args:
             N (int): Number of generators needed (equal to number of items to shuffle).
@@ -31,40 +124,96 @@ class Shuffle:
         Returns:
             list: List of ECC points.
         """
-        h_generators_local = []
-        
-        for i in range(N):
-            h_scalar = tc.number.random_in_range(1, self.order)
-            h_i_point = int(h_scalar) * self.g
-            h_generators_local.append(h_i_point)
-        
-        return h_generators_local
+        return h_generators(self.pp, N)
     
-    def _serialize(self, data):
+    def __transcript(self, e, e_prime, c):
         """
-        Recursively serialize data to a canonical string format for hashing.
+        A `Transcript` of the shuffle statement (e, e_prime) and the permutation commitment c.
         """
-        if isinstance(data, list) or isinstance(data, tuple):
-            return "[" + ",".join(self._serialize(x) for x in data) + "]"
-        elif hasattr(data, 'x') and hasattr(data, 'y'):
-            # It's an EccPoint, serialize coordinates
-            return f"({int(data.x)},{int(data.y)})"
-        else:
-            # Integers, strings, etc.
-            return str(data)
-        
-    def hash_to_zq(self, data):
-        """ 
-        Hash generic data to a scalar in the field Z_q (modulo curve order).
-        Used to generate non-interactive challenges (Fiat-Shamir heuristic).
+        transcript = Transcript(b"shuffle")
+        transcript.absorb_points(b"e", e)
+        transcript.absorb_points(b"e_prime", e_prime)
+        transcript.absorb_points(b"c", c)
+        return transcript
+
+    def challenges(self, e, e_prime, c):
         """
-        # Use canonical serialization
-        serialized_data = self._serialize(data)
-        
-        hasher = hashlib.sha256()
-        hasher.update(serialized_data.encode())
-        digest = hasher.digest()
-        return int.from_bytes(digest, "big")   
+        Derives the N challenges u_i for the permutation commitment.
+
+        The public prefix (e, e_prime, c) is absorbed into a transcript once, and each
+        u_i = H(digest || i), so the derivation is O(N) instead of re-hashing the
+        full lists for every i.
+
+        Args:
+            e (list): The original input list.
+            e_prime (list): The shuffled output list.
+            c (list): The permutation commitments.
+
+        Returns:
+            list: The challenges u_0, ..., u_{N-1}.
+        """
+        return self.__transcript(e, e_prime, c).challenges(b"u", len(e), self.order)
+
+    def proof_challenge(self, y, t):
+        """
+        The Fiat-Shamir challenge of the proof for statement y = (e, e_prime, c, c_hat, expo)
+        and commitments t = (t1, t2, t3, t4, t_hat).
+
+        Returns:
+            int: The challenge in Z_q.
+        """
+        e, e_prime, c, c_hat, expo = y
+        t1, t2, t3, t4, t_hat = t
+
+        transcript = self.__transcript(e, e_prime, c)
+        transcript.absorb_points(b"c_hat", c_hat)
+        transcript.absorb_point(b"expo", expo)
+        transcript.absorb_points(b"t", [t1, t2, t3, t4])
+        transcript.absorb_points(b"t_hat", t_hat)
+        return transcript.challenge(b"challenge", self.order)
+
+    def combine_all(self, rows, executor=None, workers=1):
+        """
+        Computes g_scalar * G + Σ(k_i * P_i) for every row (g_scalar, [(k_i, P_i), ...]).
+
+        With an executor the rows are split into `workers` chunks and computed in
+        parallel, sending compressed points to the worker processes.
+
+        Args:
+            rows (list): The rows to compute.
+            executor (ProcessPoolExecutor, optional): Pool to run the rows on.
+            workers (int): Number of chunks to split the rows into.
+
+        Returns:
+            list: One point per row.
+        """
+        if executor is None:
+            return [_combine(self.pp, g_scalar, terms) for g_scalar, terms in rows]
+
+        name = self.curve._name
+        encoded = [(int(g_scalar), [(int(k), compress(P)) for k, P in terms]) for g_scalar, terms in rows]
+        futures = [executor.submit(_combine_rows, name, chunk) for chunk in _split(encoded, workers)]
+
+        results = []
+        for future in futures:
+            results.extend(decompress(data, name) for data in future.result())
+        return results
+
+    @staticmethod
+    def __sum(points):
+        """Adds up a non-empty list of points."""
+        total = points[0]
+        for point in points[1:]:
+            total = total + point
+        return total
+
+    def __weighted_sum(self, scalars, points, executor=None, workers=1, g_scalar=0):
+        """
+        Computes g_scalar * G + Σ(k_i * P_i), split into one partial sum per worker.
+        """
+        chunks = _split(list(zip(scalars, points)), workers)
+        rows = [(g_scalar if k == 0 else 0, chunk) for k, chunk in enumerate(chunks)]
+        return self.__sum(self.combine_all(rows, executor, workers))
 
     def GenPermutation(self, N):
         """ 
@@ -95,18 +244,20 @@ class Shuffle:
             tuple: (shuffled_list, randomness_list, permutation_indices)
         """
         N = len(e)
-        ψ = self.GenPermutation(N)
+
+        # use the permutation and blinding from `precompute` once, if it was made for N items
+        material = self.offline_shuffle
+        if material is not None and len(material["psi"]) == N:
+            self.offline_shuffle = None
+        else:
+            material = self.__shuffle_material(N)
+        ψ, r_prime, r_prime_g = material["psi"], material["r_prime"], material["r_prime_g"]
         
-        r_prime = []
         e_prime = []
 
         for i in range(N):
-            r_i = tc.number.random_in_range(1, self.order)
-            r_prime.append(r_i)
-
             # Additive blinding e[i] + r_i * G
-            blinding_factor = int(r_i) * self.g
-            pk_prime = e[i] + blinding_factor
+            pk_prime = e[i] + r_prime_g[i]
 
             e_prime.append(pk_prime)
         #
@@ -114,7 +265,7 @@ class Shuffle:
         e_prime_shuffled = [e_prime[ψ[j]] for j in range(N)]
         return (e_prime_shuffled, r_prime, ψ)
 
-    def GenCommitment(self, ψ, h_gens):
+    def GenCommitment(self, ψ, h_gens, executor=None, workers=1):
         """ 
         Commits to the permutation matrix.
         
@@ -124,6 +275,8 @@ class Shuffle:
         Args:
             ψ (list): The permutation vector.
             h_gens (list): Independent generators.
+            executor (ProcessPoolExecutor, optional): Pool for the r[j] * G terms.
+            workers (int): Number of chunks for the pool.
             
         Returns:
             tuple: (commitments_c, randomness_r)
@@ -139,28 +292,30 @@ class Shuffle:
         for _ in range(N):
             r.append(tc.number.random_in_range(1, self.order))
 
-        for i in range(N):
-            j = ψ[i]
-            
-            # c[j] = r[j] * G + h_gens[i]
-            h_term = h_gens[i]
-            g_term = int(r[j]) * self.g
-            c[j] = h_term + g_term
+        # c[j] = r[j] * G + h_gens[i]
+        rows = [(r[ψ[i]], [(1, h_gens[i])]) for i in range(N)]
+        for i, c_j in enumerate(self.combine_all(rows, executor, workers)):
+            c[ψ[i]] = c_j
 
         return (c, r)
 
-    def GenCommitmentChain(self, c0, u):
+    def GenCommitmentChain(self, c0, u, executor=None, workers=1, randomness=None):
         """ 
         Generates a chain of commitments, used for the proof to verify the permutation structure without revealing it.
+
+        The u_i * c_{i-1} terms are inherently sequential; only the r_i * g terms
+        are computed on the executor, if one is given, or taken from `randomness`
+        as precomputed (r, r * g) lists.
         """
         N = len(u)
         c = []
-        r = []
+        if randomness is None:
+            r = [tc.number.random_in_range(1, self.order) for _ in range(N)]
+            r_g = self.combine_all([(r_i, []) for r_i in r], executor, workers)
+        else:
+            r, r_g = randomness
 
         for i in range(N):
-            r_i = tc.number.random_in_range(1, self.order)
-            r.append(r_i)
-            
             if i == 0:
                 prev_c = c0
             else:
@@ -168,15 +323,92 @@ class Shuffle:
             
             # c_i = r_i * g + u_i * c_{i-1}
             # This recursive structure binds the current commitment to the previous one
-            c_i = (int(r_i) * self.g) + (int(u[i]) * prev_c)
+            c_i = r_g[i] + (int(u[i]) * prev_c)
             c.append(c_i)
 
             prev_c = c_i
         
         return (c, r)
 
+    def __shuffle_material(self, N, executor=None, workers=1):
+        """
+        The input-independent part of GenShuffle: the permutation and the blinding r'_i * G.
+        """
+        r_prime = [tc.number.random_in_range(1, self.order) for _ in range(N)]
+        return {
+            'psi': self.GenPermutation(N),
+            'r_prime': r_prime,
+            'r_prime_g': self.combine_all([(r_i, []) for r_i in r_prime], executor, workers),
+        }
+
+    def __proof_material(self, ψ, executor=None, workers=1):
+        """
+        The input-independent part of GenProof for permutation ψ: the generators, the
+        permutation commitment, the chain randomness, the witnesses and t1, t2, t3.
+        """
+        N = len(ψ)
+        q = int(self.order)
+        h_gens = self.get_h_generators(N)
+        c, r = self.GenCommitment(ψ, h_gens, executor, workers)
+
+        h_scalar = tc.number.random_in_range(1, self.order)
+        r_hat = [tc.number.random_in_range(1, self.order) for _ in range(N)]
+        w = [tc.number.random_in_range(1, self.order) for _ in range(4)]
+        w_hat = [tc.number.random_in_range(1, self.order) for _ in range(N)]
+        w_prime = [tc.number.random_in_range(1, self.order) for _ in range(N)]
+
+        # t1 = w[0] * G, t2 = w[1] * G, t3 = w[2] * G + Σ(w'_i * h_i), split into one row per worker
+        terms_h = _split(list(zip(w_prime, h_gens)), workers)
+        rows = [(h_scalar, []), (w[0], []), (w[1], []), ((q - int(w[3])) % q, [])]
+        rows += [(w[2] if k == 0 else 0, chunk) for k, chunk in enumerate(terms_h)]
+        rows += [(r_i, []) for r_i in r_hat]
+        rows += [(w_i, []) for w_i in w_hat]
+
+        results = self.combine_all(rows, executor, workers)
+        h, t1, t2, minus_w3_g = results[:4]
+        t3 = self.__sum(results[4:4 + len(terms_h)])
+        r_hat_g = results[4 + len(terms_h):4 + len(terms_h) + N]
+        w_hat_g = results[4 + len(terms_h) + N:]
+
+        return {
+            'psi': list(ψ),
+            'h_gens': h_gens,
+            'c': c,
+            'r': r,
+            'h': h,
+            'r_hat': r_hat,
+            'r_hat_g': r_hat_g,
+            'w': w,
+            'w_hat': w_hat,
+            'w_prime': w_prime,
+            'w_hat_g': w_hat_g,
+            'minus_w3_g': minus_w3_g,
+            't1': t1,
+            't2': t2,
+            't3': t3,
+        }
+
+    def precompute(self, N, workers=None):
+        """
+        Offline phase: prepares everything of the next GenShuffle and GenProof of N items
+        that does not depend on the input list.
+
+        This covers the permutation, the blinding r'_i * G, the permutation commitment,
+        the commitment chain randomness and the witnesses with t1, t2 and t3, so the online
+        phase only does the input-dependent work (e', the challenges, the commitment chain,
+        t4 and t_hat). The material is used by exactly one GenShuffle/GenProof pair and then
+        dropped, since reusing witnesses would leak the permutation.
+
+        Args:
+            N (int): Number of items the next shuffle will have.
+            workers (int, optional): Number of worker processes.
+        """
+        with _executor(workers) as executor:
+            self.offline_shuffle = self.__shuffle_material(N, executor, workers or 1)
+            self.offline_proof = self.__proof_material(self.offline_shuffle["psi"], executor, workers or 1)
+
     # pk for ours is ek
-    def GenProof(self, e, e_prime, r_prime, ψ, expo):
+    def GenProof(self, e, e_prime, r_prime, ψ, expo, workers=None):
         """ 
         Generates a non-interactive Zero-Knowledge Proof (ZKP) of the shuffle.
         
@@ -190,31 +422,40 @@ class Shuffle:
             r_prime (list): Randomness used for blinding.
             ψ (list): Permutation used.
             expo: exponent g.
+            workers (int, optional): Number of worker processes for the commitments,
+                the t-values and the weighted sums. Runs in this process if None or 1.
 
         Returns:
             dict: The proof structure containing commitments (t), responses (s), and helper values.
         """
+        with _executor(workers) as executor:
+            return self.__gen_proof(e, e_prime, r_prime, ψ, expo, executor, workers or 1)
+
+    def __gen_proof(self, e, e_prime, r_prime, ψ, expo, executor=None, workers=1):
+        """
+        GenProof, optionally spreading the independent scalar multiplications over executor.
+        """
         N = len(e)
         q = int(self.order)
 
-        # get h
-        h_gens = self.get_h_generators(N)
+        # use the precomputed material if it was made for this permutation
+        material = self.offline_proof
+        if material is not None and material["psi"] == list(ψ):
+            self.offline_proof = None
+        else:
+            material = self.__proof_material(ψ, executor, workers)
 
-        # Commit to permutation
-        c, r = self.GenCommitment(ψ, h_gens)
+        # Commitment to the permutation and its randomness
+        c, r = material["c"], material["r"]
 
         # Generate challenges
-        u = []
-        for i in range(N):
-            u_i = self.hash_to_zq((e, e_prime, c, i)) 
-            u.append(u_i)
+        u = self.challenges(e, e_prime, c)
 
         u_prime = [u[ψ[j]] for j in range(N)]
             
         # GenCommitmentChain
-        h_scalar = tc.number.random_in_range(1, self.order)
-        h = int(h_scalar) * self.g
-        c_hat, r_hat = self.GenCommitmentChain(h, u_prime)
+        h = material["h"]
+        c_hat, r_hat = self.GenCommitmentChain(h, u_prime, executor, workers, (material["r_hat"], material["r_hat_g"]))
 
         # Compute weighted sums
         r_bar = sum(int(r_val) for r_val in r) % q
@@ -228,40 +469,27 @@ class Shuffle:
         r_tilde = sum((int(r[i]) * int(u[i])) % q for i in range(N)) % q
         r_prime_sum = sum((int(r_prime[i]) * int(u[i])) % q for i in range(N)) % q
 
-        # Generate witnesses
-        w = [tc.number.random_in_range(1, self.order) for _ in range(4)]
-        w_hat = [tc.number.random_in_range(1, self.order) for _ in range(N)]
-        w_prime = [tc.number.random_in_range(1, self.order) for _ in range(N)]
+        # Witnesses and the input-independent t-values
+        w, w_hat, w_prime = material["w"], material["w_hat"], material["w_prime"]
+        t1, t2, t3 = material["t1"], material["t2"], material["t3"]
 
-        # t-values (commitments)
-        t1 = int(w[0]) * self.g
-        t2 = int(w[1]) * self.g
-        t3 = int(w[2]) * self.g
-        for i in range(N):
-            t3 = t3 + (int(w_prime[i]) * h_gens[i])
-        
         # t4 = Σ(w'_i * e'_i) - w[3] * G
-        sum_w_prime_e_prime = int(w_prime[0]) * e_prime[0]
-        for i in range(1, N):
-            sum_w_prime_e_prime = sum_w_prime_e_prime + (int(w_prime[i]) * e_prime[i])
-        
-        w3_g = int(w[3]) * self.g
-        t4 = sum_w_prime_e_prime + (-w3_g)
+        # The weighted sum is split into one row per worker and the partial sums are added up
+        terms_e = _split(list(zip(w_prime, e_prime)), workers)
+        rows = [(0, chunk) for chunk in terms_e]
 
-        t_hat = []
-        for i in range(N):
-            if i == 0:
-                prev_c = h
-            else:
-                prev_c = c_hat[i-1]
-            
-            hat_t_i = (int(w_hat[i]) * self.g) + (int(w_prime[i]) * prev_c)
-            t_hat.append(hat_t_i)
+        # t_hat_i = w_hat_i * G + w'_i * c_hat_{i-1}, with c_hat_{-1} = h
+        prev_c = [h] + c_hat[:-1]
+        rows += [(0, [(w_prime[i], prev_c[i])]) for i in range(N)]
+
+        results = self.combine_all(rows, executor, workers)
+        t4 = self.__sum(results[:len(terms_e)] + [material["minus_w3_g"]])
+        t_hat = [material["w_hat_g"][i] + results[len(terms_e) + i] for i in range(N)]
         
         # Compute challenge
         y = (e, e_prime, c, c_hat, expo)
         t = (t1, t2, t3, t4, t_hat)
-        challenge = self.hash_to_zq((y, t))
+        challenge = self.proof_challenge(y, t)
 
         # Compute responses
         s1 = (int(w[0]) + int(challenge) * r_bar) % q
@@ -278,28 +506,93 @@ class Shuffle:
             'c': c,
             'c_hat': c_hat,
             'h': h,
-            'h_gens': h_gens,
         }
 
         return proof
 
-    def verify_shuffle_proof(self, proof, e, e_prime, expo):
+    def __batch_check(self, proof, e, e_prime, h_gens, u, u_product, challenge, executor=None, workers=1):
+        """
+        Checks every verification equation at once with a random linear combination.
+
+        Each equation t == t' is rewritten as t - t' == 0 and weighted by a random 128-bit
+        rho. The weighted sum is one multi-scalar multiplication over G, c, h_gens, c_hat,
+        h, e, e' and the t values, which is zero for a valid proof and non-zero except
+        with probability ~2^-128 otherwise.
+
+        Returns:
+            bool: True if the combined equation holds.
+        """
+        t1, t2, t3, t4, t_hat = proof["t"]
+        s1, s2, s3, s4, s_hat, s_prime = proof["s"]
+        c = proof["c"]
+        c_hat = proof["c_hat"]
+        h = proof["h"]
+
+        N = len(e)
+        q = int(self.order)
+        ch = int(challenge)
+        s_prime = [int(x) for x in s_prime]
+        rho1, rho2, rho3, rho4 = [tc.number.random_in_range(1, 2**128) for _ in range(4)]
+        rho_hat = [tc.number.random_in_range(1, 2**128) for _ in range(N)]
+
+        # t1 = -ch*(Σc_i - Σh_i) + s1*G
+        # t2 = -ch*(c_hat[N-1] - u_product*h) + s2*G
+        # t3 = -ch*Σ(u_i*c_i) + s3*G + Σ(s'_i*h_i)
+        # t4 = Σ(s'_i*e'_i) - ch*Σ(u_i*e_i) - s4*G
+        # t_hat_i = -ch*c_hat_i + s_hat_i*G + s'_i*c_hat_{i-1}, with c_hat_{-1} = h
+        g_coeff = -(rho1 * int(s1) + rho2 * int(s2) + rho3 * int(s3) - rho4 * int(s4))
+        g_coeff -= sum(rho_hat[i] * int(s_hat[i]) for i in range(N))
+
+        c_coeffs = [rho1 * ch + rho3 * ch * int(u[i]) for i in range(N)]
+        h_gens_coeffs = [-rho1 * ch - rho3 * s_prime[i] for i in range(N)]
+        e_coeffs = [rho4 * ch * int(u[i]) for i in range(N)]
+        e_prime_coeffs = [-rho4 * s_prime[i] for i in range(N)]
+
+        c_hat_coeffs = [rho_hat[i] * ch for i in range(N)]
+        for i in range(N - 1):
+            c_hat_coeffs[i] -= rho_hat[i + 1] * s_prime[i + 1]
+        c_hat_coeffs[N - 1] += rho2 * ch
+        h_coeff = -rho2 * ch * int(u_product) - rho_hat[0] * s_prime[0]
+
+        scalars = [g_coeff, h_coeff, rho1, rho2, rho3, rho4] + rho_hat \
+            + c_coeffs + h_gens_coeffs + e_coeffs + e_prime_coeffs + c_hat_coeffs
+        points = [self.g, h, t1, t2, t3, t4] + list(t_hat) \
+            + list(c) + list(h_gens) + list(e) + list(e_prime) + list(c_hat)
+
+        scalars = [k % q for k in scalars]
+        total = self.__weighted_sum(scalars[1:], points[1:], executor, workers, g_scalar=scalars[0])
+        return total.is_point_at_infinity()
+
+    def verify_shuffle_proof(self, proof, e, e_prime, expo, batch=True, workers=None):
         """ 
         Verifies the Zero-Knowledge Proof of Shuffle.
         
         Reconstructs the commitments from the responses and checks if they match 
-        the challenges.
+        the challenges. In batch mode all equations are folded into a single
+        multi-scalar check; if that check fails, the strict per-equation checks
+        run to localize the failing equation.
 
         Args:
             proof (dict): The proof object generated by GenProof.
             e (list): The original input list.
             e_prime (list): The shuffled output list.
             expo: Public parameter used as a exponent.
+            batch (bool): Verify with one random linear combination instead of per equation.
+            workers (int, optional): Number of worker processes for the multi-scalar sums
+                and the t_hat checks. Runs in this process if None or 1.
 
         Returns:
             bool: True if proof is valid, False otherwise.
         """
+        with _executor(workers) as executor:
+            return self.__verify(proof, e, e_prime, expo, batch, executor, workers or 1)
+
+    def __verify(self, proof, e, e_prime, expo, batch, executor=None, workers=1):
+        """
+        verify_shuffle_proof, optionally splitting the sums and t_hat checks over executor.
+        """
         N = len(e)
+        q = int(self.order)
         
         # Extract proof components
         t1, t2, t3, t4, t_hat = proof["t"]
@@ -307,13 +600,10 @@ class Shuffle:
         c = proof["c"]
         c_hat = proof["c_hat"]
         h = proof["h"]
-        h_gens = proof["h_gens"]
+        h_gens = self.get_h_generators(N)
         
         # Recompute challenges u
-        u = []
-        for i in range(N):
-            u_i = self.hash_to_zq((e, e_prime, c, i))
-            u.append(u_i)
+        u = self.challenges(e, e_prime, c)
         
         # c_bar = Σc_i - Σh_i
         c_bar = c[0]
@@ -334,67 +624,54 @@ class Shuffle:
         # c_hat_final = c_hat[N-1] - u_product * h
         c_hat_final = c_hat[N-1] + (-(int(u_product) * h))
         
-        # c_tilde = Σ(u_i * c_i)
-        c_tilde = int(u[0]) * c[0]
-        for i in range(1, N):
-            c_tilde = c_tilde + (int(u[i]) * c[i])
-        
         # Recomputing the challenge
         y = (e, e_prime, c, c_hat, expo)
         t = (t1, t2, t3, t4, t_hat)
-        challenge = self.hash_to_zq((y, t))
+        challenge = self.proof_challenge(y, t)
+
+        if batch and self.__batch_check(proof, e, e_prime, h_gens, u, u_product, challenge, executor, workers):
+            return True
+
+        # c_tilde = Σ(u_i * c_i)
+        c_tilde = self.__weighted_sum(u, c, executor, workers)
         
         # Verify t1 = -challenge*c_bar + s1*g
-        t1_prime = (-(int(challenge) * c_bar)) + (int(s1) * self.g)
+        t1_prime = (-(int(challenge) * c_bar)) + generator_mul(s1, self.pp)
         t1_check = (t1 == t1_prime)
         assert t1 == t1_prime
 
         # Verify t2 = -challenge*c_hat_final + s2*g
-        t2_prime = (-(int(challenge) * c_hat_final)) + (int(s2) * self.g)
+        t2_prime = (-(int(challenge) * c_hat_final)) + generator_mul(s2, self.pp)
         t2_check = (t2 == t2_prime)
         assert t2 == t2_prime
 
         # Verify t3
         t3_prime_1 = -(int(challenge) * c_tilde)
-        t3_prime_2 = int(s3) * self.g
-        t3_prime_prod = int(s_prime[0]) * h_gens[0]
-        
-        for i in range(1, N):
-            t3_prime_prod = t3_prime_prod + (int(s_prime[i]) * h_gens[i])
+        t3_prime_2 = generator_mul(s3, self.pp)
+        t3_prime_prod = self.__weighted_sum(s_prime, h_gens, executor, workers)
         
         t3_prime = t3_prime_1 + t3_prime_2 + t3_prime_prod
         t3_check = (t3 == t3_prime)
         assert t3 == t3_prime
 
         # Verify t4
-        sum_s_prime_e_prime = int(s_prime[0]) * e_prime[0]
-        for i in range(1, N):
-            sum_s_prime_e_prime = sum_s_prime_e_prime + (int(s_prime[i]) * e_prime[i])
-        
-        sum_u_e = int(u[0]) * e[0]
-        for i in range(1, N):
-            sum_u_e = sum_u_e + (int(u[i]) * e[i])
+        sum_s_prime_e_prime = self.__weighted_sum(s_prime, e_prime, executor, workers)
+        sum_u_e = self.__weighted_sum(u, e, executor, workers)
 
         term_challenge = int(challenge) * sum_u_e
-        term_s4 = int(s4) * self.g
+        term_s4 = generator_mul(s4, self.pp)
         
         t4_prime = sum_s_prime_e_prime + (-term_challenge) + (-term_s4)
         t4_check = (t4 == t4_prime)
         assert t4 == t4_prime
 
-        # Verify t_hat chain
-        t_hat_valid = True
-        for i in range(N):
-            if i == 0:
-                prev_c = h
-            else:
-                prev_c = c_hat[i-1]
-            
-            t_hat_prime = (-(int(challenge) * c_hat[i])) + (int(s_hat[i]) * self.g) + (int(s_prime[i]) * prev_c)
-            
-            if t_hat[i] != t_hat_prime:
-                t_hat_valid = False
-                break
+        # Verify t_hat chain: t_hat_i = -challenge*c_hat_i + s_hat_i*g + s'_i*c_hat_{i-1}
+        # Every c_hat is in the proof, so the N checks are independent
+        prev_c = [h] + list(c_hat[:-1])
+        minus_challenge = (-int(challenge)) % q
+        rows = [(s_hat[i], [(s_prime[i], prev_c[i]), (minus_challenge, c_hat[i])]) for i in range(N)]
+        t_hat_prime = self.combine_all(rows, executor, workers)
+        t_hat_valid = all(t_hat[i] == t_hat_prime[i] for i in range(N))
         
         result = (
             t1_check and
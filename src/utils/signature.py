@@ -1,10 +1,174 @@
 import hashlib
+import threading
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
 from Crypto.PublicKey import ECC
 import threshold_crypto as tc
+from src.utils.precompute import generator_mul, point_mul
+from src.utils.msm import linear_combination
+from src.utils.point_codec import compress, decompress
 
 # Code inspired by petlib: https://github.com/gdanezis/petlib/blob/master/examples/zkp.py & https://www.youtube.com/watch?v=r9hJiDrtukI
 
+def _nonce_commitments(curve_name, nonces):
+    """
+    Process-pool task: computes k * G for every nonce k, returned as compressed points.
+    """
+    curve = tc.CurveParameters(curve_name)
+    pp = (curve, curve.P, curve.order)
+    return [compress(generator_mul(k, pp)) for k in nonces]
+
+class NoncePool:
+    """
+    Precomputed Schnorr nonces (k, k * G) for one set of public parameters.
+
+    Signing with a pooled nonce is one hash and one modular multiplication, so bulk
+    signing (e.g. the registered lists after an enrollment wave) no longer does a
+    scalar multiplication per message.
+
+    Note:
+        A nonce must never be used twice, since two signatures with the same k reveal
+        the secret key. Every nonce is removed from the pool when it is taken.
+    """
+    def __init__(self, pp, size=256):
+        """
+        Args:
+            pp (tuple): Public parameters (curve, G, order).
+            size (int): Number of nonces the background worker keeps ready.
+        """
+        self.pp = pp
+        self.size = size
+
+        self.nonces = deque()
+        self.lock = threading.Lock()
+        self.stop_event = threading.Event()
+        self.wakeup = threading.Event()
+        self.worker = None
+
+    def __len__(self):
+        return len(self.nonces)
+
+    def new_nonce(self):
+        """
+        Computes one fresh nonce and its commitment.
+
+        Returns:
+            tuple: (k, k * G)
+        """
+        k = tc.number.random_in_range(1, self.pp[2])
+        return (k, generator_mul(k, self.pp))
+
+    def fill(self, n=None, workers=None):
+        """
+        Synchronously adds nonces until the pool holds n of them.
+
+        Args:
+            n (int, optional): Target number of nonces. Uses the pool size if None.
+            workers (int, optional): Number of processes computing the commitments.
+        """
+        target = self.size if n is None else n
+        missing = target - len(self.nonces)
+        if missing <= 0:
+            return
+
+        if not workers or workers <= 1:
+            while len(self.nonces) < target:
+                nonce = self.new_nonce()
+                with self.lock:
+                    self.nonces.append(nonce)
+            return
+
+        name = self.pp[0]._name
+        nonces = [tc.number.random_in_range(1, self.pp[2]) for _ in range(missing)]
+        chunk = -(-missing // workers)
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = [executor.submit(_nonce_commitments, name, nonces[i:i + chunk]) for i in range(0, missing, chunk)]
+            commitments = [decompress(data, name) for future in futures for data in future.result()]
+
+        with self.lock:
+            self.nonces.extend(zip(nonces, commitments))
+
+    def take(self):
+        """
+        Removes and returns one nonce. Falls back to computing one online if the pool is empty.
+
+        Returns:
+            tuple: (k, k * G)
+        """
+        with self.lock:
+            nonce = self.nonces.popleft() if self.nonces else None
+
+        # let the background worker top the pool up again
+        self.wakeup.set()
+
+        if nonce is None:
+            return self.new_nonce()
+        return nonce
+
+    def start(self):
+        """
+        Starts a daemon thread that keeps the pool filled up to its size in the background.
+        """
+        if self.worker is not None and self.worker.is_alive():
+            return
+
+        self.stop_event.clear()
+        self.worker = threading.Thread(target=self.__run, daemon=True)
+        self.worker.start()
+
+    def stop(self):
+        """
+        Stops the background thread.
+        """
+        self.stop_event.set()
+        self.wakeup.set()
+        if self.worker is not None:
+            self.worker.join()
+            self.worker = None
+
+    def __run(self):
+        while not self.stop_event.is_set():
+            if len(self.nonces) < self.size:
+                nonce = self.new_nonce()
+                with self.lock:
+                    self.nonces.append(nonce)
+            else:
+                self.wakeup.wait()
+                self.wakeup.clear()
+
 class Signature:
+    def __init__(self):
+        # nonce pools by curve name, see `start_nonce_pool`
+        self.nonce_pools = {}
+
+    def start_nonce_pool(self, pp, size=256, workers=None, background=True):
+        """
+        Precomputes Schnorr nonces for pp, used by every later `schnorr_sign` on that curve.
+
+        Args:
+            pp (tuple): Public parameters (curve, G, order).
+            size (int): Number of nonces to keep ready.
+            workers (int, optional): Number of processes for the initial fill.
+            background (bool): Keep the pool topped up on a background thread.
+
+        Returns:
+            NoncePool: The pool.
+        """
+        pool = NoncePool(pp, size)
+        pool.fill(workers=workers)
+        if background:
+            pool.start()
+        self.nonce_pools[pp[0]._name] = pool
+        return pool
+
+    def stop_nonce_pool(self, pp):
+        """
+        Stops and removes the nonce pool for pp, if any.
+        """
+        pool = self.nonce_pools.pop(pp[0]._name, None)
+        if pool is not None:
+            pool.stop()
+
     def key_gen(self, curve_name="P-256"):
         """
         Generates a standard Elliptic Curve key pair.
@@ -84,7 +248,7 @@ class Signature:
         Generates a Schnorr signature for a message.
         
         Mathematical steps:
-        1. Generate random nonce k.
+        1. Generate random nonce k, or take a precomputed one from the nonce pool.
         2. Compute commitment R = k * G.
         3. Compute challenge e = Hash(R, msg).
         4. Compute response s = k + (sk * e) mod order.
@@ -97,11 +261,14 @@ class Signature:
         Returns:
             tuple: (R, s) where R is the ephemeral point and s is the signature scalar.
         """
-        g = pp[1]
         order = pp[2]
         
-        k = tc.number.random_in_range(1, order)
-        ephemeral_key = k * g
+        pool = self.nonce_pools.get(pp[0]._name)
+        if pool is not None:
+            k, ephemeral_key = pool.take()
+        else:
+            k = tc.number.random_in_range(1, order)
+            ephemeral_key = generator_mul(k, pp)
         challenge_hash = self.Hash(ephemeral_key, msg, order)
 
         signature = (int(k) + int(sk) * int(challenge_hash)) % int(order)
@@ -127,14 +294,13 @@ class Signature:
         Returns:
             bool: True if the signature is valid, False otherwise.
         """
-        g = pp[1]
         order = pp[2]
         R, s = signature
         
         e = self.Hash(R, msg, order)
 
-        expected_point = int(s) * g
-        reconstructed_point = R + int(e) * pk
+        expected_point = generator_mul(s, pp)
+        reconstructed_point = R + point_mul(e, pk, order)
 
         return expected_point == reconstructed_point
 
@@ -143,6 +309,9 @@ class Signature:
         """
         Batch signs a list of messages.
 
+        With a nonce pool (see `start_nonce_pool`) the pool is first topped up to the
+        length of the list, so each signature is a hash and a modular multiplication.
+
         Args:
             sk (int): Private key.
             pp (tuple): Public parameters.
@@ -151,29 +320,89 @@ class Signature:
         Returns:
             list: A list of signature tuples [(R, s), ...].
         """
+        pool = self.nonce_pools.get(pp[0]._name)
+        if pool is not None:
+            pool.fill(len(msg_list))
+
         signatures = []
         for msg in msg_list:
             sign = self.schnorr_sign(sk, pp, msg)
             signatures.append(sign)
         return signatures
 
-    def schnorr_verify_list(self, pk, pp, msg_list, signatures):
+    def __batch_valid(self, pk, pp, items):
+        """
+        Checks several signatures by the same pk at once.
+
+        With random 128-bit weights z_i, all signatures are valid (except with probability
+        ~2^-128) iff (Σ z_i s_i) * G - (Σ z_i e_i) * PK == Σ z_i R_i. The G and PK terms
+        are one multiplication each for the whole batch; the R_i sum costs one native
+        multiplication per signature.
+
+        Args:
+            pk (Point): The signer's public key.
+            pp (tuple): Public parameters (curve, G, order).
+            items (list): (R, s, e) per signature, e being its challenge hash.
+
+        Returns:
+            bool: True if every signature in items is valid.
+        """
+        order = int(pp[2])
+        weights = [tc.number.random_in_range(1, 2**128) for _ in items]
+
+        g_scalar = sum(z * int(s) for z, (_, s, _) in zip(weights, items)) % order
+        pk_scalar = -sum(z * int(e) for z, (_, _, e) in zip(weights, items)) % order
+
+        expected_point = generator_mul(g_scalar, pp) + point_mul(pk_scalar, pk, order)
+        reconstructed_point = linear_combination(weights, [R for R, _, _ in items])
+        return expected_point == reconstructed_point
+
+    def __find_invalid(self, pk, pp, items, indices):
+        """
+        Bisection: returns the indices of the invalid signatures among items[indices].
+        """
+        if self.__batch_valid(pk, pp, [items[i] for i in indices]):
+            return []
+        if len(indices) == 1:
+            return indices
+
+        middle = len(indices) // 2
+        return self.__find_invalid(pk, pp, items, indices[:middle]) + self.__find_invalid(pk, pp, items, indices[middle:])
+
+    def schnorr_verify_list(self, pk, pp, msg_list, signatures, batch=False):
         """
         Verifies a list of signatures against a list of messages.
 
+        In batch mode all signatures are checked with one random linear combination
+        (see `__batch_valid`). If that fails, the list is bisected to find the invalid
+        signatures, which costs O(k log n) batch checks for k invalid signatures.
+        Batch mode still needs one multiplication per R_i, so it only saves time
+        (about a quarter) when pk was not passed to `register_key`; for a registered
+        key such as the DSO pk, one `schnorr_verify` per signature is faster.
+
         Args:
             pk (Point): Public key.
             pp (tuple): Public parameters.
             msg_list (list): List of messages.
             signatures (list): List of signature tuples corresponding to the messages.
+            batch (bool): Use batch verification instead of one check per signature.
 
         Returns:
             tuple: (all_valid, results)
                 - all_valid (bool): True only if ALL signatures are valid.
                 - results (list): List of tuples (index, message, is_valid) for detailed debugging.
         """
+        pairs = list(zip(msg_list, signatures))
+        if batch and len(pairs) > 1:
+            order = pp[2]
+            items = [(R, s, self.Hash(R, msg, order)) for msg, (R, s) in pairs]
+            invalid = set(self.__find_invalid(pk, pp, items, list(range(len(items)))))
+
+            results = [(i, msg, i not in invalid) for i, (msg, _) in enumerate(pairs)]
+            return (not invalid, results)
+
         results = []
-        for i, (msg, signature) in enumerate(zip(msg_list, signatures)):
+        for i, (msg, signature) in enumerate(pairs):
             is_valid = self.schnorr_verify(pk, pp, msg, signature)
             if not is_valid:
                 results.append((i, msg, False))
@@ -181,4 +410,89 @@ class Signature:
                 results.append((i, msg, True))
         
         all_valid = all(r[2] for r in results)
-        return (all_valid, results)
\ No newline at end of file
+        return (all_valid, results)
+    #
+    # Half-aggregation (Chalkias et al., "Non-interactive half-aggregation of EdDSA and
+    # variants of Schnorr signatures"), for batches of signatures by different signers.
+    #
+
+    def __aggregation_weights(self, pp, pks, msg_list, commitments):
+        """
+        The weights z_i of a half-aggregate, derived from every (R_i, pk_i, e_i) of the batch.
+
+        Hashing the whole batch fixes the weights only after all signatures are, so a
+        valid aggregate implies (except with probability ~2^-128) that every signature is.
+
+        Returns:
+            tuple: (weights, challenges)
+        """
+        order = int(pp[2])
+        challenges = [int(self.Hash(R, msg, order)) for R, msg in zip(commitments, msg_list)]
+
+        h = hashlib.sha256(b"PPDRS half-aggregation")
+        for R, pk, e in zip(commitments, pks, challenges):
+            h.update(self.__point_to_bytes(R))
+            h.update(self.__point_to_bytes(pk))
+            h.update(e.to_bytes((order.bit_length() + 7) // 8, 'big'))
+        prefix = h.digest()
+
+        weights = [int.from_bytes(hashlib.sha256(prefix + i.to_bytes(8, 'big')).digest()[:16], 'big')
+                   for i in range(len(commitments))]
+        return weights, challenges
+
+    def aggregate_signatures(self, pp, pks, msg_list, signatures):
+        """
+        Compresses signatures by (possibly) different signers into one half-aggregate.
+
+        The aggregate keeps every R_i but only one scalar s = Σ z_i s_i, so it has about
+        half the size of the individual signatures with compressed points. This is a size
+        trade-off only: `verify_aggregate` is not faster than verifying each signature.
+
+        Args:
+            pp (tuple): Public parameters (curve, G, order).
+            pks (list): The signer public key of each signature.
+            msg_list (list): The signed messages.
+            signatures (list): The signatures (R_i, s_i).
+
+        Returns:
+            tuple: (R_list, s)
+        """
+        commitments = [R for R, _ in signatures]
+        weights, _ = self.__aggregation_weights(pp, pks, msg_list, commitments)
+        s = sum(z * int(s_i) for z, (_, s_i) in zip(weights, signatures)) % int(pp[2])
+        return (commitments, s)
+
+    def verify_aggregate(self, pp, pks, msg_list, aggregate):
+        """
+        Verifies a half-aggregate from `aggregate_signatures`.
+
+        Checks s * G == Σ z_i * R_i + Σ (z_i * e_i) * pk_i. That still costs one scalar
+        multiplication per R_i and per pk_i, about as much as verifying every signature with
+        `schnorr_verify`, so the aggregate saves storage, not verification time.
+
+        Args:
+            pp (tuple): Public parameters (curve, G, order).
+            pks (list): The signer public key of each signature.
+            msg_list (list): The signed messages.
+            aggregate (tuple): (R_list, s)
+
+        Returns:
+            bool: True if the aggregate is valid for all messages, False otherwise.
+        """
+        commitments, s = aggregate
+        if not len(commitments) == len(pks) == len(msg_list):
+            return False
+        if not commitments:
+            return int(s) == 0
+
+        order = int(pp[2])
+        weights, challenges = self.__aggregation_weights(pp, pks, msg_list, commitments)
+
+        scalars = weights + [z * e % order for z, e in zip(weights, challenges)]
+        points = list(commitments) + list(pks)
+
+        expected_point = generator_mul(s, pp)
+        reconstructed_point = linear_combination(scalars, points)
+        if reconstructed_point is None:
+            return expected_point.is_point_at_infinity()
+        return expected_point == reconstructed_point
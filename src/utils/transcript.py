@@ -0,0 +1,106 @@
+import hashlib
+from src.utils.point_codec import compress
+
+def _flatten(obj):
+    """The points of a nested structure of lists and tuples, in order."""
+    if isinstance(obj, (list, tuple)):
+        return [point for item in obj for point in _flatten(item)]
+    return [obj]
+
+class Transcript:
+    """
+    Incremental Fiat-Shamir transcript over binary encodings.
+
+    Every absorbed value is written to one running SHA-256 state as
+    label length || label || data length || data, with points in compressed form and
+    scalars as big-endian integers, so the encoding is unambiguous and hashing a proof
+    statement is linear in its size. Challenges are squeezed from a copy of the state
+    and then absorbed, so later challenges depend on earlier ones.
+
+    Example:
+        transcript = Transcript(b"schnorr-nizkp")
+        transcript.absorb_point(b"pk", pk)
+        c = transcript.challenge(b"c", order)
+    """
+    def __init__(self, domain):
+        """
+        Args:
+            domain (bytes | str): Protocol name, separating the transcripts of different proofs.
+        """
+        self.state = hashlib.sha256()
+        self.absorb_bytes(b"domain", domain)
+
+    def absorb_bytes(self, label, data):
+        """
+        Absorbs a byte string (str is UTF-8 encoded).
+
+        Args:
+            label (bytes): Name of the value in the proof statement.
+            data (bytes | str): The value.
+        """
+        if isinstance(label, str):
+            label = label.encode()
+        if isinstance(data, str):
+            data = data.encode()
+        self.state.update(len(label).to_bytes(4, "big") + label)
+        self.state.update(len(data).to_bytes(8, "big"))
+        self.state.update(data)
+
+    def absorb_point(self, label, point):
+        """Absorbs a curve point in compressed form."""
+        self.absorb_bytes(label, compress(point))
+
+    def absorb_scalar(self, label, scalar):
+        """Absorbs a non-negative integer as minimal big-endian bytes."""
+        scalar = int(scalar)
+        self.absorb_bytes(label, scalar.to_bytes((scalar.bit_length() + 7) // 8, "big"))
+
+    def absorb_points(self, label, points):
+        """
+        Absorbs a list of points, e.g. the keys of a shuffle, as one length-prefixed value.
+        """
+        self.absorb_bytes(label, b"".join(compress(point) for point in points))
+
+    def absorb_ciphertexts(self, label, ciphertexts):
+        """
+        Absorbs ElGamal ciphertexts: a (C1, C2) pair, a list of pairs (bitwise) or a
+        list of such, as the flat sequence of their points.
+        """
+        self.absorb_points(label, _flatten(ciphertexts))
+
+    def challenge(self, label, order):
+        """
+        Squeezes a challenge scalar and absorbs it into the transcript.
+
+        Args:
+            label (bytes): Name of the challenge.
+            order (int): The group order q.
+
+        Returns:
+            int: The challenge in [0, q-1].
+        """
+        state = self.state.copy()
+        state.update(b"challenge" + label)
+        digest = state.digest()
+        self.absorb_bytes(label, digest)
+        return int.from_bytes(digest, "big") % int(order)
+
+    def challenges(self, label, n, order):
+        """
+        Squeezes n challenges u_i = H(state || label || i), hashing the transcript only once.
+
+        Args:
+            label (bytes): Name of the challenges.
+            n (int): Number of challenges.
+            order (int): The group order q.
+
+        Returns:
+            list: The challenges u_0, ..., u_{n-1}.
+        """
+        state = self.state.copy()
+        state.update(b"challenges" + label)
+        prefix = state.digest()
+        self.absorb_bytes(label, prefix)
+
+        return [int.from_bytes(hashlib.sha256(prefix + i.to_bytes(8, "big")).digest(), "big") % int(order)
+                for i in range(n)]
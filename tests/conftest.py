@@ -0,0 +1,8 @@
+import pytest
+
+@pytest.fixture
+def el():
+    """The ElGamal instance the test_elgamal tests take as argument (as in its __main__ block)."""
+    # imported here so test modules that only need pycryptodome are collected without threshold_crypto
+    from src.utils.ec_elgamal import ElGamal
+    return ElGamal()
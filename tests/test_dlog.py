@@ -0,0 +1,51 @@
+import os
+import random
+import tempfile
+import time
+from src.utils.procedures import Procedures
+from src.utils.dlog import BabyStepTable
+# test has been made with help from ai
+
+def test_baby_step_table():
+    """Test building, reopening (memory-mapped) and solving with a baby-step table."""
+    print("=== Testing Baby-Step Giant-Step Table ===")
+    pp = Procedures().pub_param()
+    path = os.path.join(tempfile.mkdtemp(), "bsgs.bin")
+
+    max_value = 10000
+    table = BabyStepTable.build(path, pp, max_value)
+
+    values = [0, 1, table.steps - 1, table.steps, max_value] + [random.randint(0, max_value) for _ in range(20)]
+    for m in values:
+        assert table.solve(m * pp[1]) == m, f"expected {m}"
+
+    # values above the bound are rejected
+    try:
+        table.solve((max_value + 1) * pp[1])
+        assert False, "value outside the range should not decode"
+    except ValueError:
+        pass
+
+    # a second process would just map the same file
+    reopened = BabyStepTable(path, pp)
+    assert reopened.solve(4242 * pp[1]) == 4242
+    print("=== Baby-step table tests passed! ===\n")
+
+def benchmark_dlog(max_value=2 ** 20, n=20):
+    """Times building the table and decoding community-sized totals."""
+    pp = Procedures().pub_param()
+    path = os.path.join(tempfile.mkdtemp(), "bsgs.bin")
+
+    start = time.time()
+    table = BabyStepTable.build(path, pp, max_value)
+    print(f"[PERFORMANCE] building table for max {max_value}: {time.time() - start:.4f}s")
+
+    points = [random.randint(0, max_value) * pp[1] for _ in range(n)]
+    start = time.time()
+    for point in points:
+        table.solve(point)
+    print(f"[PERFORMANCE] {n} decodes: {time.time() - start:.4f}s")
+
+if __name__ == "__main__":
+    test_baby_step_table()
+    benchmark_dlog()
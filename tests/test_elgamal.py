@@ -319,6 +319,77 @@ def test_sub(el):
     print(f"expected is : x = {expected.x}, y = {expected.y}")
 
 
+def test_packed_elgamal(el):
+    """ Test the PACKED encoding: one ciphertext per value and bounded discrete log decoding. """
+    (ek, _), dk = el.keygen()
+
+    for m in [0, 1, 10, 1000]:
+        ct = el.enc_packed(ek, m)
+        assert el.encoding_of(ct) == ElGamal.PACKED
+        assert el.dec(dk, ct) == m, f"expected {m}"
+
+    assert el.encoding_of(el.enc(ek, 5)) == ElGamal.BITWISE
+    print("PACKED encryption verified.")
+
+def test_packed_range_and_tuple_bitwise(el):
+    """ Test that enc_packed rejects values it cannot decode and that a tuple of bit-ciphertexts stays BITWISE. """
+    (ek, _), dk = el.keygen()
+
+    for m in [-1, ElGamal.MAX_PACKED_VALUE + 1]:
+        try:
+            el.enc_packed(ek, m)
+        except ValueError:
+            pass
+        else:
+            raise AssertionError(f"enc_packed accepted {m}")
+    assert el.dec(dk, el.enc_packed(ek, ElGamal.MAX_PACKED_VALUE)) == ElGamal.MAX_PACKED_VALUE
+
+    cts = tuple(el.enc(ek, 5))
+    assert el.encoding_of(cts) == ElGamal.BITWISE
+    assert el.encoding_of(cts[:1]) == ElGamal.BITWISE
+    assert el.dec(dk, cts) == 5
+    assert el.encoding_of(cts, ElGamal.PACKED) == ElGamal.PACKED
+    print("PACKED range check and tuple BITWISE reports verified.")
+
+def test_packed_threshold_elgamal(el):
+    """ Test threshold decryption of a PACKED ciphertext through the format tag. """
+    pub_key, key_shares, thresh_params = el.keygen_threshold()
+
+    m = 1000
+    ct = el.enc_packed(pub_key, m)
+
+    partial_combined = el.partial_decrypt(ct, key_shares[0]) + el.partial_decrypt(ct, key_shares[1])
+    assert len(partial_combined) == 2
+
+    decrypted_point = el.threshold_decrypt(partial_combined, ct, thresh_params, encoding=ElGamal.PACKED)
+    assert decrypted_point == m * el.pp[1]
+
+    decrypted = el._eval_threshold_decrypt(partial_combined, ct)
+    assert decrypted == m, f"Expected {m}, got {decrypted}"
+    print("PACKED threshold decryption verified.")
+
+def test_threshold_combine(el):
+    """ Test the batch threshold combine and the Lagrange coefficient cache. """
+    pub_key, key_shares, thresh_params = el.keygen_threshold()
+
+    m = [0, 1, 1, 0, 1]
+    cts = [el.encrypt_single(pub_key, bit) for bit in m]
+
+    partials_share0 = el.partial_decrypt(cts, key_shares[0])
+    partials_share1 = el.partial_decrypt(cts, key_shares[1])
+
+    points = el.threshold_combine([partials_share0, partials_share1], cts)
+    for bit, point in zip(m, points):
+        assert point == bit * el.pp[1]
+
+    # the coefficients are computed once for the index set
+    key = frozenset([key_shares[0].x, key_shares[1].x])
+    assert key in el._lagrange_cache
+    cached = el._lagrange_cache[key]
+    el.threshold_combine([partials_share1, partials_share0], cts)
+    assert el._lagrange_cache[key] is cached
+    print("Batch threshold combine verified.")
+
 
 if __name__ == "__main__":
     el = ElGamal()
@@ -332,4 +403,8 @@ if __name__ == "__main__":
     # test_eval_threshold_elgamal(el)
     # test_threshold_elgamal_point(el)
     # test_threshold_elgamal_deterministic_0(el)
-    test_sub(el)
\ No newline at end of file
+    test_sub(el)
+    test_packed_elgamal(el)
+    test_packed_range_and_tuple_bitwise(el)
+    test_packed_threshold_elgamal(el)
+    test_threshold_combine(el)
\ No newline at end of file
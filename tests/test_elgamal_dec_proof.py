@@ -1,3 +1,4 @@
+import time
 from src.utils.ec_elgamal import ElGamal
 import src.utils.elgamal_dec_proof as dec
 # test has been made with help from ai
@@ -59,6 +60,58 @@ def test_partial_decryption_share_proof():
     print(f"   Valid: {is_valid}")
     assert is_valid, "Partial decryption share proof verification failed!"
 
+def test_batched_partial_decryption_proof():
+    """Test that one batched DLEQ proof covers every partial decryption and catches a wrong one."""
+    print("=== Testing Batched Partial Decryption Proof ===")
+    elgamal = ElGamal("P-256")
+    pub_key, key_shares, thresh_params = elgamal.keygen_threshold()
+
+    cts = elgamal.enc(pub_key, 2**12 - 5)
+    partials = elgamal.partial_decrypt(cts, key_shares[0])
+    D_list = [partial.yC1 for partial in partials]
+
+    proof = dec.prove_partial_decryption_shares(elgamal.pp, cts, key_shares[0], D_list)
+    assert dec.verify_partial_decryption_shares(elgamal.pp, cts, proof)
+    assert dec.verify_partial_decryption_shares(elgamal.pp, cts, dec.prove_partial_decryption_shares(elgamal.pp, cts, key_shares[0]))
+
+    # a single wrong share anywhere in the vector is caught
+    A1, A2, z, D_list, share_commitment = proof
+    wrong = list(D_list)
+    wrong[len(wrong) // 2] = wrong[len(wrong) // 2] + elgamal.pp[1]
+    assert not dec.verify_partial_decryption_shares(elgamal.pp, cts, (A1, A2, z, wrong, share_commitment))
+
+    # shares of another key share do not verify
+    other = [partial.yC1 for partial in elgamal.partial_decrypt(cts, key_shares[1])]
+    assert not dec.verify_partial_decryption_shares(elgamal.pp, cts, (A1, A2, z, other, share_commitment))
+
+    # bitwise and PACKED reports collected into one statement, as the aggregators do
+    packed = elgamal.enc_packed(pub_key, 77)
+    all_cts, all_D = [], []
+    for ct in (cts, packed):
+        dec.collect_partial_decryptions(ct, elgamal.partial_decrypt(ct, key_shares[0]), all_cts, all_D)
+    assert len(all_cts) == len(all_D) == len(cts) + 1
+    proof = dec.prove_partial_decryption_shares(elgamal.pp, all_cts, key_shares[0], all_D)
+    assert dec.verify_partial_decryption_shares(elgamal.pp, all_cts, proof)
+    print("=== Batched partial decryption proof tests passed! ===\n")
+
+def benchmark_batched_partial_decryption_proof(n=200):
+    """Compares n single DLEQ proofs with one batched proof over the same ciphertexts."""
+    elgamal = ElGamal("P-256")
+    pub_key, key_shares, thresh_params = elgamal.keygen_threshold()
+    cts = [elgamal.encrypt_single(pub_key, i % 2) for i in range(n)]
+
+    start = time.time()
+    proofs = [dec.prove_partial_decryption_share(elgamal.pp, ct, key_shares[0]) for ct in cts]
+    assert all(dec.verify_partial_decryption_share(elgamal.pp, ct, proof) for ct, proof in zip(cts, proofs))
+    print(f"[PERFORMANCE] {n} single partial decryption proofs (prove + verify): {time.time() - start:.4f}s")
+
+    start = time.time()
+    proof = dec.prove_partial_decryption_shares(elgamal.pp, cts, key_shares[0])
+    assert dec.verify_partial_decryption_shares(elgamal.pp, cts, proof)
+    print(f"[PERFORMANCE] batched proof over {n} partial decryptions (prove + verify): {time.time() - start:.4f}s")
+
 if __name__ == "__main__":
     test_dec_proof()
-    test_partial_decryption_share_proof()
\ No newline at end of file
+    test_partial_decryption_share_proof()
+    test_batched_partial_decryption_proof()
+    benchmark_batched_partial_decryption_proof()
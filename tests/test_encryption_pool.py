@@ -0,0 +1,80 @@
+import os
+import tempfile
+import time
+from src.utils.ec_elgamal import ElGamal
+from src.utils.encryption_pool import EncryptionPool
+# test has been made with help from ai
+
+def test_pool_encryption():
+    """Test that pool encryption decrypts to the original message."""
+    print("=== Testing Encryption Pool ===")
+    el = ElGamal()
+    (ek, pp), dk = el.keygen()
+
+    pool = EncryptionPool(pp, ek, size=16)
+    pool.fill()
+    assert len(pool) == 16
+
+    for m in [0, 1, 10, 123, 1000]:
+        cts = el.enc(ek, m, pool=pool)
+        assert el.dec(dk, cts) == m, f"expected {m}"
+
+    # every bit must use fresh randomness
+    cts = el.enc(ek, 15, pool=pool)
+    assert len({(int(c1.x), int(c1.y)) for c1, _ in cts}) == len(cts)
+
+    # an empty pool falls back to online encryption
+    pool.tokens.clear()
+    assert el.dec(dk, el.enc(ek, 77, pool=pool)) == 77
+    print("=== Encryption pool tests passed! ===\n")
+
+def test_pool_background_and_persistence():
+    """Test the background worker and saving/loading tokens."""
+    el = ElGamal()
+    (ek, pp), dk = el.keygen()
+
+    pool = EncryptionPool(pp, ek, size=8)
+    pool.start()
+    while len(pool) < 8:
+        time.sleep(0.01)
+    pool.stop()
+
+    path = os.path.join(tempfile.mkdtemp(), "pool.json")
+    pool.save(path)
+
+    restored = EncryptionPool(pp, ek, size=8)
+    restored.load(path)
+    assert len(restored) == 8
+    assert el.dec(dk, el.enc(ek, 42, pool=restored)) == 42
+
+    # tokens for one key must not be loaded for another
+    (other_ek, _), _ = el.keygen()
+    try:
+        EncryptionPool(pp, other_ek).load(path)
+        assert False, "loading a pool for another key should fail"
+    except ValueError:
+        pass
+
+def benchmark_pool_encryption(n=50, m=1000):
+    """Compares online encryption with pool encryption of an m-sized value."""
+    el = ElGamal()
+    (ek, pp), _ = el.keygen()
+
+    start = time.time()
+    for _ in range(n):
+        el.enc(ek, m)
+    online = time.time() - start
+
+    pool = EncryptionPool(pp, ek, size=n * m.bit_length())
+    pool.fill()
+    start = time.time()
+    for _ in range(n):
+        el.enc(ek, m, pool=pool)
+    offline = time.time() - start
+
+    print(f"[PERFORMANCE] {n} reports: online {online:.4f}s, with token pool {offline:.4f}s")
+
+if __name__ == "__main__":
+    test_pool_encryption()
+    test_pool_background_and_persistence()
+    benchmark_pool_encryption()
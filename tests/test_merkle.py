@@ -0,0 +1,84 @@
+import time
+from src.utils.merkle import MerkleTree, verify_inclusion
+from src.dso.DSO import DSO
+from src.boards.board import Board
+from src.smartmeters.smartmeter import SmartMeter
+from src.aggregators.aggregator import Aggregator
+from src.aggregators.dr import DR_Aggregator
+# test has been made with help from ai
+
+def test_inclusion_proofs():
+    """Test that every leaf proves inclusion for all tree sizes, and forgeries fail."""
+    print("=== Testing Merkle Inclusion Proofs ===")
+    for n in range(1, 20):
+        ids = [f"sm_id_{i}" for i in range(n)]
+        tree = MerkleTree(ids)
+        for i, leaf in enumerate(ids):
+            proof = tree.proof(i)
+            assert len(proof) <= n.bit_length()
+            assert verify_inclusion(tree.root, leaf, i, n, proof)
+            assert not verify_inclusion(tree.root, "forged", i, n, proof)
+            assert not verify_inclusion(tree.root, leaf, (i + 1) % n, n, proof) or n == 1
+            assert not verify_inclusion(tree.root, leaf, i, n, proof + [tree.root])
+    print("=== Merkle inclusion proof tests passed! ===\n")
+
+def test_append():
+    """Test that appending leaves one at a time gives the same root as building the tree."""
+    tree = MerkleTree()
+    ids = []
+    for i in range(33):
+        ids.append(f"sm_id_{i}")
+        assert tree.append(ids[-1]) == i
+        assert tree.root == MerkleTree(ids).root
+
+def test_signed_registration_lists():
+    """Test DSO root signing, Board verification and per-ID inclusion proofs."""
+    print("=== Testing Merkle-Signed Registration Lists ===")
+    dso = DSO()
+    bb = Board()
+    bb.publish_dso_public_keys((dso.get_public_key(), dso.get_encryption_key()))
+
+    sms = [SmartMeter(init_id=f"sm_id_{i}") for i in range(5)]
+    for sm in sms:
+        dso.verify_smartmeter((sm.id, sm.get_public_key()))
+    agg = Aggregator(init_id="agg_id_0")
+    dr = DR_Aggregator(init_id="dr_id_0")
+    dso.verify_aggregator((agg.id, agg.get_public_key()))
+    dso.verify_dr_aggregator((dr.id, dr.get_public_key()))
+
+    signed_lists = dso.sign_registered_lists(merkle=True)
+    assert bb.publish_smartmeters_and_aggregators(signed_lists)
+
+    for sm in sms:
+        index, proof = dso.inclusion_proof("sm", sm.id)
+        assert bb.verify_registration("sm", sm.id, index, proof)
+    assert not bb.verify_registration("sm", "sm_id_unknown", *dso.inclusion_proof("sm", sms[0].id))
+
+    # a list that does not match its signed root is rejected
+    tampered = list(signed_lists)
+    tampered[0] = signed_lists[0][:-1]
+    assert not bb.publish_smartmeters_and_aggregators(tuple(tampered))
+    print("=== Merkle-signed registration list tests passed! ===\n")
+
+def benchmark_merkle_signing(n=500):
+    """Compares per-ID and Merkle-root signing of a registration list."""
+    dso = DSO()
+    bb = Board()
+    bb.publish_dso_public_keys((dso.get_public_key(), dso.get_encryption_key()))
+    for i in range(n):
+        sm = SmartMeter(init_id=f"sm_id_{i}")
+        dso.verify_smartmeter((sm.id, sm.get_public_key()))
+
+    for merkle in (False, True):
+        start = time.time()
+        signed_lists = dso.sign_registered_lists(merkle=merkle)
+        signed = time.time() - start
+        start = time.time()
+        assert bb.publish_smartmeters_and_aggregators(signed_lists)
+        print(f"[PERFORMANCE] {n} IDs (merkle={merkle}): sign {signed:.4f}s, verify {time.time() - start:.4f}s")
+
+if __name__ == "__main__":
+    test_inclusion_proofs()
+    test_append()
+    test_signed_registration_lists()
+    benchmark_merkle_signing()
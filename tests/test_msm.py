@@ -0,0 +1,44 @@
+import time
+import threshold_crypto as tc
+from src.utils.ec_elgamal import ElGamal
+from src.utils.msm import linear_combination
+# test has been made with help from ai
+
+def naive_sum(scalars, points):
+    total = None
+    for k, P in zip(scalars, points):
+        term = int(k) * P if k >= 0 else -((-int(k)) * P)
+        total = term if total is None else total + term
+    return total
+
+def test_linear_combination():
+    """Test the native per-term sum, including negative and zero scalars."""
+    print("=== Testing Linear Combination ===")
+    el = ElGamal()
+    order = el.pp[2]
+    points = [tc.number.random_in_range(1, order) * el.pp[1] for _ in range(5)]
+
+    scalars = [tc.number.random_in_range(1, order) for _ in range(5)]
+    assert linear_combination(scalars, points) == naive_sum(scalars, points)
+
+    scalars = [tc.number.random_in_range(1, order), -7, 0, 2**40, -(int(order) - 3)]
+    assert linear_combination(scalars, points) == naive_sum(scalars, points)
+
+    assert linear_combination([0, 0], points[:2]) is None
+    print("=== Linear combination tests passed! ===\n")
+
+def benchmark_linear_combination(sizes=(16, 64, 256)):
+    """Times sum(k_i * P_i) for n terms."""
+    el = ElGamal()
+    order = el.pp[2]
+    for n in sizes:
+        points = [tc.number.random_in_range(1, order) * el.pp[1] for _ in range(n)]
+        scalars = [tc.number.random_in_range(1, order) for _ in range(n)]
+
+        start = time.time()
+        linear_combination(scalars, points)
+        print(f"[PERFORMANCE] {n} terms: {time.time() - start:.4f}s")
+
+if __name__ == "__main__":
+    test_linear_combination()
+    benchmark_linear_combination()
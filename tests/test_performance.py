@@ -5,7 +5,7 @@ import src.aggregators.aggregator   as energy_aggregator
 import src.aggregators.dr           as dr_aggregator
 import src.boards.board             as board
 import src.utils.eval               as eval
-from src.utils.elgamal_dec_proof import verify_partial_decryption_share
+from src.utils.elgamal_dec_proof import verify_partial_decryption_shares
 
 # THIS IS A COPY OF MAIN, THAT ARE JUST FOR TESTING DIFFERENT PERFORMANCES VALUES
 
@@ -270,10 +270,10 @@ if __name__ == "__main__":
     dr_share, dr_proof = dr_agg.partial_dec_reports(bb.get_sm_baseline(), bb.get_sm_consumption())
     
     # TODO CHECK PARTIAL PROOF with agg encryption
-    if not verify_partial_decryption_share(agg.pp, agg_proof[0][0], agg_proof[1]):
+    if not verify_partial_decryption_shares(agg.pp, agg_proof[0], agg_proof[1]):
         raise ValueError("Aggregator partial decryption share proof verification failed!")
     
-    if not verify_partial_decryption_share(dr_agg.pp, dr_proof[0][0], dr_proof[1]):
+    if not verify_partial_decryption_shares(dr_agg.pp, dr_proof[0], dr_proof[1]):
         raise ValueError("Dr Aggregator partial decryption share proof verification failed!")
     
     
@@ -0,0 +1,139 @@
+import time
+import threshold_crypto as tc
+from Crypto.PublicKey import ECC
+from src.utils.procedures import Procedures
+from src.utils.point_codec import compress, decompress, hash_to_curve, encode_report, encode_points, decode_points
+from src.utils.ec_elgamal import ElGamal
+from src.utils.transcript import Transcript
+# test has been made with help from ai
+
+def test_compress_roundtrip():
+    """Test that compressed points decode to the same point."""
+    print("=== Testing Point Compression ===")
+    pp = Procedures().pp
+    name = pp[0]._name
+
+    points = [tc.number.random_in_range(1, pp[2]) * pp[1] for _ in range(10)]
+    points.append(pp[1])
+    points.append(-pp[1])
+    points.append(0 * pp[1])
+    for point in points:
+        data = compress(point)
+        assert len(data) == 33
+        assert decompress(data, name) == point
+
+    # an x-coordinate that is not on the curve is rejected
+    bad = bytearray(compress(pp[1]))
+    bad[0] = 5
+    try:
+        decompress(bytes(bad), name)
+        assert False, "invalid prefix should not decode"
+    except ValueError:
+        pass
+    print("=== Point compression tests passed! ===\n")
+
+def test_hash_to_curve():
+    """Test that hash-to-curve is deterministic and domain separated."""
+    pp = Procedures().pp
+    name = pp[0]._name
+
+    h1 = hash_to_curve(b"seed" + bytes(8), name)
+    assert h1 == hash_to_curve(b"seed" + bytes(8), name)
+    assert h1 != hash_to_curve(b"other" + bytes(8), name)
+    assert decompress(compress(h1), name) == h1
+
+CURVES = {"P-224": 29, "P-256": 33, "P-384": 49, "P-521": 67}
+
+def test_compress_native_points():
+    """Test compression of points made by pycryptodome itself, on every supported curve."""
+    print("=== Testing Point Compression on pycryptodome Points ===")
+    for name, length in CURVES.items():
+        points = [ECC.generate(curve=name).pointQ for _ in range(5)]
+        points.append(ECC.EccPoint(0, 0, curve=name))
+        for point in points:
+            data = compress(point)
+            assert len(data) == length
+            assert decompress(data, name) == point
+
+        assert decode_points(encode_points([points, (points[0],)]), name) == [points, (points[0],)]
+
+        # P-224 (p = 1 mod 4) needs Tonelli-Shanks to lift x
+        h = hash_to_curve(b"seed" + bytes(8), name)
+        assert decompress(compress(h), name) == h
+    print("=== pycryptodome point compression tests passed! ===\n")
+
+def test_transcript_native_points():
+    """Test that a transcript absorbs pycryptodome points, as the proofs do."""
+    point = ECC.generate(curve="P-256").pointQ
+    order = int(ECC._curves["P-256"].order)
+
+    def challenge(P):
+        transcript = Transcript(b"test")
+        transcript.absorb_point(b"P", P)
+        return transcript.challenge(b"c", order)
+
+    assert challenge(point) == challenge(point.copy())
+    assert challenge(point) != challenge(-point)
+
+def test_encode_report():
+    """Test that the report encoding is canonical and separates formats and timestamps."""
+    print("=== Testing Report Encoding ===")
+    pro = Procedures()
+    pp = pro.pp
+    ek = tc.number.random_in_range(1, pp[2]) * pp[1]
+    ahe = ElGamal(pp)
+
+    cts = ahe.enc(ek, 13)
+    data = encode_report(1700000000, cts)
+    assert data == encode_report(1700000000, list(cts))
+    assert data == encode_report(1700000000, tuple(cts)) == encode_report(1700000000, tuple(cts), packed=False)
+    assert len(data) == 1 + 8 + 4 + 2 * 33 * len(cts)
+    assert data != encode_report(1700000001, cts)
+
+    packed = ahe.enc_packed(ek, 13)
+    assert encode_report(1700000000, packed) != encode_report(1700000000, [packed])
+
+    # the report signature covers the encoding
+    sk = tc.number.random_in_range(1, pp[2])
+    pk, (t, cts, signature, encoding) = pro.report("sm_id_0", sk, (ek, pp), 13, 1700000000, (sk * pp[1], pp, None))
+    assert encoding == ElGamal.BITWISE
+    assert pro.sig.schnorr_verify(pk[0], pp, encode_report(t, cts, packed=False), signature)
+    assert not pro.sig.schnorr_verify(pk[0], pp, encode_report(t, cts, packed=True), signature)
+    print("=== Report encoding tests passed! ===\n")
+
+def benchmark_encode_report(n=200):
+    """Compares the repr message with the binary report encoding."""
+    pp = Procedures().pp
+    ek = tc.number.random_in_range(1, pp[2]) * pp[1]
+    cts = ElGamal(pp).enc(ek, 2**20 - 1)
+
+    start = time.time()
+    for _ in range(n):
+        str((1700000000, cts))
+    print(f"[PERFORMANCE] {n} x str((t, cts)): {time.time() - start:.4f}s")
+
+    start = time.time()
+    for _ in range(n):
+        encode_report(1700000000, cts)
+    print(f"[PERFORMANCE] {n} x encode_report(t, cts): {time.time() - start:.4f}s")
+
+def benchmark_compress(n=1000):
+    """Times compressing and decompressing n P-256 points."""
+    points = [ECC.generate(curve="P-256").pointQ for _ in range(n)]
+
+    start = time.time()
+    encoded = [compress(point) for point in points]
+    compressed = time.time() - start
+    start = time.time()
+    for data in encoded:
+        decompress(data, "P-256")
+    print(f"[PERFORMANCE] {n} points: compress {compressed:.4f}s, decompress {time.time() - start:.4f}s")
+
+if __name__ == "__main__":
+    test_compress_roundtrip()
+    test_hash_to_curve()
+    test_compress_native_points()
+    test_transcript_native_points()
+    test_encode_report()
+    benchmark_encode_report()
+    benchmark_compress()
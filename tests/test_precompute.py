@@ -0,0 +1,85 @@
+import time
+import threshold_crypto as tc
+from src.utils.procedures import Procedures
+from src.utils.precompute import FixedBaseTable, KeyTableCache, generator_table, generator_mul, has_native_generator_table
+# test has been made with help from ai
+
+def test_generator_table():
+    """Test that the fixed-base table agrees with plain scalar multiplication."""
+    print("=== Testing Generator Table ===")
+    pp = Procedures().pub_param()
+    g = pp[1]
+    order = pp[2]
+
+    scalars = [0, 1, 2, 255, 256, int(order) - 1, int(order), int(order) + 5]
+    scalars += [tc.number.random_in_range(1, order) for _ in range(20)]
+
+    for k in scalars:
+        assert generator_mul(k, pp) == (int(k) % int(order)) * g, f"table mismatch for scalar {k}"
+
+    assert generator_table(pp) is generator_table(pp), "table should be built once per curve"
+    print("=== Generator table tests passed! ===\n")
+
+def test_fixed_base_table_other_point():
+    """Test a table built for a point other than the generator."""
+    pp = Procedures().pub_param()
+    P = tc.number.random_in_range(2, pp[2]) * pp[1]
+    table = FixedBaseTable(P, pp[2], window=4)
+
+    for _ in range(20):
+        k = tc.number.random_in_range(1, pp[2])
+        assert table.mul(k) == k * P
+
+def test_key_table_cache():
+    """Test that only registered keys get a table and agree with plain multiplication."""
+    pp = Procedures().pub_param()
+    cache = KeyTableCache()
+    keys = [tc.number.random_in_range(2, pp[2]) * pp[1] for _ in range(3)]
+    cache.register(keys[0], pp[2])
+    cache.register(keys[0], pp[2])
+
+    for P in keys:
+        for _ in range(4):
+            k = tc.number.random_in_range(1, pp[2])
+            assert cache.mul(k, P, pp[2]) == k * P
+
+    # unregistered keys never get a table, however often they are used
+    assert list(cache.tables) == [(int(keys[0].x), int(keys[0].y))]
+
+def test_native_generator_curves():
+    """Test that curves without native generator tables agree with plain multiplication through the table."""
+    for name in ["P-224", "P-256"]:
+        curve = tc.CurveParameters(name)
+        pp = (curve, curve.P, curve.order)
+        k = tc.number.random_in_range(1, pp[2])
+        assert generator_mul(k, pp) == k * pp[1]
+    assert has_native_generator_table((tc.CurveParameters("P-256"),))
+    assert not has_native_generator_table((tc.CurveParameters("P-224"),))
+
+def benchmark_generator_mul(n=300):
+    """Compares the generator table with native multiplication, per curve."""
+    for name in ["P-224", "P-256", "P-384", "P-521"]:
+        curve = tc.CurveParameters(name)
+        pp = (curve, curve.P, curve.order)
+        scalars = [tc.number.random_in_range(1, pp[2]) for _ in range(n)]
+        table = FixedBaseTable(pp[1], pp[2])
+
+        start = time.time()
+        for k in scalars:
+            _ = k * pp[1]
+        plain = time.time() - start
+
+        start = time.time()
+        for k in scalars:
+            _ = table.mul(k)
+        tabled = time.time() - start
+
+        print(f"[PERFORMANCE] {name} {n} x k*G: native {plain:.4f}s, fixed-base table {tabled:.4f}s "
+              f"(native tables: {has_native_generator_table(pp)})")
+
+if __name__ == "__main__":
+    test_generator_table()
+    test_fixed_base_table_other_point()
+    test_key_table_cache()
+    test_native_generator_curves()
+    benchmark_generator_mul()
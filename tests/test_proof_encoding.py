@@ -0,0 +1,67 @@
+import pickle
+from src.utils.shuffle import Shuffle
+from src.utils.procedures import Procedures
+from src.utils.point_codec import encode_points
+from src.utils.proof_encoding import encode_shuffle_proof, decode_shuffle_proof, shuffle_proof_size
+from src.boards.board import Board
+# test has been made with help from ai
+
+def make_proof(pro, N):
+    pp = pro.pp
+    shuffle = Shuffle(pp)
+    e = [pro.skey_gen(f"A{i}", pp)[0][1][0] for i in range(N)]
+    e_prime, r_prime, ψ = shuffle.GenShuffle(e)
+    return e, e_prime, shuffle.GenProof(e, e_prime, r_prime, ψ, pp[1])
+
+def test_proof_roundtrip():
+    """Test that an encoded shuffle proof decodes (from a memoryview) to a proof that verifies."""
+    print("=== Testing Shuffle Proof Encoding ===")
+    pro = Procedures()
+    pp = pro.pp
+    e, e_prime, proof = make_proof(pro, 5)
+
+    data = encode_shuffle_proof(proof, pp)
+    assert len(data) == shuffle_proof_size(5, pp[0]._name)
+
+    decoded = decode_shuffle_proof(memoryview(data), pp)
+    assert decoded["c"] == proof["c"] and decoded["c_hat"] == proof["c_hat"] and decoded["h"] == proof["h"]
+    assert Shuffle(pp).verify_shuffle_proof(decoded, e, e_prime, pp[1], batch=False)
+
+    # other versions and truncated data are rejected
+    for bad in [data[:4] + bytes([2]) + data[5:], data[:-1]]:
+        try:
+            decode_shuffle_proof(bad, pp)
+            assert False, "invalid encoding should not decode"
+        except ValueError:
+            pass
+    print("=== Shuffle proof encoding tests passed! ===\n")
+
+def test_board_compact_proof():
+    """Test that the Board stores a mix proof in binary form and reports its size."""
+    pro = Procedures()
+    pp = pro.pp
+
+    bb = Board()
+    bb.pk = pro.skey_gen("DSO", pp)[0][1]
+    bb.register_smartmeter = [pro.skey_gen(f"sm{i}", pp)[0] for i in range(4)]
+    e_prime, _, proof = pro.mix_id(bb.register_smartmeter, pp[1])
+
+    bb.publish_mix_pk_and_proof((e_prime, proof), compact=True)
+    assert bb.mix_verified is True
+    assert bb.mix_proof_sizes() == [shuffle_proof_size(4, pp[0]._name)]
+    assert bb.get_mix_proof()["c"] == proof["c"]
+
+def benchmark_proof_size(sizes=(10, 100, 1000)):
+    """Compares the binary proof size with a pickled proof of compressed points."""
+    pro = Procedures()
+    pp = pro.pp
+    for N in sizes:
+        _, _, proof = make_proof(pro, N)
+        binary = len(encode_shuffle_proof(proof, pp))
+        pickled = len(pickle.dumps(encode_points(proof)))
+        print(f"[PERFORMANCE] proof for {N} keys: {binary} bytes binary ({binary / N:.0f} per key), {pickled} bytes pickled")
+
+if __name__ == "__main__":
+    test_proof_roundtrip()
+    test_board_compact_proof()
+    benchmark_proof_size()
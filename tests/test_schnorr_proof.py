@@ -1,5 +1,8 @@
+import time
 import src.utils.private_key_proof as sch
 import threshold_crypto as tc
+from src.dso.DSO import DSO
+from src.smartmeters.smartmeter import SmartMeter
 # test has been made with help from ai
 def test_schnorr_NIZKP():
     """Test Schnorr NIZKP proof generation and verification."""
@@ -49,6 +52,64 @@ def test_schnorr_NIZKP():
     
     print("\n=== All Schnorr NIZKP tests passed! ===\n")
 
-    
+def test_batch_NIZKP():
+    """Test that list verification agrees with one-by-one verification and finds the bad proofs."""
+    print("=== Testing Batch NIZKP Verification ===")
+    curve = tc.CurveParameters("P-256")
+    pp = (curve, curve.P, curve.order)
+
+    items = []
+    for _ in range(16):
+        sk = tc.number.random_in_range(2, pp[2])
+        pk = sk * pp[1]
+        items.append((pk, sch.schnorr_NIZKP_proof(pk, pp, sk)))
+    assert all(sch.schnorr_NIZKP_verify_batch(items, pp))
+
+    # wrong response, wrong challenge, proof for another key
+    c, s, W = items[2][1]
+    items[2] = (items[2][0], (c, (s + 1) % pp[2], W))
+    c, s, W = items[9][1]
+    items[9] = (items[9][0], ((c + 1) % pp[2], s, W))
+    items[13] = (items[12][0], items[13][1])
+
+    results = sch.schnorr_NIZKP_verify_batch(items, pp)
+    assert [i for i, valid in enumerate(results) if not valid] == [2, 9, 13]
+    assert results == [sch.schnorr_NIZKP_verify(pk, pp, proof) for pk, proof in items]
+    print("=== Batch NIZKP verification tests passed! ===\n")
+
+def test_bulk_registration():
+    """Test that the DSO registers every valid meter of a bulk enrollment and rejects the rest."""
+    dso = DSO()
+    sms = [SmartMeter(init_id=f"sm_id_{i}") for i in range(6)]
+    sm_infos = [(sm.id, sm.get_public_key()) for sm in sms]
+
+    # meter 4 claims meter 0's proof
+    pk, pp, _ = sm_infos[4][1]
+    sm_infos[4] = (sm_infos[4][0], (pk, pp, sm_infos[0][1][2]))
+
+    assert dso.verify_smartmeters_bulk(sm_infos) == ["sm_id_4"]
+    assert [sm_id for sm_id, _ in dso.registered_sm] == ["sm_id_0", "sm_id_1", "sm_id_2", "sm_id_3", "sm_id_5"]
+
+def benchmark_bulk_registration(n=500):
+    """Compares one-by-one and bulk enrollment of n smart meters."""
+    sm_infos = []
+    for i in range(n):
+        sm = SmartMeter(init_id=f"sm_id_{i}")
+        sm_infos.append((sm.id, sm.get_public_key()))
+
+    dso = DSO()
+    start = time.time()
+    for sm_info in sm_infos:
+        dso.verify_smartmeter(sm_info)
+    print(f"[PERFORMANCE] register {n} smart meters one by one: {time.time() - start:.4f}s")
+
+    dso = DSO()
+    start = time.time()
+    assert dso.verify_smartmeters_bulk(sm_infos) == []
+    print(f"[PERFORMANCE] register {n} smart meters in bulk: {time.time() - start:.4f}s")
+
 if __name__ == "__main__":
-    test_schnorr_NIZKP()
\ No newline at end of file
+    test_schnorr_NIZKP()
+    test_batch_NIZKP()
+    test_bulk_registration()
+    benchmark_bulk_registration()
\ No newline at end of file
@@ -1,5 +1,11 @@
 from src.utils.shuffle import Shuffle
+import os
+import time
+from src.utils.precompute import generator_mul, h_generators
 from src.utils.procedures import Procedures
+from src.boards.board import Board
+from src.aggregators.aggregator import Aggregator
+from src.utils.sharded_shuffle import verify_sharded_mix
 # test has been made with help from ai
 
 # testing shuffle flow
@@ -145,7 +151,299 @@ def test_integration_with_aggregator():
     
     return is_valid and all_verified
 
+def test_batch_verification():
+    """Test that batch and strict verification agree, and that a tampered proof is localized."""
+    print("\n=== Testing Batch Shuffle Verification ===")
+    pro = Procedures()
+    pp = pro.pp
+    shuffle = Shuffle(pp)
+    g = pp[1]
+
+    e = [pro.skey_gen(f"A{i}", pp)[0][1][0] for i in range(6)]
+    e_prime, r_prime, ψ = shuffle.GenShuffle(e)
+    proof = shuffle.GenProof(e, e_prime, r_prime, ψ, g)
+
+    assert shuffle.verify_shuffle_proof(proof, e, e_prime, g, batch=True)
+    assert shuffle.verify_shuffle_proof(proof, e, e_prime, g, batch=False)
+
+    # a wrong response fails the combined check and the strict checks name the equation
+    s1, s2, s3, s4, s_hat, s_prime = proof["s"]
+    tampered = dict(proof)
+    tampered["s"] = (s1, s2, s3, (int(s4) + 1) % int(pp[2]), s_hat, s_prime)
+    rejected = False
+    try:
+        shuffle.verify_shuffle_proof(tampered, e, e_prime, g)
+    except AssertionError:
+        rejected = True
+    assert rejected, "tampered proof should not verify"
+    print("=== Batch verification tests passed! ===\n")
+
+def test_challenges():
+    """Regression test for the O(N) challenge derivation u_i = H(transcript(e, e', c) || i)."""
+    print("\n=== Testing Challenge Derivation ===")
+    pp = Procedures().pp
+    shuffle = Shuffle(pp)
+    points = [generator_mul(k, pp) for k in range(1, 10)]
+    e, e_prime, c = points[:3], points[3:6], points[6:]
+
+    u = shuffle.challenges(e, e_prime, c)
+    assert u == Shuffle(pp).challenges(e, e_prime, c)
+    assert all(0 <= u_i < pp[2] for u_i in u)
+    assert len(set(u)) == len(u)
+
+    # every challenge depends on the whole prefix
+    changed = shuffle.challenges(e, e_prime, [c[0], c[2], c[1]])
+    assert all(a != b for a, b in zip(u, changed))
+    print("=== Challenge derivation tests passed! ===\n")
+
+def test_derived_generators():
+    """Test that the h generators are deterministic, extendable and not shipped in the proof."""
+    print("\n=== Testing Derived Generators ===")
+    pro = Procedures()
+    pp = pro.pp
+    shuffle = Shuffle(pp)
+    g = pp[1]
+
+    first = shuffle.get_h_generators(3)
+    longer = h_generators(pp, 6)
+    assert longer[:3] == first
+    assert len(set((int(h.x), int(h.y)) for h in longer)) == 6
+
+    e = [pro.skey_gen(f"A{i}", pp)[0][1][0] for i in range(4)]
+    e_prime, r_prime, ψ = shuffle.GenShuffle(e)
+    proof = shuffle.GenProof(e, e_prime, r_prime, ψ, g)
+    assert "h_gens" not in proof
+    assert Shuffle(pp).verify_shuffle_proof(proof, e, e_prime, g)
+    print("=== Derived generator tests passed! ===\n")
+
+def benchmark_challenges(sizes=(100, 1000, 10000)):
+    """Shows that challenge derivation scales linearly with the number of keys."""
+    pp = Procedures().pp
+    shuffle = Shuffle(pp)
+    for N in sizes:
+        points = [generator_mul(k, pp) for k in range(1, N + 1)]
+        start = time.time()
+        shuffle.challenges(points, points, points)
+        elapsed = time.time() - start
+        print(f"[PERFORMANCE] challenges for {N} keys: {elapsed:.4f}s ({elapsed / N * 1e6:.1f}us per key)")
+
+def test_parallel_proof():
+    """Test that a proof generated on a process pool verifies."""
+    print("\n=== Testing Parallel Proof Generation ===")
+    pro = Procedures()
+    pp = pro.pp
+    shuffle = Shuffle(pp)
+    g = pp[1]
+
+    e = [pro.skey_gen(f"A{i}", pp)[0][1][0] for i in range(7)]
+    e_prime, r_prime, ψ = shuffle.GenShuffle(e)
+    proof = shuffle.GenProof(e, e_prime, r_prime, ψ, g, workers=3)
+    assert shuffle.verify_shuffle_proof(proof, e, e_prime, g, batch=False)
+    print("=== Parallel proof tests passed! ===\n")
+
+def test_board_tentative_mix():
+    """Test that the Board publishes a mix tentatively and verifies it in the background."""
+    print("\n=== Testing Tentative Mix Publishing ===")
+    pro = Procedures()
+    pp = pro.pp
+    g = pp[1]
+
+    bb = Board()
+    bb.pk = pro.skey_gen("DSO", pp)[0][1]
+    bb.register_smartmeter = [pro.skey_gen(f"sm{i}", pp)[0] for i in range(5)]
+
+    ID_pk = [(sm_id, sm_pk) for sm_id, sm_pk in bb.register_smartmeter]
+    e_prime, _, πmix = pro.mix_id(ID_pk, g, workers=2)
+
+    bb.publish_mix_pk_and_proof((e_prime, πmix), wait=False, workers=2)
+    assert bb.mix_pk == e_prime
+    assert bb.wait_for_mix_verification() is True
+    print("=== Tentative mix tests passed! ===\n")
+
+def test_mix_cascade():
+    """Test a three-hop mix cascade published and verified hop by hop on the Board."""
+    print("\n=== Testing Mix Cascade ===")
+    pro = Procedures()
+    pp = pro.pp
+
+    bb = Board()
+    bb.pk = pro.skey_gen("DSO", pp)[0][1]
+    bb.register_smartmeter = [pro.skey_gen(f"sm{i}", pp)[0] for i in range(4)]
+
+    hops = [Aggregator(init_id=f"agg_{i}", pp=pp) for i in range(3)]
+    hops[0].create_mixed_anon_pk_set(bb.register_smartmeter)
+    bb.publish_mix_hop(hops[0].publish_mixed_keys(), workers=3)
+    for hop in hops[1:]:
+        hop.mix_hop(bb.mix_pk)
+        bb.publish_mix_hop(hop.publish_mixed_keys())
+
+    assert bb.wait_for_mix_verification() is True
+    assert len(bb.mix_hops) == 3
+
+    # every registered key, followed hop by hop, ends up in the final list
+    final = {(int(pk.x), int(pk.y)) for pk in bb.mix_pk}
+    for _, (pk, _, _) in bb.register_smartmeter:
+        pk_prime = pk
+        for hop in hops:
+            pk_prime = hop.mixed_key_of(pk_prime)
+        assert (int(pk_prime.x), int(pk_prime.y)) in final
+    assert bb.mix_pool is None
+
+    # a hop whose proof does not match its input is reported
+    bb_bad = Board()
+    bb_bad.pk = bb.pk
+    bb_bad.register_smartmeter = bb.register_smartmeter
+    bb_bad.publish_mix_hop(hops[0].publish_mixed_keys(), workers=2)
+    bb_bad.publish_mix_hop(hops[2].publish_mixed_keys())
+    assert bb_bad.wait_for_mix_verification() is False
+    print("=== Mix cascade tests passed! ===\n")
+
+def test_sharded_mix():
+    """Test a two-layer sharded mix through mix_id and its verification on the Board."""
+    print("\n=== Testing Sharded Mix ===")
+    pro = Procedures()
+    pp = pro.pp
+    g = pp[1]
+
+    bb = Board()
+    bb.pk = pro.skey_gen("DSO", pp)[0][1]
+    bb.register_smartmeter = [pro.skey_gen(f"sm{i}", pp)[0] for i in range(10)]
+    e = [sm[1][0] for sm in bb.register_smartmeter]
+
+    e_prime, r_prime, proof = pro.mix_id(bb.register_smartmeter, g, workers=3, shards=3)
+    assert len(e_prime) == len(e)
+
+    # r_prime[i] is the total blinding of e[i] over both layers
+    outputs = {(int(pk.x), int(pk.y)) for pk in e_prime}
+    for pk, r in zip(e, r_prime):
+        pk_prime = pk + int(r) * g
+        assert (int(pk_prime.x), int(pk_prime.y)) in outputs
+
+    assert verify_sharded_mix(pp, proof, e, e_prime, g)
+    assert not verify_sharded_mix(pp, proof, e, e_prime[::-1], g)
+
+    bb.publish_mix_pk_and_proof((e_prime, proof), workers=2)
+    assert bb.mix_verified is True
+    print("=== Sharded mix tests passed! ===\n")
+
+def benchmark_sharded_mix(sizes=(1000, 10000, 100000), shards=16):
+    """Compares the wall-clock time of the monolithic and the sharded mix_id."""
+    pro = Procedures()
+    pp = pro.pp
+    g = pp[1]
+    workers = os.cpu_count() or 1
+
+    for N in sizes:
+        ID_pk = [(i, (generator_mul(i + 1, pp),)) for i in range(N)]
+
+        start = time.time()
+        pro.mix_id(ID_pk, g)
+        monolithic = time.time() - start
+
+        start = time.time()
+        pro.mix_id(ID_pk, g, workers=workers, shards=shards)
+        sharded = time.time() - start
+
+        print(f"[PERFORMANCE] mix of {N} keys: monolithic {monolithic:.2f}s, {shards} shards on {workers} workers {sharded:.2f}s")
+
+def test_precomputed_shuffle():
+    """Test that a shuffle and proof using precomputed material verify, and that the material is used once."""
+    print("\n=== Testing Precomputed Shuffle ===")
+    pro = Procedures()
+    pp = pro.pp
+    shuffle = Shuffle(pp)
+    g = pp[1]
+    N = 5
+
+    shuffle.precompute(N)
+    offline_c = shuffle.offline_proof["c"]
+
+    e = [pro.skey_gen(f"A{i}", pp)[0][1][0] for i in range(N)]
+    e_prime, r_prime, ψ = shuffle.GenShuffle(e)
+    proof = shuffle.GenProof(e, e_prime, r_prime, ψ, g)
+
+    assert proof["c"] == offline_c
+    assert shuffle.offline_shuffle is None and shuffle.offline_proof is None
+    assert shuffle.verify_shuffle_proof(proof, e, e_prime, g, batch=False)
+
+    # the next shuffle draws fresh randomness
+    e_prime_2, r_prime_2, ψ_2 = shuffle.GenShuffle(e)
+    assert r_prime_2 != r_prime
+    assert shuffle.verify_shuffle_proof(shuffle.GenProof(e, e_prime_2, r_prime_2, ψ_2, g), e, e_prime_2, g)
+    print("=== Precomputed shuffle tests passed! ===\n")
+
+def benchmark_precomputed_shuffle(N=100):
+    """Compares the online latency of GenShuffle + GenProof with and without precompute."""
+    pro = Procedures()
+    pp = pro.pp
+    shuffle = Shuffle(pp)
+    g = pp[1]
+    e = [pro.skey_gen(f"A{i}", pp)[0][1][0] for i in range(N)]
+
+    start = time.time()
+    e_prime, r_prime, ψ = shuffle.GenShuffle(e)
+    shuffle.GenProof(e, e_prime, r_prime, ψ, g)
+    full = time.time() - start
+
+    start = time.time()
+    shuffle.precompute(N)
+    offline = time.time() - start
+
+    start = time.time()
+    e_prime, r_prime, ψ = shuffle.GenShuffle(e)
+    shuffle.GenProof(e, e_prime, r_prime, ψ, g)
+    online = time.time() - start
+
+    print(f"[PERFORMANCE] mix of {N} keys: without precompute {full:.4f}s, offline {offline:.4f}s + online {online:.4f}s")
+
+def benchmark_parallel_proof(N=200):
+    """Times GenProof for an increasing number of worker processes."""
+    pro = Procedures()
+    pp = pro.pp
+    shuffle = Shuffle(pp)
+    g = pp[1]
+
+    e = [pro.skey_gen(f"A{i}", pp)[0][1][0] for i in range(N)]
+    e_prime, r_prime, ψ = shuffle.GenShuffle(e)
+
+    cores = [1]
+    while cores[-1] * 2 <= (os.cpu_count() or 1):
+        cores.append(cores[-1] * 2)
+    for workers in cores:
+        start = time.time()
+        shuffle.GenProof(e, e_prime, r_prime, ψ, g, workers=workers)
+        print(f"[PERFORMANCE] GenProof for {N} keys with {workers} worker(s): {time.time() - start:.4f}s")
+
+def benchmark_batch_verification(N=50):
+    """Compares strict per-equation verification with the batched check."""
+    pro = Procedures()
+    pp = pro.pp
+    shuffle = Shuffle(pp)
+    g = pp[1]
+
+    e = [pro.skey_gen(f"A{i}", pp)[0][1][0] for i in range(N)]
+    e_prime, r_prime, ψ = shuffle.GenShuffle(e)
+    proof = shuffle.GenProof(e, e_prime, r_prime, ψ, g)
+
+    for batch in (False, True):
+        start = time.time()
+        assert shuffle.verify_shuffle_proof(proof, e, e_prime, g, batch=batch)
+        print(f"[PERFORMANCE] verify {N} keys (batch={batch}): {time.time() - start:.4f}s")
+
 if __name__ == "__main__":
     test_basic_shuffle()
     test_basic_shuffle_pk()
-    test_integration_with_aggregator()
\ No newline at end of file
+    test_integration_with_aggregator()
+    test_batch_verification()
+    test_challenges()
+    test_derived_generators()
+    test_parallel_proof()
+    test_board_tentative_mix()
+    test_precomputed_shuffle()
+    test_mix_cascade()
+    test_sharded_mix()
+    benchmark_batch_verification()
+    benchmark_challenges()
+    benchmark_parallel_proof()
+    benchmark_precomputed_shuffle()
+    benchmark_sharded_mix()
\ No newline at end of file
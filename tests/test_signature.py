@@ -1,5 +1,7 @@
+import time
 import threshold_crypto as tc
 from src.utils.signature import Signature
+from src.utils.procedures import Procedures
 # test has been made with help from ai
 
 def test_schnorr_signature():
@@ -71,9 +73,140 @@ def test_schnorr_signature():
     for idx, msg, valid in results_wrong:
         print(f"   -    Message {idx}: '{msg}' -> {valid}")
     assert not all_valid_wrong, "Should not verify with wrong messages!"
+    assert [valid for _, _, valid in results_wrong] == [True, False, True]
     
     print("\n=== All Schnorr signature tests passed! ===\n")
 
+def test_batch_verify_list():
+    """Test that batch verification with bisection finds exactly the invalid signatures."""
+    print("=== Testing Batch Signature Verification ===")
+    sig = Signature()
+    pp = Procedures().pp
+    sk = tc.number.random_in_range(1, pp[2])
+    pk = sk * pp[1]
+
+    msg_list = [f"sm_id_{i}" for i in range(20)]
+    signatures = sig.schnorr_sign_list(sk, pp, msg_list)
+
+    all_valid, results = sig.schnorr_verify_list(pk, pp, msg_list, signatures, batch=True)
+    assert all_valid and len(results) == 20
+
+    wrong = list(msg_list)
+    wrong[4] = "forged"
+    wrong[17] = "forged"
+    all_valid, results = sig.schnorr_verify_list(pk, pp, wrong, signatures, batch=True)
+    assert not all_valid
+    assert [i for i, _, valid in results if not valid] == [4, 17]
+    assert results == sig.schnorr_verify_list(pk, pp, wrong, signatures)[1]
+    print("=== Batch signature verification tests passed! ===\n")
+
+def benchmark_verify_list(n=500):
+    """Compares one-by-one and batch verification of a signed registration list."""
+    sig = Signature()
+    pp = Procedures().pp
+    sk = tc.number.random_in_range(1, pp[2])
+    pk = sk * pp[1]
+    msg_list = [f"sm_id_{i}" for i in range(n)]
+    signatures = sig.schnorr_sign_list(sk, pp, msg_list)
+
+    for batch in (False, True):
+        start = time.time()
+        assert sig.schnorr_verify_list(pk, pp, msg_list, signatures, batch=batch)[0]
+        print(f"[PERFORMANCE] verify {n} signatures (batch={batch}): {time.time() - start:.4f}s")
+
+def test_nonce_pool():
+    """Test that pooled nonces give valid signatures and are never reused."""
+    print("=== Testing Nonce Pool ===")
+    sig = Signature()
+    pp = Procedures().pp
+    sk = tc.number.random_in_range(1, pp[2])
+    pk = sk * pp[1]
+
+    pool = sig.start_nonce_pool(pp, size=10, background=False)
+    assert len(pool) == 10
+
+    msg_list = [f"sm_id_{i}" for i in range(15)]
+    signatures = sig.schnorr_sign_list(sk, pp, msg_list)
+    assert len(pool) == 0
+    assert sig.schnorr_verify_list(pk, pp, msg_list, signatures)[0]
+
+    # every nonce commitment R is distinct
+    assert len({(int(R.x), int(R.y)) for R, _ in signatures}) == len(signatures)
+
+    # empty pool falls back to a fresh nonce
+    R, s = sig.schnorr_sign(sk, pp, "extra")
+    assert sig.schnorr_verify(pk, pp, "extra", (R, s))
+
+    sig.stop_nonce_pool(pp)
+    assert not sig.nonce_pools
+    print("=== Nonce pool tests passed! ===\n")
+
+def benchmark_nonce_pool(n=300):
+    """Compares bulk signing with and without precomputed nonces."""
+    pp = Procedures().pp
+    sk = tc.number.random_in_range(1, pp[2])
+    msg_list = [f"sm_id_{i}" for i in range(n)]
+
+    sig = Signature()
+    start = time.time()
+    sig.schnorr_sign_list(sk, pp, msg_list)
+    print(f"[PERFORMANCE] sign {n} messages: {time.time() - start:.4f}s")
+
+    start = time.time()
+    sig.start_nonce_pool(pp, size=n, workers=4, background=False)
+    print(f"[PERFORMANCE] precompute {n} nonces (4 workers): {time.time() - start:.4f}s")
+
+    start = time.time()
+    sig.schnorr_sign_list(sk, pp, msg_list)
+    print(f"[PERFORMANCE] sign {n} messages with pooled nonces: {time.time() - start:.4f}s")
+    sig.stop_nonce_pool(pp)
+
+def test_half_aggregation():
+    """Test that a half-aggregate of signatures by different signers verifies as a batch."""
+    print("=== Testing Half-Aggregated Signatures ===")
+    sig = Signature()
+    pp = Procedures().pp
+    sks = [tc.number.random_in_range(1, pp[2]) for _ in range(8)]
+    pks = [sk * pp[1] for sk in sks]
+    msg_list = [str((i, f"cts_{i}")) for i in range(8)]
+    signatures = [sig.schnorr_sign(sk, pp, msg) for sk, msg in zip(sks, msg_list)]
+
+    aggregate = sig.aggregate_signatures(pp, pks, msg_list, signatures)
+    R_list, s = aggregate
+    assert len(R_list) == 8 and isinstance(s, int)
+    assert sig.verify_aggregate(pp, pks, msg_list, aggregate)
+
+    # wrong message, swapped signer, or one invalid signature in the batch
+    wrong = list(msg_list)
+    wrong[5] = "forged"
+    assert not sig.verify_aggregate(pp, pks, wrong, aggregate)
+    assert not sig.verify_aggregate(pp, pks[::-1], msg_list, aggregate)
+    R, s_3 = signatures[3]
+    signatures[3] = (R, (s_3 + 1) % pp[2])
+    assert not sig.verify_aggregate(pp, pks, msg_list, sig.aggregate_signatures(pp, pks, msg_list, signatures))
+    print("=== Half-aggregated signature tests passed! ===\n")
+
+def benchmark_half_aggregation(n=300):
+    """Compares n independent verifications with one half-aggregate verification (the aggregate only saves size)."""
+    sig = Signature()
+    pp = Procedures().pp
+    sks = [tc.number.random_in_range(1, pp[2]) for _ in range(n)]
+    pks = [sk * pp[1] for sk in sks]
+    msg_list = [f"report_{i}" for i in range(n)]
+    signatures = [sig.schnorr_sign(sk, pp, msg) for sk, msg in zip(sks, msg_list)]
+
+    start = time.time()
+    assert all(sig.schnorr_verify(pk, pp, msg, signature) for pk, msg, signature in zip(pks, msg_list, signatures))
+    print(f"[PERFORMANCE] verify {n} report signatures one by one: {time.time() - start:.4f}s")
+
+    start = time.time()
+    aggregate = sig.aggregate_signatures(pp, pks, msg_list, signatures)
+    print(f"[PERFORMANCE] half-aggregate {n} signatures: {time.time() - start:.4f}s")
+
+    start = time.time()
+    assert sig.verify_aggregate(pp, pks, msg_list, aggregate)
+    print(f"[PERFORMANCE] verify half-aggregate of {n} signatures: {time.time() - start:.4f}s")
+
 def test_key_gen():
     sig = Signature()
     sk_key, pk_key = sig.key_gen()
@@ -87,4 +220,10 @@ def test_key_gen():
 
 if __name__ == "__main__":
     test_key_gen()
-    test_schnorr_signature()
\ No newline at end of file
+    test_schnorr_signature()
+    test_batch_verify_list()
+    benchmark_verify_list()
+    test_nonce_pool()
+    benchmark_nonce_pool()
+    test_half_aggregation()
+    benchmark_half_aggregation()
\ No newline at end of file
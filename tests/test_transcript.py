@@ -0,0 +1,48 @@
+import time
+import threshold_crypto as tc
+from src.utils.procedures import Procedures
+from src.utils.transcript import Transcript
+# test has been made with help from ai
+
+def test_transcript():
+    """Test that challenges are deterministic and bind every absorbed value and label."""
+    print("=== Testing Fiat-Shamir Transcript ===")
+    pp = Procedures().pp
+    points = [tc.number.random_in_range(1, pp[2]) * pp[1] for _ in range(4)]
+
+    def challenge(domain=b"test", label=b"P", values=points, scalar=7):
+        transcript = Transcript(domain)
+        transcript.absorb_points(label, values)
+        transcript.absorb_scalar(b"x", scalar)
+        return transcript.challenge(b"c", pp[2])
+
+    c = challenge()
+    assert c == challenge() and 0 <= c < pp[2]
+    assert c != challenge(domain=b"other")
+    assert c != challenge(label=b"Q")
+    assert c != challenge(values=points[::-1])
+    assert c != challenge(scalar=8)
+
+    # a second challenge depends on the first
+    transcript = Transcript(b"test")
+    first = transcript.challenge(b"c", pp[2])
+    assert transcript.challenge(b"c", pp[2]) != first
+
+    u = Transcript(b"test").challenges(b"u", 5, pp[2])
+    assert len(set(u)) == 5
+    print("=== Fiat-Shamir transcript tests passed! ===\n")
+
+def benchmark_transcript(n=1000):
+    """Times absorbing n points into a transcript."""
+    pp = Procedures().pp
+    points = [tc.number.random_in_range(1, pp[2]) * pp[1] for _ in range(n)]
+
+    start = time.time()
+    transcript = Transcript(b"benchmark")
+    transcript.absorb_points(b"P", points)
+    transcript.challenge(b"c", pp[2])
+    print(f"[PERFORMANCE] transcript of {n} points: {time.time() - start:.4f}s")
+
+if __name__ == "__main__":
+    test_transcript()
+    benchmark_transcript()